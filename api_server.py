@@ -0,0 +1,685 @@
+#!/usr/bin/env python3
+"""HTTP API Server for Lisa-Agent
+
+Headless service for driving Lisa from other programs, built on asyncio
+from the standard library (HTTP/1.1 with keep-alive, plus WebSocket).
+
+Endpoints:
+  POST /v1/reply          {"message", "session"?, "search"?} -> {"reply", "session", "timings"}
+  POST /v1/reply/stream   same body; NDJSON lines {"token"} ... then {"done", "reply", "session"}
+  GET  /v1/memory         ?session=...&q=...  -> {"notes"}
+  POST /v1/memory         {"session", "note"} -> {"session", "count"}
+  GET  /v1/search         ?q=...&max_results=5 -> {"results"}
+  GET  /v1/ws             WebSocket; send {"message", ...} objects, receive the stream lines
+  GET  /metrics           Prometheus text format
+  GET  /healthz           liveness
+
+Every session (picked by the client, or assigned on first use) has its
+own conversation and notes; the Ollama client, connection pool, caches
+and search engine are shared (see shared_resources.py). One session
+handles one request at a time; a second request for a session that is
+still busy gets 409 rather than waiting.
+
+The blocking agent calls run on a fixed pool of worker threads. Up to
+``max_queue`` more requests may wait for a worker; beyond that the
+server answers 503 at once, so a load balancer can retry elsewhere.
+A request that runs past its timeout gets 504 and its generation is
+stopped at the next token.
+
+Run:
+  python api_server.py --port 8080 --workers 8
+
+Environment variables (optional; see also lisa_agent.py):
+  LISA_API_HOST       default: 127.0.0.1
+  LISA_API_PORT       default: 8080
+  LISA_API_WORKERS    default: 8 (concurrent generations)
+  LISA_API_QUEUE      default: 32 (requests allowed to wait for a worker)
+  LISA_API_TIMEOUT    default: 120 (seconds per request)
+  LISA_API_SESSIONS   default: 1000 (sessions kept; least recently used are dropped)
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import signal
+import struct
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from conversation import ConversationContext
+from lisa_agent import DEFAULT_HISTORY_TOKENS, LisaAgent
+from shared_resources import OLLAMA_CLIENT, RESPONSE_CACHE, SEARCH_ENGINE, Session
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+# Idle keep-alive connections are closed after this many seconds
+KEEPALIVE_SECONDS = 75
+PATHS = {"/v1/reply", "/v1/reply/stream", "/v1/memory", "/v1/search", "/v1/ws", "/metrics", "/healthz"}
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+REASONS = {200: "OK", 101: "Switching Protocols", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Overloaded(HTTPError):
+    """Every worker is busy and the wait queue is full"""
+
+    def __init__(self):
+        super().__init__(503, "Server busy, retry shortly")
+
+
+class Limiter:
+    """A fixed number of worker slots with a bounded wait queue"""
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.running = 0
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(workers)
+
+    async def acquire(self) -> None:
+        """Wait for a slot; raises Overloaded when the queue is already full"""
+        if self.running + self.waiting >= self.workers + self.max_queue:
+            raise Overloaded()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+
+    def release(self) -> None:
+        self.running -= 1
+        self._slots.release()
+
+
+class Metrics:
+    """Request counters and latencies, exported in Prometheus text format"""
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, int], int] = defaultdict(int)
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.count: Dict[str, int] = defaultdict(int)
+        self.rejected = 0
+        self.timeouts = 0
+        self.tokens = 0
+        self.started = time.time()
+
+    def observe(self, route: str, status: int, seconds: float) -> None:
+        self.requests[(route, status)] += 1
+        self.seconds[route] += seconds
+        self.count[route] += 1
+        if status == 503:
+            self.rejected += 1
+        elif status == 504:
+            self.timeouts += 1
+
+    def render(self, gauges: Dict[str, float]) -> str:
+        lines = ["# TYPE lisa_api_requests_total counter"]
+        for (route, status), n in sorted(self.requests.items()):
+            lines.append(f'lisa_api_requests_total{{route="{route}",status="{status}"}} {n}')
+        lines.append("# TYPE lisa_api_request_seconds summary")
+        for route in sorted(self.count):
+            lines.append(f'lisa_api_request_seconds_sum{{route="{route}"}} {self.seconds[route]:.6f}')
+            lines.append(f'lisa_api_request_seconds_count{{route="{route}"}} {self.count[route]}')
+        counters = {"rejected": self.rejected, "timeouts": self.timeouts, "tokens": self.tokens}
+        for name, value in counters.items():
+            lines += [f"# TYPE lisa_api_{name}_total counter", f"lisa_api_{name}_total {value}"]
+        gauges = dict(gauges, uptime_seconds=time.time() - self.started)
+        for name, value in gauges.items():
+            lines += [f"# TYPE lisa_api_{name} gauge", f"lisa_api_{name} {value:g}"]
+        return "\n".join(lines) + "\n"
+
+
+class _AgentSession:
+    def __init__(self, agent: LisaAgent):
+        self.agent = agent
+        # Conversation state is per session, so its messages run one at a time
+        self.lock = asyncio.Lock()
+
+
+class Request:
+    def __init__(self, method: str, target: str, version: str, headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.version = version
+        self.headers = headers
+        self.body = body
+        url = urlsplit(target)
+        self.path = url.path
+        self.query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self) -> Dict:
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        return data
+
+
+class LisaServer:
+    """asyncio HTTP/WebSocket front end over a bounded pool of agent workers"""
+
+    def __init__(self, workers: int = 8, max_queue: int = 32, timeout: float = 120.0,
+                 max_sessions: int = 1000,
+                 agent_factory: Optional[Callable[[Session], LisaAgent]] = None):
+        """
+        Initialize the server (call serve() or start() to listen).
+
+        Args:
+            workers: Generations running at once (worker threads)
+            max_queue: Requests allowed to wait for a worker before 503s
+            timeout: Seconds per request before 504
+            max_sessions: Sessions kept; the least recently used is dropped
+            agent_factory: Builds the agent for a new session from the
+                shared resources (default: like streamlit_ui does)
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.max_sessions = max_sessions
+        self.agent_factory = agent_factory or self._default_agent
+        self.resources = Session()
+        self.metrics = Metrics()
+        self._sessions: "OrderedDict[str, _AgentSession]" = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lisa-api-worker")
+        self._limiter: Optional[Limiter] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections = 0
+
+    @staticmethod
+    def _default_agent(resources: Session) -> LisaAgent:
+        conversation = ConversationContext(DEFAULT_HISTORY_TOKENS) if DEFAULT_HISTORY_TOKENS > 0 else None
+        return LisaAgent(client=resources.get(OLLAMA_CLIENT), cache=resources.get(RESPONSE_CACHE),
+                         search=resources.get(SEARCH_ENGINE), conversation=conversation)
+
+    # ---- lifecycle ----
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+        self._limiter = Limiter(self.workers, self.max_queue)
+        self._server = await asyncio.start_server(self._handle_connection, host, port,
+                                                  limit=MAX_HEADER_BYTES)
+        return self._server
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        """Listen until SIGINT/SIGTERM, then let running requests finish"""
+        server = await self.start(host, port)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+        addresses = ", ".join(str(s.getsockname()) for s in server.sockets)
+        print(f"Lisa API listening on {addresses} ({self.workers} workers, queue {self.max_queue})")
+        try:
+            await stop.wait()
+        finally:
+            await self.close()
+
+    async def close(self, grace: float = 10.0) -> None:
+        """Stop accepting connections, wait up to ``grace`` seconds for work, release resources"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        deadline = time.monotonic() + grace
+        while self._limiter is not None and self._limiter.running and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        self._executor.shutdown(wait=False)
+        self.resources.close()
+
+    # ---- sessions ----
+
+    def _session(self, session_id: Optional[str]) -> Tuple[str, _AgentSession]:
+        session_id = str(session_id) if session_id else uuid.uuid4().hex
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions[session_id] = _AgentSession(self.agent_factory(self.resources))
+            while len(self._sessions) > self.max_sessions:
+                # Drop the least recently used session that isn't busy
+                for old_id, old in self._sessions.items():
+                    if not old.lock.locked():
+                        del self._sessions[old_id]
+                        break
+                else:
+                    break
+        self._sessions.move_to_end(session_id)
+        return session_id, state
+
+    # ---- bounded work ----
+
+    @staticmethod
+    async def _claim(state: _AgentSession) -> None:
+        """Take a session for one request; 409 if another request has it"""
+        if state.lock.locked():
+            raise HTTPError(409, "Session is busy with another request, retry when it finishes")
+        await state.lock.acquire()  # free, so this doesn't wait
+
+    async def _run(self, fn: Callable[[], Any], session: Optional[_AgentSession] = None) -> Any:
+        """
+        Run a blocking call on a worker, holding its slot until the call returns.
+
+        ``session``, already claimed by the caller, is let go along with the slot.
+        """
+        try:
+            await self._limiter.acquire()
+        except BaseException:
+            if session is not None:
+                session.lock.release()
+            raise
+
+        def finished(_) -> None:
+            self._limiter.release()
+            if session is not None:
+                session.lock.release()
+
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._executor, fn)
+        except BaseException:
+            finished(None)
+            raise
+        # Released when the thread is done, even if the caller timed out
+        future.add_done_callback(finished)
+        return await asyncio.shield(future)
+
+    async def _generate(self, session_id: Optional[str], message: str, search: bool,
+                        emit: Optional[Callable[[str], Awaitable[None]]] = None) -> Dict:
+        """
+        Produce one reply on a worker, passing each token to ``emit``.
+
+        Cancelling the caller (timeout, client gone) stops the model's
+        stream at the next token; the session and worker slot stay held
+        until the worker has actually let go.
+        """
+        if not message.strip():
+            raise HTTPError(400, "'message' must be a non-empty string")
+        session_id, state = self._session(session_id)
+        agent = state.agent
+        loop = asyncio.get_running_loop()
+        tokens: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        cancel = threading.Event()
+
+        def produce() -> None:
+            stream: Iterator[str] = agent.reply_with_search_stream(message) if search else agent.reply_stream(message)
+            try:
+                for token in stream:
+                    if cancel.is_set():
+                        break
+                    loop.call_soon_threadsafe(tokens.put_nowait, token)
+            finally:
+                stream.close()
+
+        await self._claim(state)
+        try:
+            await self._limiter.acquire()
+        except BaseException:
+            state.lock.release()
+            raise
+        future = loop.run_in_executor(self._executor, produce)
+
+        def finished(_) -> None:
+            self._limiter.release()
+            state.lock.release()
+            tokens.put_nowait(None)
+
+        future.add_done_callback(finished)
+        parts: List[str] = []
+        try:
+            while True:
+                token = await tokens.get()
+                if token is None:
+                    break
+                parts.append(token)
+                self.metrics.tokens += 1
+                if emit is not None:
+                    await emit(token)
+            future.result()  # re-raise a failure from the worker
+        finally:
+            cancel.set()
+        return {"reply": "".join(parts), "session": session_id,
+                "timings": dict(agent.last_timings) if search else {}}
+
+    # ---- routes ----
+
+    async def _reply(self, request: Request) -> Dict:
+        data = request.json()
+        return await self._generate(data.get("session"), str(data.get("message", "")), bool(data.get("search")))
+
+    async def _memory(self, request: Request) -> Dict:
+        if request.method == "POST":
+            data = request.json()
+            note = str(data.get("note", "")).strip()
+            if not note:
+                raise HTTPError(400, "'note' must be a non-empty string")
+            session_id, state = self._session(data.get("session"))
+            agent = state.agent
+
+            def remember() -> int:
+                agent.memory.add(note)
+                if agent.semantic is not None:
+                    agent.semantic.add(note)
+                return len(agent.memory.facts) if hasattr(agent.memory, "facts") else len(agent.memory)
+
+            # Notes change the session, so they wait their turn like a reply
+            await self._claim(state)
+            return {"session": session_id, "count": await self._run(remember, session=state)}
+        session_id = request.query.get("session")
+        if not session_id or session_id not in self._sessions:
+            return {"session": session_id, "notes": []}
+        memory = self._sessions[session_id].agent.memory
+        term = request.query.get("q", "")
+        notes = await self._run(lambda: memory.search(term) if term else list(memory.facts))
+        return {"session": session_id, "notes": notes}
+
+    async def _search(self, request: Request) -> Dict:
+        query = request.query.get("q", "").strip()
+        if not query:
+            raise HTTPError(400, "Missing query parameter 'q'")
+        try:
+            max_results = max(1, min(int(request.query.get("max_results", 5)), 20))
+        except ValueError:
+            raise HTTPError(400, "'max_results' must be an integer")
+        engine = self.resources.get(SEARCH_ENGINE)
+        return {"query": query, "results": await self._run(lambda: engine.search(query, max_results))}
+
+    def _gauges(self) -> Dict[str, float]:
+        gauges = {
+            "workers": self.workers,
+            "in_flight": self._limiter.running if self._limiter else 0,
+            "queued": self._limiter.waiting if self._limiter else 0,
+            "sessions": len(self._sessions),
+            "connections": self._connections,
+        }
+        pool = self.resources.get(OLLAMA_CLIENT).pool.stats.snapshot()
+        gauges.update(http_pool_hits=pool["hits"], http_pool_misses=pool["misses"])
+        return gauges
+
+    ROUTES = {
+        ("POST", "/v1/reply"): "_reply",
+        ("GET", "/v1/memory"): "_memory",
+        ("POST", "/v1/memory"): "_memory",
+        ("GET", "/v1/search"): "_search",
+    }
+
+    # ---- HTTP plumbing ----
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections += 1
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), KEEPALIVE_SECONDS)
+                except HTTPError as e:
+                    await self._send_json(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    return
+                if request is None:
+                    return
+                if not await self._dispatch(request, reader, writer):
+                    return
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections -= 1
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Request]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None  # client closed the connection between requests
+        except asyncio.LimitOverrunError:
+            raise HTTPError(413, "Headers too large")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(400, "Chunked request bodies are not supported; send Content-Length")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "Bad Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"Body larger than {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method.upper(), target, version, headers, body)
+
+    async def _dispatch(self, request: Request, reader: asyncio.StreamReader,
+                        writer: asyncio.StreamWriter) -> bool:
+        """Answer one request; False if the connection should be closed"""
+        start = time.perf_counter()
+        # Unknown paths share one label so scanners can't blow up the metric count
+        route = request.path if request.path in PATHS else "other"
+        status = 200
+        try:
+            if request.path == "/healthz":
+                await self._send_json(writer, 200, {"status": "ok"}, request.keep_alive)
+            elif request.path == "/metrics":
+                body = self.metrics.render(self._gauges()).encode()
+                await self._send(writer, 200, body, "text/plain; version=0.0.4", request.keep_alive)
+            elif request.path == "/v1/reply/stream" and request.method == "POST":
+                status = await self._reply_stream(request, writer)
+                return status == 200 and request.keep_alive
+            elif request.path == "/v1/ws" and request.headers.get("upgrade", "").lower() == "websocket":
+                status = 101
+                await self._websocket(request, reader, writer)
+                return False
+            else:
+                handler = self.ROUTES.get((request.method, request.path))
+                if handler is None:
+                    raise HTTPError(405 if route != "other" else 404, f"No route for {request.method} {request.path}")
+                result = await asyncio.wait_for(getattr(self, handler)(request), self.timeout)
+                await self._send_json(writer, 200, result, request.keep_alive)
+        except HTTPError as e:
+            status = e.status
+            headers = {"Retry-After": "1"} if e.status in (409, 503) else None
+            await self._send_json(writer, status, {"error": str(e)}, request.keep_alive, headers)
+        except asyncio.TimeoutError:
+            status = 504
+            await self._send_json(writer, 504, {"error": f"Timed out after {self.timeout:g}s"}, request.keep_alive)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            raise  # the client is gone (or hung up its WebSocket); nothing to answer
+        except Exception as e:
+            status = 500
+            await self._send_json(writer, 500, {"error": str(e)}, request.keep_alive)
+        finally:
+            self.metrics.observe(route, status, time.perf_counter() - start)
+        return request.keep_alive
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, body: bytes, content_type: str,
+                    keep_alive: bool, headers: Optional[Dict[str, str]] = None) -> None:
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, data: Dict, keep_alive: bool,
+                         headers: Optional[Dict[str, str]] = None) -> None:
+        await self._send(writer, status, json.dumps(data).encode(), "application/json", keep_alive, headers)
+
+    async def _reply_stream(self, request: Request, writer: asyncio.StreamWriter) -> int:
+        """NDJSON over chunked encoding; errors after the headers arrive as a final line"""
+        data = request.json()
+        started = False
+
+        async def line(obj: Dict) -> None:
+            nonlocal started
+            if not started:
+                started = True
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                             b"Transfer-Encoding: chunked\r\nCache-Control: no-cache\r\n"
+                             + f"Connection: {'keep-alive' if request.keep_alive else 'close'}\r\n\r\n".encode())
+            chunk = json.dumps(obj).encode() + b"\n"
+            writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            await writer.drain()
+
+        try:
+            result = await asyncio.wait_for(
+                self._generate(data.get("session"), str(data.get("message", "")), bool(data.get("search")),
+                               emit=lambda token: line({"token": token})),
+                self.timeout)
+            await line(dict(result, done=True))
+            status = 200
+        except ConnectionError:
+            raise
+        except Exception as e:
+            if not started:
+                raise
+            # Headers are out, so the error can only be the last line; the
+            # connection is closed after it (any status but 200 closes it)
+            if isinstance(e, HTTPError):
+                status = e.status
+            elif isinstance(e, asyncio.TimeoutError):
+                status = 504
+                e = f"Timed out after {self.timeout:g}s"
+            else:
+                status = 500
+            await line({"error": str(e), "status": status})
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return status
+
+    # ---- WebSocket ----
+
+    async def _websocket(self, request: Request, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        key = request.headers.get("sec-websocket-key")
+        if not key:
+            raise HTTPError(400, "Missing Sec-WebSocket-Key")
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        await writer.drain()
+
+        async def send(obj: Dict) -> None:
+            await self._ws_send(writer, 0x1, json.dumps(obj).encode())
+
+        while True:
+            opcode, payload = await self._ws_read(reader)
+            if opcode == 0x8:  # close
+                await self._ws_send(writer, 0x8, payload[:2])
+                return
+            if opcode == 0x9:  # ping
+                await self._ws_send(writer, 0xA, payload)
+                continue
+            if opcode != 0x1:
+                continue
+            start = time.perf_counter()
+            status = 200
+            try:
+                data = json.loads(payload)
+                result = await asyncio.wait_for(
+                    self._generate(data.get("session"), str(data.get("message", "")), bool(data.get("search")),
+                                   emit=lambda token: send({"token": token})),
+                    self.timeout)
+                await send(dict(result, done=True))
+            except (ValueError, AttributeError):
+                status = 400
+                await send({"error": "Messages must be JSON objects", "status": status})
+            except HTTPError as e:
+                status = e.status
+                await send({"error": str(e), "status": status})
+            except asyncio.TimeoutError:
+                status = 504
+                await send({"error": f"Timed out after {self.timeout:g}s", "status": status})
+            except ConnectionError:
+                raise
+            except Exception as e:
+                # The socket is upgraded, so this goes out as a frame, never an HTTP response
+                status = 500
+                await send({"error": str(e), "status": status})
+                await self._ws_send(writer, 0x8, struct.pack("!H", 1011))
+                return
+            finally:
+                self.metrics.observe("/v1/ws/message", status, time.perf_counter() - start)
+
+    @staticmethod
+    async def _ws_read(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+        b1, b2 = await reader.readexactly(2)
+        opcode, masked, length = b1 & 0x0F, b2 & 0x80, b2 & 0x7F
+        if not b1 & 0x80:
+            raise ConnectionError("Fragmented WebSocket messages are not supported")
+        if length == 126:
+            (length,) = struct.unpack("!H", await reader.readexactly(2))
+        elif length == 127:
+            (length,) = struct.unpack("!Q", await reader.readexactly(8))
+        if length > MAX_BODY_BYTES:
+            raise ConnectionError("WebSocket message too large")
+        mask = await reader.readexactly(4) if masked else b""
+        payload = await reader.readexactly(length)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return opcode, payload
+
+    @staticmethod
+    async def _ws_send(writer: asyncio.StreamWriter, opcode: int, payload: bytes) -> None:
+        length = len(payload)
+        if length < 126:
+            head = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 1 << 16:
+            head = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            head = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        writer.write(head + payload)
+        await writer.drain()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve LisaAgent over HTTP and WebSocket")
+    parser.add_argument("--host", default=os.getenv("LISA_API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("LISA_API_PORT", "8080")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("LISA_API_WORKERS", "8")),
+                        help="concurrent generations")
+    parser.add_argument("--max-queue", type=int, default=int(os.getenv("LISA_API_QUEUE", "32")),
+                        help="requests allowed to wait for a worker before 503")
+    parser.add_argument("--timeout", type=float, default=float(os.getenv("LISA_API_TIMEOUT", "120")),
+                        help="seconds per request before 504")
+    parser.add_argument("--max-sessions", type=int, default=int(os.getenv("LISA_API_SESSIONS", "1000")))
+    args = parser.parse_args(argv)
+
+    server = LisaServer(workers=args.workers, max_queue=args.max_queue, timeout=args.timeout,
+                        max_sessions=args.max_sessions)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
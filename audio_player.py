@@ -0,0 +1,133 @@
+"""Audio Player Module for Lisa-Agent
+
+Plays MP3 audio held in memory without writing it to disk. PipePlayer
+keeps one ``mpg123`` process running and streams each clip to it over
+stdin, so an utterance costs neither a temp file nor a process spawn.
+Clip length is read from the MP3 frame headers, which lets playback be
+timed and cancelled even though the player itself never reports back.
+"""
+
+import shutil
+import subprocess
+import threading
+import time
+from typing import List, Optional
+
+# Layer III bitrates (kbps) by bitrate index, for MPEG-1 and MPEG-2/2.5
+_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+# Sample rates by version bits (0: MPEG-2.5, 2: MPEG-2, 3: MPEG-1)
+_SAMPLE_RATES = {0: [11025, 12000, 8000], 2: [22050, 24000, 16000], 3: [44100, 48000, 32000]}
+
+
+def _skip_id3(data: bytes) -> int:
+    if data[:3] != b"ID3" or len(data) < 10:
+        return 0
+    size = 0
+    for b in data[6:10]:
+        size = (size << 7) | (b & 0x7F)
+    return 10 + size
+
+
+def mp3_duration(data: bytes) -> float:
+    """
+    Playing time of MPEG Layer III audio in seconds, by walking its frames.
+
+    Handles VBR and an ID3v2 tag; stops at the first byte that is not a
+    valid frame header.
+    """
+    pos, seconds, n = _skip_id3(data), 0.0, len(data)
+    while pos + 4 <= n:
+        b1, b2 = data[pos + 1], data[pos + 2]
+        if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+            break
+        version = (b1 >> 3) & 0x03
+        layer = (b1 >> 1) & 0x03
+        bitrate_index = b2 >> 4
+        rate_index = (b2 >> 2) & 0x03
+        if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+            break
+        bitrate = _BITRATES[1 if version == 3 else 2][bitrate_index] * 1000
+        sample_rate = _SAMPLE_RATES[version][rate_index]
+        samples = 1152 if version == 3 else 576
+        padding = (b2 >> 1) & 0x01
+        pos += samples // 8 * bitrate // sample_rate + padding
+        seconds += samples / sample_rate
+    return seconds
+
+
+class PipePlayer:
+    """A persistent MP3 player process fed over a pipe"""
+
+    def __init__(self, command: Optional[List[str]] = None):
+        """
+        Args:
+            command: Player reading MP3 from stdin (default: mpg123 -q -)
+        """
+        self.command = command or ["mpg123", "-q", "-"]
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        # When the audio already written to the pipe will have finished
+        self._busy_until = 0.0
+
+    @classmethod
+    def available(cls) -> bool:
+        return shutil.which("mpg123") is not None
+
+    def _ensure_process(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(self.command, stdin=subprocess.PIPE,
+                                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self._busy_until = 0.0
+        return self._process
+
+    def play(self, data: bytes, cancel: Optional[threading.Event] = None) -> bool:
+        """
+        Play a clip, blocking until it should have finished or ``cancel`` is set.
+
+        Returns:
+            True if playback ran to completion
+        """
+        with self._lock:
+            process = self._ensure_process()
+            try:
+                process.stdin.write(data)
+                process.stdin.flush()
+            except (BrokenPipeError, OSError):
+                # Player died; restart it once
+                self._process = None
+                process = self._ensure_process()
+                process.stdin.write(data)
+                process.stdin.flush()
+            start = max(time.monotonic(), self._busy_until)
+            self._busy_until = start + mp3_duration(data)
+            end = self._busy_until
+        remaining = max(0.0, end - time.monotonic())
+        if cancel is None:
+            time.sleep(remaining)
+            return True
+        if cancel.wait(remaining):
+            self.stop()
+            return False
+        return True
+
+    def stop(self) -> None:
+        """Cut playback off; audio already in the pipe can't be recalled, so the player restarts"""
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+            self._busy_until = 0.0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                self._process.stdin.close()
+                try:
+                    self._process.wait(timeout=1)
+                except subprocess.TimeoutExpired:
+                    self._process.kill()
+            self._process = None
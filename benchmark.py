@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""Benchmark Suite for Lisa-Agent
+
+Starts local stand-in servers for Ollama and the DuckDuckGo/Bing APIs,
+then drives LisaAgent.reply, WebSearchEngine.search and the mode
+handlers at a configurable concurrency. Results (p50/p95/p99 latency,
+time-to-first-token, requests/sec, peak RSS) are printed as JSON so runs
+can be diffed between versions.
+
+Run:
+  python benchmark.py --requests 200 --concurrency 16 --token-rate 200
+  python benchmark.py --scenarios reply --output bench.json
+  python benchmark.py --scenarios startup   # import-time profile
+"""
+
+import argparse
+import gc
+import json
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from mock_servers import mock_ollama, mock_search
+
+
+# --------------------------- Measurement ---------------------------
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], elapsed: float, ttfts: Optional[List[float]] = None,
+              errors: int = 0) -> Dict:
+    """Reduce raw timings (seconds) to a JSON-friendly summary in milliseconds"""
+    lat = sorted(latencies)
+    result = {
+        "requests": len(lat),
+        "errors": errors,
+        "rps": len(lat) / elapsed if elapsed else 0.0,
+        "latency_ms": {p: _percentile(lat, q) * 1000 for p, q in (("p50", 50), ("p95", 95), ("p99", 99))},
+    }
+    if ttfts:
+        ttft = sorted(ttfts)
+        result["ttft_ms"] = {p: _percentile(ttft, q) * 1000 for p, q in (("p50", 50), ("p95", 95), ("p99", 99))}
+    return result
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process, or None where it can't be read (Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_load(fn: Callable[[int], Optional[float]], requests: int, concurrency: int) -> Dict:
+    """
+    Call ``fn(i)`` ``requests`` times from ``concurrency`` threads.
+
+    ``fn`` may return a time-to-first-token in seconds, which is reported
+    alongside the end-to-end latency.
+    """
+    latencies, ttfts, errors = [], [], 0
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            ttft = fn(i)
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        latency = time.perf_counter() - start
+        with lock:
+            latencies.append(latency)
+            if ttft is not None:
+                ttfts.append(ttft)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    return summarize(latencies, time.perf_counter() - start, ttfts, errors)
+
+
+# --------------------------- Scenarios ---------------------------
+
+
+def bench_reply(ollama_url: str, requests: int, concurrency: int, stream: bool = True) -> Dict:
+    from http_pool import HTTPPool, PoolConfig
+    from lisa_agent import LisaAgent, OllamaClient
+
+    pool = HTTPPool(PoolConfig(pool_maxsize=concurrency))
+    agent = LisaAgent(OllamaClient(ollama_url, model="mock", pool=pool))
+    prompts = ["Tell me a joke about coffee", "I need a pep talk", "How do I learn faster?", "What is Python?"]
+
+    def one(i: int) -> Optional[float]:
+        prompt = prompts[i % len(prompts)]
+        if not stream:
+            agent.reply(prompt)
+            return None
+        start = time.perf_counter()
+        ttft = None
+        for _ in agent.reply_stream(prompt):
+            if ttft is None:
+                ttft = time.perf_counter() - start
+        return ttft
+
+    result = run_load(one, requests, concurrency)
+    result["pool"] = pool.stats.snapshot()
+    pool.close()
+    return result
+
+
+def bench_search(search_url: str, requests: int, concurrency: int) -> Dict:
+    from http_pool import HTTPPool, PoolConfig
+    from web_search import WebSearchEngine
+
+    pool = HTTPPool(PoolConfig(pool_maxsize=concurrency))
+    engine = WebSearchEngine(bing_api_key="mock", pool=pool)
+    engine.ddg_base_url = f"{search_url}/"
+    engine.bing_base_url = f"{search_url}/v7.0/search"
+
+    def one(i: int) -> None:
+        if not engine.search(f"topic {i % 50}"):
+            raise RuntimeError("empty results")
+
+    result = run_load(one, requests, concurrency)
+    result["pool"] = pool.stats.snapshot()
+    pool.close()
+    return result
+
+
+def bench_modes(requests: int, concurrency: int) -> Dict:
+    from fu2_protection_mode import FU2ProtectionMode
+    from okay_support_mode import OkaySupportMode
+
+    messages = ["someone hurt me today", "i'm feeling down and i feel hopeless",
+                "what should i do about my project", "just saying hi"]
+
+    def one(i: int) -> None:
+        message = messages[i % len(messages)]
+        fu2, okay = FU2ProtectionMode(), OkaySupportMode()
+        fu2.respond(message)
+        okay.process_message(message)
+
+    return run_load(one, requests, concurrency)
+
+
+# Modules timed by the startup scenario, with the objects a session builds first
+STARTUP_MODULES = ["lisa_agent", "web_search", "voice_interaction", "streamlit_ui"]
+_CONSTRUCTORS = {
+    "lisa_agent": "lisa_agent.LisaAgent()",
+    "web_search": "web_search.get_engine()",
+    "voice_interaction": "voice_interaction.VoiceAssistant(enable_stt=False)",
+}
+
+
+def profile_import(module: str, top: int = 8) -> Dict:
+    """
+    Import ``module`` in a fresh interpreter under ``-X importtime``.
+
+    Returns:
+        Total import time, the slowest imports by their own (self) time,
+        and how long the module's main constructor takes afterwards
+    """
+    code = f"import time, {module}\n"
+    constructor = _CONSTRUCTORS.get(module)
+    if constructor:
+        code += (f"start = time.perf_counter()\ntry:\n    {constructor}\nexcept Exception:\n    pass\n"
+                 f"print(round((time.perf_counter() - start) * 1000, 2))\n")
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, timeout=120)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1:] or ["import failed"]}
+    imports = []
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        imports.append((int(self_us), int(cumulative_us), name.strip()))
+    total = next((c for _, c, name in imports if name == module), None)
+    result = {
+        "process_ms": round(wall_ms, 1),
+        "import_ms": round(total / 1000, 1) if total is not None else None,
+        "modules": len(imports),
+        "slowest": [{"module": name, "self_ms": round(s / 1000, 1), "cumulative_ms": round(c / 1000, 1)}
+                    for s, c, name in sorted(imports, reverse=True)[:top]],
+    }
+    if constructor:
+        output = proc.stdout.strip().splitlines()
+        result["construct_ms"] = float(output[-1]) if output else None
+    return result
+
+
+def bench_startup(modules: Optional[List[str]] = None) -> Dict:
+    """Cold import and construction cost of each entry point, one fresh process each"""
+    return {module: profile_import(module) for module in modules or STARTUP_MODULES}
+
+
+def bench_sessions(counts: Optional[List[int]] = None) -> Dict:
+    """
+    Memory allocated per UI session, built the way streamlit_ui builds one.
+
+    Shared clients and caches are created by the first session; later
+    sessions should only add their own agent and conversation.
+    """
+    import lisa_agent
+    from conversation import ConversationContext
+    from shared_resources import OLLAMA_CLIENT, RESOURCES, RESPONSE_CACHE, SEARCH_ENGINE, Session
+
+    report = {}
+    for count in counts or [1, 10, 100]:
+        gc.collect()
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        sessions = []
+        for _ in range(count):
+            resources = Session()
+            agent = lisa_agent.LisaAgent(client=resources.get(OLLAMA_CLIENT), cache=resources.get(RESPONSE_CACHE),
+                                         search=resources.get(SEARCH_ENGINE), conversation=ConversationContext())
+            sessions.append((resources, agent))
+        used = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+        report[str(count)] = {"bytes": used, "bytes_per_session": used // count, "shared": RESOURCES.stats()}
+        for resources, _ in sessions:
+            resources.close()
+        del sessions
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Lisa-Agent against local mock servers")
+    parser.add_argument("--requests", type=int, default=100, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent callers")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="mock Ollama tokens/sec per stream")
+    parser.add_argument("--tokens", type=int, default=40, help="tokens per mock completion")
+    parser.add_argument("--first-token-delay", type=float, default=0.05, help="mock prompt processing time (s)")
+    parser.add_argument("--search-latency", type=float, default=0.02, help="mock search API latency (s)")
+    parser.add_argument("--scenarios", default="reply,reply_blocking,search,modes",
+                        help="comma-separated: reply, reply_blocking, search, modes, startup, sessions")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    report = {
+        "config": vars(args),
+        "python": sys.version.split()[0],
+        "scenarios": {},
+    }
+    with mock_ollama(args.token_rate, args.tokens, args.first_token_delay) as ollama, \
+            mock_search(args.search_latency) as search:
+        for name in scenarios:
+            if name == "reply":
+                result = bench_reply(ollama.url, args.requests, args.concurrency, stream=True)
+            elif name == "reply_blocking":
+                result = bench_reply(ollama.url, args.requests, args.concurrency, stream=False)
+            elif name == "search":
+                result = bench_search(search.url, args.requests, args.concurrency)
+            elif name == "modes":
+                result = bench_modes(args.requests, args.concurrency)
+            elif name == "startup":
+                result = bench_startup()
+            elif name == "sessions":
+                result = bench_sessions()
+            else:
+                parser.error(f"unknown scenario: {name}")
+            report["scenarios"][name] = result
+    report["peak_rss_mb"] = peak_rss_mb()
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as fp:
+            fp.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
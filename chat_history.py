@@ -0,0 +1,117 @@
+"""Chat History Module for Lisa-Agent
+
+Bounded, windowed chat history for the UI. Only the most recent messages
+are kept in memory, each with its rendered HTML cached, so redrawing the
+visible tail costs the same however long the conversation has grown.
+Older messages are compacted to a JSONL archive on disk and read back a
+page at a time when the user scrolls up.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import weakref
+from array import array
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+# Renders one message as HTML: (role, content, timestamp) -> str
+Renderer = Callable[[str, str, str], str]
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class ChatHistory:
+    """Recent messages in memory, older ones archived to disk"""
+
+    def __init__(self, render: Renderer, max_in_memory: int = 200, path: Optional[str] = None):
+        """
+        Initialize an empty history.
+
+        Args:
+            render: Turns a message into HTML; called once per message
+            max_in_memory: Messages kept in memory; older ones are archived
+            path: JSONL archive file (default: a temp file removed with the history)
+        """
+        self.render = render
+        self.max_in_memory = max_in_memory
+        self.path = path
+        self._recent: Deque[Dict] = deque()
+        # Byte offset of each archived message, for reading any page directly
+        self._offsets = array("q")
+        self._lock = threading.Lock()
+        self._finalizer = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._offsets) + len(self._recent)
+
+    @property
+    def archived(self) -> int:
+        """Messages moved out of memory"""
+        return len(self._offsets)
+
+    def append(self, role: str, content: str, timestamp: str) -> Dict:
+        """Add a message, rendering it now so later redraws reuse the HTML"""
+        message = {'role': role, 'content': content, 'timestamp': timestamp,
+                   'html': self.render(role, content, timestamp)}
+        with self._lock:
+            self._recent.append(message)
+            if len(self._recent) > self.max_in_memory:
+                self._compact()
+        return message
+
+    def _compact(self) -> None:
+        # Caller holds self._lock; archive the older half in one write
+        if self.path is None:
+            fd, self.path = tempfile.mkstemp(prefix="lisa-chat-", suffix=".jsonl")
+            os.close(fd)
+            self._finalizer = weakref.finalize(self, _remove, self.path)
+        moving = len(self._recent) - self.max_in_memory // 2
+        with open(self.path, "ab") as fp:
+            offset = fp.tell()
+            for _ in range(moving):
+                message = self._recent.popleft()
+                line = json.dumps({k: message[k] for k in ('role', 'content', 'timestamp')}).encode() + b"\n"
+                fp.write(line)
+                self._offsets.append(offset)
+                offset += len(line)
+
+    def tail(self, count: int) -> List[Dict]:
+        """The last ``count`` messages, oldest first"""
+        return self.window(max(0, len(self) - count), len(self))
+
+    def window(self, start: int, end: int) -> List[Dict]:
+        """Messages ``start`` to ``end`` (exclusive), oldest first, each with its 'html'"""
+        with self._lock:
+            archived = len(self._offsets)
+            start, end = max(0, start), min(end, archived + len(self._recent))
+            messages = self._read_archive(start, min(end, archived)) if start < archived else []
+            first = max(start, archived) - archived
+            messages.extend(self._recent[i] for i in range(first, end - archived))
+        return messages
+
+    def _read_archive(self, start: int, end: int) -> List[Dict]:
+        # Caller holds self._lock; pages from disk are rendered again, not cached
+        messages = []
+        with open(self.path, "rb") as fp:
+            fp.seek(self._offsets[start])
+            for _ in range(start, end):
+                message = json.loads(fp.readline())
+                message['html'] = self.render(message['role'], message['content'], message['timestamp'])
+                messages.append(message)
+        return messages
+
+    def clear(self) -> None:
+        """Forget every message, including the archive"""
+        with self._lock:
+            self._recent.clear()
+            del self._offsets[:]
+            if self.path is not None and os.path.exists(self.path):
+                open(self.path, "wb").close()
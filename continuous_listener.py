@@ -0,0 +1,336 @@
+"""Continuous Listener Module for Lisa-Agent
+
+Keeps one audio stream open for the whole conversation instead of
+opening the microphone and recalibrating for a second on every turn:
+
+- A capture thread reads fixed-size frames from an AudioSource.
+- An energy-based voice activity detector (VAD) splits the stream into
+  utterances. Its noise floor keeps adapting to the background during
+  silence, so no up-front calibration pause is needed.
+- Finished utterances go to a recognition worker thread, so capture
+  continues while the previous utterance is being transcribed. With a
+  streaming backend, audio is recognized while the user is still
+  talking and partial hypotheses are reported as they change.
+
+Sources are pluggable: MicrophoneSource wraps SpeechRecognition's
+microphone, and WavFileSource replays a WAV file so the whole path can
+be exercised without audio hardware.
+"""
+
+import abc
+import math
+import queue
+import threading
+import time
+import wave
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, List, Optional
+
+
+class AudioSource(abc.ABC):
+    """16-bit mono PCM stream; subclasses implement read()"""
+    sample_rate = 16000
+    sample_width = 2
+
+    @abc.abstractmethod
+    def read(self, frames: int) -> bytes:
+        """Return up to ``frames`` frames of PCM; b"" once the stream has ended"""
+
+    def close(self) -> None:
+        pass
+
+
+class WavFileSource(AudioSource):
+    """Replays a 16-bit mono WAV file, optionally at real-time pace"""
+
+    def __init__(self, path: str, realtime: bool = False):
+        """
+        Args:
+            path: WAV file to read
+            realtime: Sleep so frames arrive no faster than they would from a microphone
+        """
+        self._wav = wave.open(path, "rb")
+        if self._wav.getsampwidth() != 2 or self._wav.getnchannels() != 1:
+            self._wav.close()
+            raise ValueError(f"{path}: expected 16-bit mono PCM")
+        self.sample_rate = self._wav.getframerate()
+        self.realtime = realtime
+        self._started = time.monotonic()
+        self._frames_read = 0
+
+    def read(self, frames: int) -> bytes:
+        data = self._wav.readframes(frames)
+        self._frames_read += len(data) // self.sample_width
+        if self.realtime:
+            due = self._started + self._frames_read / self.sample_rate
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return data
+
+    def close(self) -> None:
+        self._wav.close()
+
+
+class MicrophoneSource(AudioSource):
+    """Microphone stream opened once and kept open (needs SpeechRecognition + PyAudio)"""
+
+    def __init__(self, device_index: Optional[int] = None, sample_rate: int = 16000):
+        import speech_recognition as sr
+
+        self._mic = sr.Microphone(device_index=device_index, sample_rate=sample_rate)
+        self._mic.__enter__()
+        self.sample_rate = self._mic.SAMPLE_RATE
+        self.sample_width = self._mic.SAMPLE_WIDTH
+
+    def read(self, frames: int) -> bytes:
+        return self._mic.stream.read(frames)
+
+    def close(self) -> None:
+        self._mic.__exit__(None, None, None)
+
+
+def frame_rms(pcm: bytes) -> float:
+    """Root-mean-square energy of a 16-bit PCM frame"""
+    samples = array("h", pcm[: len(pcm) - len(pcm) % 2])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+@dataclass
+class Utterance:
+    """One segment of speech found by the VAD"""
+    pcm: bytes
+    sample_rate: int
+    sample_width: int
+    started_at: float
+    ended_at: float
+    # Streaming recognition session already fed this audio, if any
+    session: Any = None
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / (self.sample_rate * self.sample_width)
+
+
+class EnergyVAD:
+    """Energy-threshold voice activity detector with an adaptive noise floor"""
+
+    def __init__(self, ratio: float = 3.0, min_energy: float = 300.0, adapt: float = 0.05,
+                 start_frames: int = 3, end_frames: int = 25):
+        """
+        Args:
+            ratio: A frame is speech when its energy exceeds noise floor * ratio
+            min_energy: Energy that always counts as silence, whatever the floor
+            adapt: Weight of each silent frame in the running noise floor
+            start_frames: Consecutive speech frames needed to start an utterance
+            end_frames: Consecutive silent frames that end it (the hangover)
+        """
+        self.ratio = ratio
+        self.min_energy = min_energy
+        self.adapt = adapt
+        self.start_frames = start_frames
+        self.end_frames = end_frames
+        self.noise_floor: Optional[float] = None
+        self.in_speech = False
+        self._run = 0
+
+    def threshold(self) -> float:
+        return max(self.min_energy, (self.noise_floor or 0.0) * self.ratio)
+
+    def update(self, energy: float) -> Optional[str]:
+        """
+        Feed one frame's energy.
+
+        Returns:
+            "start" or "end" when an utterance begins or ends, else None
+        """
+        if self.noise_floor is None:
+            self.noise_floor = energy
+        voiced = energy > self.threshold()
+        if not voiced:
+            # Recalibrate continuously on background noise only
+            self.noise_floor += self.adapt * (energy - self.noise_floor)
+        if self.in_speech:
+            self._run = 0 if voiced else self._run + 1
+            if self._run >= self.end_frames:
+                self.in_speech, self._run = False, 0
+                return "end"
+        else:
+            self._run = self._run + 1 if voiced else 0
+            if self._run >= self.start_frames:
+                self.in_speech, self._run = True, 0
+                return "start"
+        return None
+
+
+class ContinuousListener:
+    """Always-open capture with VAD segmentation and background recognition"""
+
+    # Most recent utterances kept in recognition_latencies
+    LATENCY_SAMPLES = 200
+
+    def __init__(self, source: AudioSource, recognize: Callable[[Utterance], Optional[str]],
+                 vad: Optional[EnergyVAD] = None, frame_ms: int = 30, pre_roll_ms: int = 300,
+                 min_speech_ms: int = 250, max_utterance_s: float = 15.0,
+                 on_speech_start: Optional[Callable[[], None]] = None,
+                 stream: Optional[Callable[[int, int], Any]] = None,
+                 on_partial: Optional[Callable[[str], None]] = None):
+        """
+        Initialize the listener (call start() to begin capturing).
+
+        Args:
+            source: Where audio comes from
+            recognize: Turns an utterance into text (None if nothing was understood)
+            vad: Voice activity detector (default: EnergyVAD())
+            frame_ms: Analysis frame length
+            pre_roll_ms: Audio kept from before speech onset, so first syllables aren't clipped
+            min_speech_ms: Shorter segments (clicks, coughs) are dropped
+            max_utterance_s: Long utterances are cut and sent at this length
+            on_speech_start: Called from the capture thread when speech begins,
+                e.g. to stop Lisa talking (barge-in)
+            stream: Starts a streaming recognition session (see
+                speech_backends.RecognizerBackend.stream); audio is then fed
+                to it while the user talks and ``recognize`` is not used
+            on_partial: Called with each new partial hypothesis
+        """
+        self.source = source
+        self.recognize = recognize
+        self.vad = vad or EnergyVAD()
+        self.frame_samples = source.sample_rate * frame_ms // 1000
+        self.pre_roll_frames = max(1, pre_roll_ms // frame_ms)
+        self.min_speech_bytes = source.sample_rate * source.sample_width * min_speech_ms // 1000
+        self.max_utterance_bytes = int(source.sample_rate * source.sample_width * max_utterance_s)
+        self.on_speech_start = on_speech_start
+        self.stream = stream
+        self.on_partial = on_partial
+        # Finished utterances waiting for recognition, and recognized text
+        self._utterances: "queue.Queue[Optional[Utterance]]" = queue.Queue()
+        self._results: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.recognition_latencies: Deque[float] = deque(maxlen=self.LATENCY_SAMPLES)
+
+    def start(self) -> "ContinuousListener":
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="lisa-stt-capture", daemon=True),
+            threading.Thread(target=self._recognize_loop, name="lisa-stt-recognize", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def _capture_loop(self) -> None:
+        bytes_per_frame = self.frame_samples * self.source.sample_width
+        pre_roll: Deque[bytes] = deque(maxlen=self.pre_roll_frames)
+        current: List[bytes] = []
+        size = 0
+        started_at = 0.0
+        session = None
+        partial = None
+        try:
+            while not self._stop.is_set():
+                frame = self.source.read(self.frame_samples)
+                if not frame:
+                    break
+                if len(frame) < bytes_per_frame:
+                    frame += b"\0" * (bytes_per_frame - len(frame))
+                event = self.vad.update(frame_rms(frame))
+                if event == "start":
+                    current, size = list(pre_roll), sum(len(f) for f in pre_roll)
+                    started_at = time.monotonic()
+                    pre_roll.clear()
+                    session = self._start_session(current)
+                    if self.on_speech_start is not None:
+                        self.on_speech_start()
+                if self.vad.in_speech or event == "end":
+                    current.append(frame)
+                    size += len(frame)
+                    if session is not None:
+                        hypothesis = session.accept(frame)
+                        if hypothesis and hypothesis != partial and self.on_partial is not None:
+                            partial = hypothesis
+                            self.on_partial(hypothesis)
+                    if event == "end" or size >= self.max_utterance_bytes:
+                        self._emit(current, started_at, session)
+                        current, size, partial = [], 0, None
+                        started_at = time.monotonic()
+                        session = self._start_session([]) if self.vad.in_speech else None
+                else:
+                    pre_roll.append(frame)
+            if current:
+                self._emit(current, started_at, session)
+        except Exception as e:
+            print(f"Audio capture error: {e}")
+        finally:
+            self._utterances.put(None)
+
+    def _start_session(self, frames: List[bytes]) -> Any:
+        if self.stream is None:
+            return None
+        session = self.stream(self.source.sample_rate, self.source.sample_width)
+        for frame in frames:
+            session.accept(frame)
+        return session
+
+    def _emit(self, frames: List[bytes], started_at: float, session: Any = None) -> None:
+        pcm = b"".join(frames)
+        if len(pcm) < self.min_speech_bytes:
+            return
+        self._utterances.put(Utterance(pcm, self.source.sample_rate, self.source.sample_width,
+                                       started_at, time.monotonic(), session))
+
+    def _recognize_loop(self) -> None:
+        while True:
+            utterance = self._utterances.get()
+            if utterance is None:
+                self._results.put(None)
+                return
+            try:
+                if utterance.session is not None:
+                    text = utterance.session.final()
+                else:
+                    text = self.recognize(utterance)
+            except Exception as e:
+                print(f"Speech recognition error: {e}")
+                text = None
+            # Latency the user feels: end of speech to text
+            self.recognition_latencies.append(time.monotonic() - utterance.ended_at)
+            if text:
+                self._results.put(text)
+
+    def listen(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Next recognized utterance.
+
+        Returns:
+            Text, or None on timeout or once the source has ended
+        """
+        try:
+            text = self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if text is None:
+            # Keep reporting the end to later callers too
+            self._results.put(None)
+        return text
+
+    def discard_pending(self) -> None:
+        """Drop recognized text nobody has read yet (e.g. Lisa hearing herself)"""
+        while True:
+            try:
+                text = self._results.get_nowait()
+            except queue.Empty:
+                return
+            if text is None:
+                self._results.put(None)
+                return
+
+    def stop(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self.source.close()
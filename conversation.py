@@ -0,0 +1,169 @@
+"""Conversation Context Module for Lisa-Agent
+
+Keeps multi-turn history for LisaAgent without resending the whole
+transcript every turn:
+
+- Recent turns are kept in a rolling window sized to a token budget.
+- Turns that fall out of the window are folded into a running summary
+  on a background thread.
+- While the window is intact, Ollama's returned ``context`` array is
+  passed back so the model reuses its cached state and only the new
+  turn is sent as prompt text.
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from tokens import estimate_tokens
+
+SUMMARY_INSTRUCTIONS = (
+    "Summarize this conversation between a user and Lisa in at most five short "
+    "bullet points. Keep names, facts and decisions the user shared; drop small talk."
+)
+
+
+@dataclass
+class Turn:
+    user: str
+    assistant: str
+
+    def render(self) -> str:
+        return f"User: {self.user}\nAssistant: {self.assistant}"
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.render())
+
+
+@dataclass
+class TurnStats:
+    """Prompt size for one turn, as estimated locally and as reported by Ollama"""
+    prompt_tokens_sent: int
+    reused_context: bool
+    prompt_eval_count: Optional[int] = None
+    eval_count: Optional[int] = None
+
+
+class ConversationContext:
+    """Token-budgeted rolling window of turns plus a background summary"""
+
+    # Most recent turns kept in turn_stats
+    STATS_TURNS = 100
+
+    def __init__(self, token_budget: int = 1500, summarizer: Optional[Callable[[str], str]] = None,
+                 reuse_context: bool = True):
+        """
+        Initialize the conversation.
+
+        Args:
+            token_budget: Estimated tokens of history (summary + window) to keep
+            summarizer: Callable turning transcript text into a summary; when
+                None, turns that leave the window are dropped
+            reuse_context: Pass Ollama's returned context array back on the
+                next turn instead of resending the transcript
+        """
+        self.token_budget = token_budget
+        self.summarizer = summarizer
+        self.reuse_context = reuse_context
+        self.turns: Deque[Turn] = deque()
+        self.summary = ""
+        self.turn_stats: Deque[TurnStats] = deque(maxlen=self.STATS_TURNS)
+        self._window_tokens = 0
+        self._ollama_context: Optional[List[int]] = None
+        self._pending: List[Turn] = []
+        self._lock = threading.Lock()
+        self._summarizing: Optional[threading.Thread] = None
+
+    def build_prompt(self, user_input: str) -> Tuple[str, Optional[List[int]]]:
+        """
+        Build the prompt for the next turn.
+
+        Returns:
+            (prompt text, Ollama context array or None)
+        """
+        current = f"User: {user_input}\nAssistant:"
+        with self._lock:
+            if self._ollama_context is not None:
+                prompt, context = current, self._ollama_context
+            else:
+                parts = []
+                if self.summary:
+                    parts.append(f"Summary of the earlier conversation:\n{self.summary}")
+                parts.extend(turn.render() for turn in self.turns)
+                parts.append(current)
+                prompt, context = "\n\n".join(parts), None
+            self.turn_stats.append(TurnStats(estimate_tokens(prompt), context is not None))
+        return prompt, context
+
+    def record(self, user_input: str, reply: str, meta: Optional[Dict] = None) -> None:
+        """
+        Add a finished turn.
+
+        Args:
+            user_input: What the user said
+            reply: Lisa's full reply
+            meta: Fields from Ollama's final response (context, prompt_eval_count, eval_count)
+        """
+        meta = meta or {}
+        turn = Turn(user_input, reply)
+        with self._lock:
+            if self.turn_stats:
+                self.turn_stats[-1].prompt_eval_count = meta.get("prompt_eval_count")
+                self.turn_stats[-1].eval_count = meta.get("eval_count")
+            self.turns.append(turn)
+            self._window_tokens += turn.tokens
+            trimmed = False
+            while len(self.turns) > 1 and self._window_tokens + estimate_tokens(self.summary) > self.token_budget:
+                old = self.turns.popleft()
+                self._window_tokens -= old.tokens
+                self._pending.append(old)
+                trimmed = True
+            # The model's cached context still contains trimmed turns, so
+            # the next prompt is rebuilt from the summary and window instead.
+            if self.reuse_context and not trimmed and meta.get("context"):
+                self._ollama_context = meta["context"]
+            else:
+                self._ollama_context = None
+            start_summary = trimmed and self.summarizer is not None and self._summarizing is None
+            if trimmed and self.summarizer is None:
+                self._pending.clear()
+            if start_summary:
+                self._summarizing = threading.Thread(target=self._summarize, name="lisa-summarizer", daemon=True)
+                self._summarizing.start()
+
+    def _summarize(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._summarizing = None
+                    return
+                pending, self._pending = self._pending, []
+                previous = self.summary
+            transcript = "\n\n".join(turn.render() for turn in pending)
+            if previous:
+                transcript = f"Earlier summary:\n{previous}\n\n{transcript}"
+            try:
+                summary = self.summarizer(transcript).strip()
+            except Exception as e:
+                print(f"Conversation summary error: {e}")
+                summary = previous
+            with self._lock:
+                self.summary = summary
+                # Prompts built from now on must include the new summary
+                self._ollama_context = None
+
+    def wait_for_summary(self, timeout: Optional[float] = None) -> None:
+        """Block until any background summarization has finished"""
+        thread = self._summarizing
+        if thread is not None:
+            thread.join(timeout)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.turns.clear()
+            self.summary = ""
+            self._window_tokens = 0
+            self._ollama_context = None
+            self._pending.clear()
@@ -0,0 +1,271 @@
+"""HTTP Connection Pool Module for Lisa-Agent
+
+Provides a shared, keep-alive connection pool used by OllamaClient and
+WebSearchEngine. Supports per-host pool sizes, retry with backoff,
+separate connect/read timeouts and connection reuse counters.
+Async clients (httpx, optional) are built from the same PoolConfig.
+"""
+
+import importlib.util
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+if TYPE_CHECKING:
+    import httpx
+
+# httpx is imported on first async use; sync-only callers never pay for it
+HTTPX_AVAILABLE = importlib.util.find_spec("httpx") is not None
+
+
+def async_connect_errors() -> Tuple[type, ...]:
+    """httpx errors raised before a request reached the server, safe to fail over on"""
+    if not HTTPX_AVAILABLE:
+        return ()
+    import httpx
+    return (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+@dataclass
+class PoolConfig:
+    """Connection pool settings shared by every client using the pool"""
+    connect_timeout: float = 5.0
+    read_timeout: float = 120.0
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    # URL prefix -> max keep-alive connections, e.g. {"http://localhost:11434": 32}
+    host_pool_sizes: Dict[str, int] = field(default_factory=dict)
+    max_retries: int = 3
+    backoff_factor: float = 0.5
+    retry_statuses: Tuple[int, ...] = (429, 502, 503, 504)
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        """
+        Build a config from environment variables.
+
+        LISA_CONNECT_TIMEOUT, LISA_READ_TIMEOUT, LISA_POOL_MAXSIZE and
+        LISA_MAX_RETRIES override the defaults when set.
+        """
+        config = cls()
+        config.connect_timeout = float(os.getenv("LISA_CONNECT_TIMEOUT", config.connect_timeout))
+        config.read_timeout = float(os.getenv("LISA_READ_TIMEOUT", config.read_timeout))
+        config.pool_maxsize = int(os.getenv("LISA_POOL_MAXSIZE", config.pool_maxsize))
+        config.max_retries = int(os.getenv("LISA_MAX_RETRIES", config.max_retries))
+        return config
+
+
+class PoolStats:
+    """Thread-safe counters for connection checkouts and new connections"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checkouts: Dict[str, int] = {}
+        self._new_connections: Dict[str, int] = {}
+
+    def record_checkout(self, host: str) -> None:
+        with self._lock:
+            self._checkouts[host] = self._checkouts.get(host, 0) + 1
+
+    def record_new_connection(self, host: str) -> None:
+        with self._lock:
+            self._new_connections[host] = self._new_connections.get(host, 0) + 1
+
+    def snapshot(self) -> Dict:
+        """
+        Return pool hit/miss counters.
+
+        A checkout that reuses an idle keep-alive connection is a hit; one
+        that has to open a new connection is a miss.
+        """
+        with self._lock:
+            per_host = {}
+            for host, checkouts in self._checkouts.items():
+                misses = self._new_connections.get(host, 0)
+                per_host[host] = {'hits': max(checkouts - misses, 0), 'misses': misses}
+        hits = sum(h['hits'] for h in per_host.values())
+        misses = sum(h['misses'] for h in per_host.values())
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else 0.0,
+            'per_host': per_host,
+        }
+
+
+def _counting_pool_classes(stats: PoolStats) -> Dict[str, type]:
+    """Build urllib3 pool classes that report into ``stats``"""
+
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        def _get_conn(self, timeout=None):
+            stats.record_checkout(self.host)
+            return super()._get_conn(timeout=timeout)
+
+        def _new_conn(self):
+            stats.record_new_connection(self.host)
+            return super()._new_conn()
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        def _get_conn(self, timeout=None):
+            stats.record_checkout(self.host)
+            return super()._get_conn(timeout=timeout)
+
+        def _new_conn(self):
+            stats.record_new_connection(self.host)
+            return super()._new_conn()
+
+    return {'http': CountingHTTPConnectionPool, 'https': CountingHTTPSConnectionPool}
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools update a PoolStats instance"""
+
+    def __init__(self, pool_classes: Dict[str, type], **kwargs):
+        self._pool_classes = pool_classes
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self._pool_classes
+
+
+class HTTPPool:
+    """Keep-alive HTTP session with pooling, retries and reuse counters"""
+
+    def __init__(self, config: Optional[PoolConfig] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            config: Pool settings (defaults to PoolConfig.from_env())
+        """
+        self.config = config or PoolConfig.from_env()
+        self.stats = PoolStats()
+        self._pool_classes = _counting_pool_classes(self.stats)
+        self.session = requests.Session()
+
+        self.session.mount("http://", self._make_adapter(self.config.pool_maxsize))
+        self.session.mount("https://", self._make_adapter(self.config.pool_maxsize))
+        # requests picks the longest matching prefix, so host entries win
+        for prefix, maxsize in self.config.host_pool_sizes.items():
+            self.session.mount(prefix.rstrip("/") + "/", self._make_adapter(maxsize))
+
+    def mount(self, prefix: str, connect_retries: Optional[int] = None) -> None:
+        """
+        Give URLs under ``prefix`` their own connection pool and retry policy.
+
+        Args:
+            prefix: URL prefix, e.g. "http://gpu1:11434"
+            connect_retries: Retries on connection errors (default:
+                config.max_retries); 0 when the caller fails over to
+                another host itself
+        """
+        prefix = prefix.rstrip("/")
+        maxsize = self.config.host_pool_sizes.get(prefix, self.config.pool_maxsize)
+        self.session.mount(prefix + "/", self._make_adapter(maxsize, connect_retries))
+
+    def _make_adapter(self, maxsize: int, connect_retries: Optional[int] = None) -> HTTPAdapter:
+        retry = Retry(
+            total=self.config.max_retries,
+            connect=self.config.max_retries if connect_retries is None else connect_retries,
+            read=self.config.max_retries,
+            status=self.config.max_retries,
+            backoff_factor=self.config.backoff_factor,
+            status_forcelist=self.config.retry_statuses,
+            # Connect errors are retried for every method; read errors and
+            # retryable statuses only for idempotent ones, so a generation
+            # is never submitted twice.
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            raise_on_status=False,
+        )
+        return _CountingAdapter(
+            self._pool_classes,
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=maxsize,
+            max_retries=retry,
+        )
+
+    def timeout(self, read: Optional[float] = None) -> Tuple[float, float]:
+        """Return a (connect, read) timeout tuple, optionally overriding read"""
+        return (self.config.connect_timeout, self.config.read_timeout if read is None else read)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session.
+
+        Args:
+            method: HTTP method
+            url: Target URL
+            **kwargs: Passed through to requests.Session.request
+
+        Returns:
+            The response object
+        """
+        kwargs.setdefault('timeout', self.timeout())
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        """Close every pooled connection"""
+        self.session.close()
+
+
+_default_pool: Optional[HTTPPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool() -> HTTPPool:
+    """Return the process-wide pool, creating it on first use"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = HTTPPool()
+        return _default_pool
+
+
+def configure_default_pool(config: PoolConfig) -> HTTPPool:
+    """Replace the process-wide pool with one built from ``config``"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is not None:
+            _default_pool.close()
+        _default_pool = HTTPPool(config)
+        return _default_pool
+
+
+def make_async_client(config: Optional[PoolConfig] = None) -> "httpx.AsyncClient":
+    """
+    Build an httpx.AsyncClient with the same limits and timeouts as HTTPPool.
+
+    The client is bound to the event loop it is first used on.
+
+    Args:
+        config: Pool settings (defaults to PoolConfig.from_env())
+
+    Returns:
+        A configured httpx.AsyncClient
+    """
+    if not HTTPX_AVAILABLE:
+        raise ImportError("httpx not installed. Run: pip install httpx")
+    import httpx
+    config = config or PoolConfig.from_env()
+    max_connections = max([config.pool_maxsize, *config.host_pool_sizes.values()])
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(config.read_timeout, connect=config.connect_timeout),
+        limits=httpx.Limits(max_connections=max_connections * config.pool_connections,
+                            max_keepalive_connections=max_connections),
+        # httpx only retries failed connects, which is what we want for POSTs
+        transport=httpx.AsyncHTTPTransport(retries=config.max_retries),
+    )
@@ -0,0 +1,160 @@
+"""Intent Router for Lisa-Agent
+
+Every mode registers its trigger phrases here once, at import time. The
+router compiles all phrases into a single prefix-factored regular
+expression and reports every matching intent in one pass over the input,
+instead of each mode rescanning the text with its own keyword list.
+
+Matching keeps the existing semantics: case-insensitive substring
+matches, so "joke" also fires on "jokes".
+
+Example:
+    ROUTER.register("joke", ["joke", "make me laugh"], priority=30)
+    ROUTER.best("tell me a joke")  # -> "joke"
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Pattern, Set, Tuple
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    """One intent found in the input"""
+    intent: str
+    phrase: str
+    priority: int
+    start: int
+
+
+def _trie_regex(phrases: Iterable[str]) -> str:
+    """Build a regex alternation factored by common prefixes"""
+    trie: Dict = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        is_end = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != ""]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        # Greedy '?' prefers the longer phrase; shorter ones are recovered below
+        return group + "?" if is_end else group
+
+    return build(trie)
+
+
+class IntentRouter:
+    """Registry of trigger phrases compiled into one matcher"""
+
+    def __init__(self):
+        self._phrases: Dict[str, List[Tuple[str, int]]] = {}
+        self._pattern: Optional[Pattern] = None
+        # phrase -> every (intent, priority) it implies, including registered
+        # phrases that are prefixes of it and so share its start position
+        self._implied: Dict[str, List[Tuple[str, int]]] = {}
+        self._lock = threading.Lock()
+        # Bumped by every register(); results from older phrase sets are never memoized
+        self._version = 0
+        # (version, text, matches) of the last match() call
+        self._last: Tuple[int, Optional[str], Tuple[IntentMatch, ...]] = (-1, None, ())
+
+    def register(self, intent: str, phrases: Iterable[str], priority: int = 0) -> None:
+        """
+        Register trigger phrases for an intent.
+
+        Args:
+            intent: Intent name reported on a match
+            phrases: Trigger phrases (matched case-insensitively as substrings)
+            priority: Higher wins when several intents match
+        """
+        with self._lock:
+            for phrase in phrases:
+                phrase = phrase.lower()
+                if not phrase:
+                    continue
+                entries = self._phrases.setdefault(phrase, [])
+                entries[:] = [e for e in entries if e[0] != intent]
+                entries.append((intent, priority))
+            self._pattern = None
+            self._version += 1
+
+    def compile(self) -> None:
+        """Compile registered phrases; called lazily on the first match after a change"""
+        with self._lock:
+            self._compile()
+
+    def _compile(self) -> None:
+        # Caller holds self._lock
+        if self._pattern is None:
+            phrases = list(self._phrases)
+            # A new dict rather than an update, so a match() holding the old
+            # pattern keeps the implied table that goes with it
+            self._implied = {
+                phrase: [entry for other in phrases if phrase.startswith(other) for entry in self._phrases[other]]
+                for phrase in phrases
+            }
+            # Zero-width lookahead so overlapping phrases are all found
+            self._pattern = re.compile(f"(?=({_trie_regex(phrases)}))") if phrases else re.compile(r"(?!)")
+
+    def match(self, text: str) -> Tuple[IntentMatch, ...]:
+        """
+        Find every intent triggered by ``text``.
+
+        Returns:
+            One IntentMatch per intent (its first occurrence), highest priority first
+        """
+        with self._lock:
+            self._compile()
+            pattern, implied, version = self._pattern, self._implied, self._version
+            last_version, last_text, last_matches = self._last
+        if version == last_version and text == last_text:
+            return last_matches
+        found: Dict[str, IntentMatch] = {}
+        for m in pattern.finditer(text.lower()):
+            phrase = m.group(1)
+            for intent, priority in implied[phrase]:
+                if intent not in found:
+                    found[intent] = IntentMatch(intent, phrase, priority, m.start())
+        # A tuple, since the same result is handed to every caller
+        matches = tuple(sorted(found.values(), key=lambda im: (-im.priority, im.start)))
+        # Several modes often check the same message back to back
+        with self._lock:
+            if self._version == version:
+                self._last = (version, text, matches)
+        return matches
+
+    def intents(self, text: str) -> Set[str]:
+        """Names of every intent triggered by ``text``"""
+        return {m.intent for m in self.match(text)}
+
+    def matches_intent(self, text: str, intent: str) -> bool:
+        return intent in self.intents(text)
+
+    def best(self, text: str, among: Optional[Iterable[str]] = None) -> Optional[str]:
+        """
+        Highest-priority intent in ``text``.
+
+        Args:
+            text: User input
+            among: Only consider these intents
+
+        Returns:
+            Intent name, or None if nothing matched
+        """
+        allowed = set(among) if among is not None else None
+        for m in self.match(text):
+            if allowed is None or m.intent in allowed:
+                return m.intent
+        return None
+
+
+# Process-wide router; modes register their triggers on import
+ROUTER = IntentRouter()
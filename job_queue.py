@@ -0,0 +1,209 @@
+"""Job Queue Module for Lisa-Agent
+
+Runs reply generation off the UI thread. Each chat session gets its own
+JobQueue with one worker, so replies are produced in order while the UI
+keeps rendering. Messages can be queued behind the running reply or
+cancelled. Every job exposes its partial text as tokens arrive, along
+with a version counter that changes on every update, so a polling UI can
+tell cheaply whether there is anything new to draw.
+
+The worker thread starts on the first submit and exits after sitting
+idle, so a session that has gone away doesn't leave a thread behind.
+"""
+
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's token callback once the job has been cancelled"""
+
+
+_job_ids = itertools.count(1)
+
+
+@dataclass
+class Job:
+    """One message waiting for, or receiving, a reply"""
+    prompt: str
+    id: int = field(default_factory=lambda: next(_job_ids))
+    status: str = QUEUED
+    text: str = ""
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # Bumped on every change, so pollers can skip redrawing unchanged jobs
+    version: int = 0
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, CANCELLED, FAILED)
+
+
+# A job runner turns a prompt into a reply, calling on_token with the
+# text so far each time it grows
+JobRunner = Callable[[str, Callable[[str], None]], str]
+
+
+class JobQueue:
+    """Ordered background reply generation with cancellation"""
+
+    # Seconds the worker waits for new work before exiting
+    IDLE_SECONDS = 30.0
+
+    def __init__(self, runner: Optional[JobRunner] = None, max_pending: int = 10,
+                 on_cancel: Optional[Callable[[Job], None]] = None):
+        """
+        Initialize the queue (no thread runs until the first submit).
+
+        Args:
+            runner: Produces the reply for a prompt, reporting partial text
+                (can instead be given per job to submit())
+            max_pending: Most jobs queued or running at once; submit()
+                raises RuntimeError beyond this
+            on_cancel: Called when a running job is cancelled, e.g. to stop
+                speaking it
+        """
+        self.runner = runner
+        self.max_pending = max_pending
+        self.on_cancel = on_cancel
+        self._queue: "queue.Queue[Tuple[Job, JobRunner]]" = queue.Queue()
+        self._jobs: Dict[int, Job] = {}
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, prompt: str, runner: Optional[JobRunner] = None) -> Job:
+        """
+        Queue a message behind any reply already in progress.
+
+        Args:
+            prompt: The user's message
+            runner: Overrides the queue's runner for this job
+
+        Returns:
+            The job; watch its text and status for progress
+        """
+        runner = runner or self.runner
+        if runner is None:
+            raise ValueError("No runner for this job")
+        job = Job(prompt)
+        with self._lock:
+            if sum(1 for j in self._jobs.values() if not j.finished) >= self.max_pending:
+                raise RuntimeError(f"Too many messages waiting (limit {self.max_pending})")
+            self._jobs[job.id] = job
+            self._queue.put((job, runner))
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._work, name="lisa-ui-jobs", daemon=True)
+                self._worker.start()
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Returns:
+            False if the job is unknown or already finished
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job.cancel_event.set()
+            running = job.status == RUNNING
+            if not running:
+                self._finish(job, CANCELLED)
+        if running and self.on_cancel is not None:
+            self.on_cancel(job)
+        return True
+
+    def cancel_all(self) -> int:
+        """Cancel everything queued or running; returns how many jobs were cancelled"""
+        with self._lock:
+            ids = [job.id for job in self._jobs.values() if not job.finished]
+        return sum(self.cancel(job_id) for job_id in ids)
+
+    def jobs(self) -> List[Job]:
+        """Known jobs in submission order"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    @property
+    def busy(self) -> bool:
+        """Whether anything is queued or running"""
+        with self._lock:
+            return any(not job.finished for job in self._jobs.values())
+
+    def pop_finished(self) -> List[Job]:
+        """Remove and return finished jobs, oldest first, stopping at the first unfinished one"""
+        finished = []
+        with self._lock:
+            for job_id, job in list(self._jobs.items()):
+                if not job.finished:
+                    break
+                finished.append(self._jobs.pop(job_id))
+        return finished
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        # Caller holds self._lock
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        job.version += 1
+
+    def _work(self) -> None:
+        while True:
+            try:
+                job, runner = self._queue.get(timeout=self.IDLE_SECONDS)
+            except queue.Empty:
+                with self._lock:
+                    # A submit may have raced the timeout; it saw this thread alive
+                    if self._queue.empty():
+                        self._worker = None
+                        return
+                continue
+            with self._lock:
+                if job.cancelled:
+                    continue
+                job.status = RUNNING
+                job.started_at = time.time()
+                job.version += 1
+            try:
+                text = runner(job.prompt, lambda partial: self._progress(job, partial))
+            except JobCancelled:
+                with self._lock:
+                    self._finish(job, CANCELLED)
+                continue
+            except Exception as e:
+                with self._lock:
+                    self._finish(job, FAILED, str(e))
+                continue
+            with self._lock:
+                if job.cancelled:
+                    self._finish(job, CANCELLED)
+                else:
+                    job.text = text
+                    self._finish(job, DONE)
+
+    def _progress(self, job: Job, partial: str) -> None:
+        if job.cancelled:
+            # Unwinds the runner, which closes the model's token stream
+            raise JobCancelled()
+        with self._lock:
+            job.text = partial
+            job.version += 1
@@ -17,23 +17,63 @@ Run:
   python lisa_agent.py
 
 Environment variables (optional):
-  OLLAMA_BASE_URL   default: http://localhost:11434
-  LISA_MODEL        default: dolphin-mistral
+  OLLAMA_BASE_URL       default: http://localhost:11434
+  OLLAMA_BASE_URLS      comma-separated hosts to load-balance over (overrides OLLAMA_BASE_URL)
+  LISA_MODEL            default: dolphin-mistral
+  LISA_CONNECT_TIMEOUT  default: 5 (seconds)
+  LISA_READ_TIMEOUT     default: 120 (seconds)
+  LISA_MAX_CONCURRENCY  default: 8 (in-flight async generations per backend)
+  LISA_TEMPERATURE      sampling temperature passed to Ollama (model default if unset)
+  LISA_SEED             fixed sampling seed (model default if unset)
+  LISA_RESPONSE_CACHE   enable the reply cache: ":memory:" or a SQLite file path
+  LISA_MEMORY_DB        SQLite file for persistent, full-text indexed notes
+  LISA_SEMANTIC_MEMORY  enable embedding recall: ":memory:" or a file prefix for the index
+  LISA_EMBED_MODEL      Ollama embedding model; unset uses the local hashing embedder
+  LISA_HISTORY_TOKENS   default: 1500 (conversation history budget; 0 disables history)
+  LISA_SEARCH_TOKENS    default: 400 (web results injected by reply_with_search)
 """
 from __future__ import annotations
+import asyncio
 import os
 import sys
 import json
 import textwrap
+import time
+from contextlib import contextmanager, asynccontextmanager, nullcontext
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Iterable
+from typing import TYPE_CHECKING, List, Dict, Optional, Iterable, Iterator, AsyncIterator, Tuple
 import requests
 
+from http_pool import HTTPPool, async_connect_errors, PoolConfig, get_default_pool, make_async_client
+from ollama_pool import OllamaBackendPool
+from response_cache import ResponseCache, is_deterministic, make_key
+from memory_store import SQLiteMemoryStore
+from tokens import estimate_tokens
+from conversation import SUMMARY_INSTRUCTIONS, ConversationContext
+from intent_router import ROUTER
+
+if TYPE_CHECKING:  # loaded on first use, to keep startup fast
+    from semantic_memory import SemanticMemory
+    from web_search import WebSearchEngine
+
 # --------------------------- Config ---------------------------
 
 DEFAULT_OLLAMA_BASE = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 DEFAULT_MODEL = os.getenv("LISA_MODEL", "dolphin-mistral")
-TIMEOUT = 120
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("LISA_MAX_CONCURRENCY", "8"))
+DEFAULT_MEMORY_TOKEN_BUDGET = 200
+DEFAULT_HISTORY_TOKENS = int(os.getenv("LISA_HISTORY_TOKENS", "1500"))
+DEFAULT_SEARCH_TOKEN_BUDGET = int(os.getenv("LISA_SEARCH_TOKENS", "400"))
+
+
+def options_from_env() -> Optional[Dict]:
+    """Ollama sampling options from LISA_TEMPERATURE / LISA_SEED, if any are set."""
+    options = {}
+    if os.getenv("LISA_TEMPERATURE"):
+        options["temperature"] = float(os.environ["LISA_TEMPERATURE"])
+    if os.getenv("LISA_SEED"):
+        options["seed"] = int(os.environ["LISA_SEED"])
+    return options or None
 
 # --------------------------- Persona ---------------------------
 
@@ -66,19 +106,41 @@ LISA_PERSONA = textwrap.dedent(
     """
 ).strip()
 
+# --------------------------- Style Routing ---------------------------
+
+# intent -> (priority, trigger phrases, hint); priority breaks ties when
+# a message matches several, e.g. "give me advice and a joke"
+_STYLE_INTENTS = {
+    "joke": (30, ["joke", "make me laugh"],
+             "User requests a short, clean joke."),
+    "motivation": (20, ["motivate", "pep talk", "motivation", "hype me"],
+                   "User requests a brief, high-energy motivational speech."),
+    "advice": (10, ["advice", "how do i", "what should i do"],
+               "User requests practical, step-by-step advice with examples."),
+}
+STYLE_HINTS = {intent: hint for intent, (_, _, hint) in _STYLE_INTENTS.items()}
+for _intent, (_priority, _phrases, _) in _STYLE_INTENTS.items():
+    ROUTER.register(_intent, _phrases, priority=_priority)
+
 # --------------------------- Modular Hooks ---------------------------
 
 @dataclass
 class MemoryStore:
-    """Simple in-memory store, placeholder for future persistence."""
+    """Simple in-memory store. See memory_store.SQLiteMemoryStore for persistence."""
     facts: List[str] = field(default_factory=list)
+    # Lower-cased copy of facts, so search() doesn't re-lower every note per query
+    _lowered: List[str] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._lowered = [f.lower() for f in self.facts]
 
     def add(self, item: str) -> None:
         self.facts.append(item)
+        self._lowered.append(item.lower())
 
     def search(self, query: str) -> List[str]:
         q = query.lower()
-        return [f for f in self.facts if q in f.lower()]
+        return [f for f, low in zip(self.facts, self._lowered) if q in low]
 
 
 @dataclass
@@ -92,59 +154,456 @@ class Persona:
 # --------------------------- Ollama Client ---------------------------
 
 class OllamaClient:
-    def __init__(self, base_url: str = DEFAULT_OLLAMA_BASE, model: str = DEFAULT_MODEL):
+    def __init__(self, base_url: str = DEFAULT_OLLAMA_BASE, model: str = DEFAULT_MODEL, pool: HTTPPool | None = None,
+                 backends: OllamaBackendPool | None = None, options: Optional[Dict] = None):
         self.base_url = base_url.rstrip("/")
         self.model = model
-
-    def generate(self, prompt: str, system: Optional[str] = None) -> str:
-        url = f"{self.base_url}/api/generate"
+        # Sampling options forwarded to Ollama (temperature, seed, ...)
+        self.options = options
+        # Connect/read timeouts, retries and keep-alive all live in the pool
+        self.pool = pool or get_default_pool()
+        # When set, requests are balanced over several hosts instead of base_url
+        self.backends = backends
+
+    def _payload(self, prompt: str, system: Optional[str], stream: bool, context: Optional[List[int]] = None) -> Dict:
         payload = {
             "model": self.model,
             "prompt": prompt,
+            "stream": stream,
         }
         if system:
             payload["system"] = system
-        # We request non-streamed response for simplicity
-        resp = requests.post(url, json=payload, timeout=TIMEOUT)
-        resp.raise_for_status()
-        data = resp.json()
-        # non-stream returns have a single response with 'response'
+        if self.options:
+            payload["options"] = self.options
+        if context:
+            # Token state returned by the previous turn; Ollama skips re-processing it
+            payload["context"] = context
+        return payload
+
+    def _lease(self, exclude: Iterable[str]):
+        if self.backends is None:
+            return nullcontext(self.base_url)
+        return self.backends.lease(exclude)
+
+    @contextmanager
+    def _open(self, payload: Dict, stream: bool) -> Iterator[requests.Response]:
+        # Fail over to the next backend on connection errors; once a host has
+        # answered, errors propagate so a generation never runs twice.
+        tried = set()
+        while True:
+            with self._lease(tried) as base_url:
+                try:
+                    resp = self.pool.post(f"{base_url}/api/generate", json=payload, stream=stream)
+                except requests.ConnectionError:
+                    if self.backends is None:
+                        raise
+                    self.backends.mark_failure(base_url)
+                    tried.add(base_url)
+                    continue
+                with resp:
+                    if self.backends is not None:
+                        # A 5xx host is failing even though it answered
+                        if resp.status_code >= 500:
+                            self.backends.mark_failure(base_url)
+                        else:
+                            self.backends.mark_success(base_url)
+                    resp.raise_for_status()
+                    yield resp
+                return
+
+    def generate(self, prompt: str, system: Optional[str] = None, context: Optional[List[int]] = None,
+                 meta: Optional[Dict] = None) -> str:
+        """Return the full completion. If ``meta`` is given it receives the final response fields."""
+        # Ask explicitly for a single JSON object so the shape is known
+        with self._open(self._payload(prompt, system, stream=False, context=context), stream=False) as resp:
+            data = resp.json()
+        if meta is not None:
+            meta.update({k: v for k, v in data.items() if k != "response"})
+        if "response" in data:
+            return data["response"].strip()
+        return json.dumps(data)
+
+    def generate_stream(self, prompt: str, system: Optional[str] = None, context: Optional[List[int]] = None,
+                        meta: Optional[Dict] = None) -> Iterator[str]:
+        """Yield tokens as they arrive from Ollama's NDJSON stream.
+
+        If ``meta`` is given it receives the final chunk's fields (context,
+        prompt_eval_count, eval_count, ...) once the stream completes.
+        """
+        with self._open(self._payload(prompt, system, stream=True, context=context), stream=True) as resp:
+            started = False
+            for line in resp.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise RuntimeError(f"Ollama error: {chunk['error']}")
+                token = chunk.get("response", "")
+                if not started:
+                    # match generate(), which strips leading whitespace
+                    token = token.lstrip()
+                    started = bool(token)
+                if token:
+                    yield token
+                if chunk.get("done"):
+                    if meta is not None:
+                        meta.update({k: v for k, v in chunk.items() if k != "response"})
+                    break
+
+
+class AsyncOllamaClient:
+    """asyncio counterpart of OllamaClient, built on httpx.
+
+    A semaphore per backend caps in-flight generations; callers beyond the
+    cap wait their turn instead of piling onto the GPU. Like the underlying
+    httpx client, an instance belongs to the event loop it is first used on.
+    """
+
+    _payload = OllamaClient._payload
+    _lease = OllamaClient._lease
+
+    def __init__(self, base_url: str = DEFAULT_OLLAMA_BASE, model: str = DEFAULT_MODEL,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, config: PoolConfig | None = None,
+                 backends: OllamaBackendPool | None = None, options: Optional[Dict] = None):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.options = options
+        self.max_concurrency = max_concurrency
+        self.config = config or PoolConfig.from_env()
+        self.backends = backends
+        self._http = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _client(self):
+        if self._http is None:
+            self._http = make_async_client(self.config)
+        return self._http
+
+    def _semaphore(self, base_url: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(base_url)
+        if sem is None:
+            sem = self._semaphores[base_url] = asyncio.Semaphore(self.max_concurrency)
+        return sem
+
+    @asynccontextmanager
+    async def _open(self, payload: Dict) -> AsyncIterator:
+        tried = set()
+        while True:
+            with self._lease(tried) as base_url:
+                async with self._semaphore(base_url):
+                    request = self._client().build_request("POST", f"{base_url}/api/generate", json=payload)
+                    try:
+                        resp = await self._client().send(request, stream=True)
+                    except async_connect_errors():
+                        if self.backends is None:
+                            raise
+                        self.backends.mark_failure(base_url)
+                        tried.add(base_url)
+                        continue
+                    try:
+                        if self.backends is not None:
+                            if resp.status_code >= 500:
+                                self.backends.mark_failure(base_url)
+                            else:
+                                self.backends.mark_success(base_url)
+                        resp.raise_for_status()
+                        yield resp
+                    finally:
+                        await resp.aclose()
+                    return
+
+    async def generate(self, prompt: str, system: Optional[str] = None, context: Optional[List[int]] = None,
+                       meta: Optional[Dict] = None) -> str:
+        async with self._open(self._payload(prompt, system, stream=False, context=context)) as resp:
+            data = json.loads(await resp.aread())
+        if meta is not None:
+            meta.update({k: v for k, v in data.items() if k != "response"})
         if "response" in data:
             return data["response"].strip()
-        # if streamed was returned (just in case), concatenate
-        if isinstance(data, dict) and data.get("done"):  # final chunk
-            return data.get("response", "").strip()
-        if isinstance(data, list):
-            chunks = [c.get("response", "") for c in data]
-            return "".join(chunks).strip()
         return json.dumps(data)
 
+    async def generate_stream(self, prompt: str, system: Optional[str] = None, context: Optional[List[int]] = None,
+                              meta: Optional[Dict] = None) -> AsyncIterator[str]:
+        """Yield tokens as they arrive; the backend slot is held until the stream ends."""
+        async with self._open(self._payload(prompt, system, stream=True, context=context)) as resp:
+            started = False
+            async for line in resp.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise RuntimeError(f"Ollama error: {chunk['error']}")
+                token = chunk.get("response", "")
+                if not started:
+                    token = token.lstrip()
+                    started = bool(token)
+                if token:
+                    yield token
+                if chunk.get("done"):
+                    if meta is not None:
+                        meta.update({k: v for k, v in chunk.items() if k != "response"})
+                    break
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
 
 # --------------------------- Lisa Agent ---------------------------
 
 class LisaAgent:
-    def __init__(self, client: OllamaClient, persona: Persona | None = None, memory: MemoryStore | None = None):
-        self.client = client
+    def __init__(self, client: OllamaClient | None = None, persona: Persona | None = None,
+                 memory: MemoryStore | SQLiteMemoryStore | None = None,
+                 async_client: AsyncOllamaClient | None = None, cache: ResponseCache | None = None,
+                 semantic: SemanticMemory | None = None, memory_top_k: int = 5,
+                 memory_token_budget: int = DEFAULT_MEMORY_TOKEN_BUDGET,
+                 conversation: ConversationContext | None = None, search: WebSearchEngine | None = None,
+                 search_token_budget: int = DEFAULT_SEARCH_TOKEN_BUDGET):
+        self.client = client or OllamaClient()
         self.persona = persona or Persona()
         self.memory = memory or MemoryStore()
-
-    def reply(self, user_input: str) -> str:
+        self._async_client = async_client
+        # Opt-in; only consulted when the client's sampling is deterministic
+        self.cache = cache
+        # Opt-in; relevant notes are added to the system prompt within the budget
+        self.semantic = semantic
+        self.memory_top_k = memory_top_k
+        self.memory_token_budget = memory_token_budget
+        # Opt-in multi-turn history; older turns are summarized with this agent's model
+        self.conversation = conversation
+        if conversation is not None and conversation.summarizer is None:
+            conversation.summarizer = self.summarize
+        # Used by reply_with_search(); the shared engine is picked up on first use
+        self.search = search
+        self.search_token_budget = search_token_budget
+        self.last_timings: Dict[str, float] = {}
+
+    @property
+    def async_client(self) -> AsyncOllamaClient:
+        # Created on first use so sync-only callers never need httpx
+        if self._async_client is None:
+            self._async_client = AsyncOllamaClient(self.client.base_url, self.client.model,
+                                                   backends=self.client.backends, options=self.client.options)
+        return self._async_client
+
+    def _build_system(self, user_input: str) -> str:
         # Lightweight routing for special requests
-        lower = user_input.strip().lower()
-        style_hint = None
-        if any(k in lower for k in ["joke", "make me laugh"]):
-            style_hint = "User requests a short, clean joke."
-        elif any(k in lower for k in ["motivate", "pep talk", "motivation", "hype me"]):
-            style_hint = "User requests a brief, high-energy motivational speech."
-        elif any(k in lower for k in ["advice", "how do i", "what should i do"]):
-            style_hint = "User requests practical, step-by-step advice with examples."
+        style_hint = STYLE_HINTS.get(ROUTER.best(user_input, among=STYLE_HINTS))
 
         system = self.persona.system_prompt
         if style_hint:
             system += "\n\nStyle hint: " + style_hint
+        recalled = self._recall(user_input)
+        if recalled:
+            system += "\n\nThings the user asked you to remember:\n" + "\n".join(f"- {f}" for f in recalled)
+        return system
+
+    def _recall(self, user_input: str) -> List[str]:
+        """Most relevant remembered notes that fit in memory_token_budget."""
+        if self.semantic is None or self.memory_token_budget <= 0:
+            return []
+        picked, used = [], 0
+        for fact, _ in self.semantic.top_k(user_input, k=self.memory_top_k, min_score=0.1):
+            cost = estimate_tokens(fact) + 2
+            if used + cost > self.memory_token_budget:
+                break
+            picked.append(fact)
+            used += cost
+        return picked
+
+    async def _abuild_system(self, user_input: str) -> str:
+        # Recall may embed the query over HTTP; keep it off the event loop
+        if self.semantic is None:
+            return self._build_system(user_input)
+        return await asyncio.to_thread(self._build_system, user_input)
+
+    def _build_prompt(self, user_input: str) -> Tuple[str, Optional[List[int]]]:
+        """Prompt text plus an Ollama context array to resume from, if any."""
+        if self.conversation is None:
+            return f"User: {user_input}\nAssistant:", None
+        return self.conversation.build_prompt(user_input)
+
+    def _cache_key(self, prompt: str, system: str, context: Optional[List[int]]) -> Optional[str]:
+        # A context array carries history the key can't see, so skip the cache
+        if self.cache is None or context or not is_deterministic(self.client.options):
+            return None
+        return make_key(self.client.model, system, prompt, self.client.options)
+
+    def _finish(self, user_input: str, answer: str, key: Optional[str], meta: Dict) -> None:
+        # ``key`` is None for cache hits, so an entry's TTL runs from when it was generated
+        if key:
+            self.cache.put(key, answer)
+        if self.conversation is not None:
+            self.conversation.record(user_input, answer, meta)
+
+    def _search_engine(self) -> WebSearchEngine:
+        if self.search is None:
+            from web_search import get_engine
+            self.search = get_engine()
+        return self.search
+
+    def _grounding(self, query: str, results: List[Dict], passages: List[Dict]) -> str:
+        """Best-matching snippets and page passages, numbered, within search_token_budget."""
+        from page_fetch import rank_chunks
+
+        sources = {}
+        for r in results:
+            text = f"{r.get('title', '')}: {r.get('snippet', '')}".strip(": ")
+            if text:
+                sources.setdefault(text, r.get('url', ''))
+        for p in passages:
+            sources.setdefault(p['text'], p['url'])
+        ranked = [text for _, text in rank_chunks(query, sources)]
+        # Keep unscored snippets too (e.g. an abstract with no word overlap), after the ranked ones
+        ranked += [text for text in sources if text not in ranked]
+
+        lines, used = [], 0
+        for text in ranked:
+            line = f"[{len(lines) + 1}] {text}" + (f" ({sources[text]})" if sources[text] else "")
+            cost = estimate_tokens(line)
+            if used + cost > self.search_token_budget:
+                continue
+            lines.append(line)
+            used += cost
+        if not lines:
+            return ""
+        return ("Web search results for the user's question (cite them by number; "
+                "say so if they don't answer it):\n" + "\n".join(lines))
+
+    def _prepare_search(self, user_input: str, query: Optional[str], max_results: int, pages: int,
+                        timings: Dict[str, float]) -> Tuple[str, Optional[List[int]], str]:
+        """
+        Run the web search while the prompt is assembled, then ground the system prompt.
+
+        Returns:
+            (prompt, context, system) ready for generation
+        """
+        from web_search import submit_search
+
+        start = time.perf_counter()
+        engine = self._search_engine()
+        query = query or user_input
+        future = submit_search(query, max_results=max_results, engine=engine)
+        # Recall may embed the query over HTTP; it overlaps with the search
+        (prompt, context), system = self._build_prompt(user_input), self._build_system(user_input)
+        timings["prompt_ms"] = (time.perf_counter() - start) * 1000
+        try:
+            results = future.result(timeout=engine.provider_deadline + engine.READ_TIMEOUT)
+        except Exception as e:
+            print(f"Web search error: {e}")
+            results = []
+        timings["search_ms"] = (time.perf_counter() - start) * 1000
+        passages = []
+        if pages and results:
+            passages = engine.fetch_pages(query, results, max_pages=pages)
+            timings["fetch_ms"] = (time.perf_counter() - start) * 1000 - timings["search_ms"]
+        grounding = self._grounding(query, results, passages)
+        if grounding:
+            system += "\n\n" + grounding
+        timings["ready_ms"] = (time.perf_counter() - start) * 1000
+        return prompt, context, system
+
+    def reply_with_search(self, user_input: str, query: Optional[str] = None, max_results: int = 5,
+                          pages: int = 0) -> str:
+        """
+        Answer grounded in web search results.
+
+        Args:
+            user_input: What the user said
+            query: Search query (defaults to user_input)
+            max_results: Search results to consider
+            pages: Also download this many top result pages and use their
+                most relevant passages
+
+        Stage latencies (ms) are left in ``last_timings``.
+        """
+        return "".join(self.reply_with_search_stream(user_input, query, max_results, pages))
+
+    def reply_with_search_stream(self, user_input: str, query: Optional[str] = None, max_results: int = 5,
+                                 pages: int = 0) -> Iterator[str]:
+        """Same as reply_with_search(), but yields tokens as the model produces them."""
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+        prompt, context, system = self._prepare_search(user_input, query, max_results, pages, timings)
+        key = self._cache_key(prompt, system, context)
+        cached = self.cache.get(key) if key else None
+        meta: Dict = {}
+        if cached is not None:
+            timings["first_token_ms"] = (time.perf_counter() - start) * 1000
+            yield cached
+            tokens = [cached]
+        else:
+            tokens = []
+            for token in self.client.generate_stream(prompt=prompt, system=system, context=context, meta=meta):
+                if not tokens:
+                    timings["first_token_ms"] = (time.perf_counter() - start) * 1000
+                tokens.append(token)
+                yield token
+        timings["total_ms"] = (time.perf_counter() - start) * 1000
+        self.last_timings = timings
+        self._finish(user_input, "".join(tokens), None if cached is not None else key, meta)
+
+    def summarize(self, transcript: str) -> str:
+        """Condense older turns; used as the conversation's background summarizer."""
+        return self.client.generate(prompt=transcript, system=SUMMARY_INSTRUCTIONS)
 
-        prompt = f"User: {user_input}\nAssistant:"
-        return self.client.generate(prompt=prompt, system=system)
+    def reply(self, user_input: str) -> str:
+        (prompt, context), system = self._build_prompt(user_input), self._build_system(user_input)
+        key = self._cache_key(prompt, system, context)
+        answer = self.cache.get(key) if key else None
+        meta: Dict = {}
+        if answer is None:
+            answer = self.client.generate(prompt=prompt, system=system, context=context, meta=meta)
+        else:
+            key = None
+        self._finish(user_input, answer, key, meta)
+        return answer
+
+    def reply_stream(self, user_input: str) -> Iterator[str]:
+        """Same as reply(), but yields tokens as the model produces them."""
+        (prompt, context), system = self._build_prompt(user_input), self._build_system(user_input)
+        key = self._cache_key(prompt, system, context)
+        cached = self.cache.get(key) if key else None
+        meta: Dict = {}
+        if cached is not None:
+            yield cached
+            tokens = [cached]
+        else:
+            tokens = []
+            for token in self.client.generate_stream(prompt=prompt, system=system, context=context, meta=meta):
+                tokens.append(token)
+                yield token
+        self._finish(user_input, "".join(tokens), None if cached is not None else key, meta)
+
+    async def areply(self, user_input: str) -> str:
+        """asyncio version of reply(); many calls can share one event loop."""
+        (prompt, context), system = self._build_prompt(user_input), await self._abuild_system(user_input)
+        key = self._cache_key(prompt, system, context)
+        answer = self.cache.get(key) if key else None
+        meta: Dict = {}
+        if answer is None:
+            answer = await self.async_client.generate(prompt=prompt, system=system, context=context, meta=meta)
+        else:
+            key = None
+        self._finish(user_input, answer, key, meta)
+        return answer
+
+    async def areply_stream(self, user_input: str) -> AsyncIterator[str]:
+        (prompt, context), system = self._build_prompt(user_input), await self._abuild_system(user_input)
+        key = self._cache_key(prompt, system, context)
+        cached = self.cache.get(key) if key else None
+        meta: Dict = {}
+        if cached is not None:
+            yield cached
+            tokens = [cached]
+        else:
+            tokens = []
+            async for token in self.async_client.generate_stream(prompt=prompt, system=system,
+                                                                 context=context, meta=meta):
+                tokens.append(token)
+                yield token
+        self._finish(user_input, "".join(tokens), None if cached is not None else key, meta)
 
 
 # --------------------------- CLI ---------------------------
@@ -161,14 +620,29 @@ Tips:
 - Joke: "Tell me a joke about coffee."
 - Motivation: "I need a 30-second pep talk before my interview."
 - Memory: prefix with "+remember " to store a note; "+search <term>" to find notes.
+- Web: "+web <question>" answers from a live web search.
 - Persona: prefix with "+tweak " to extend Lisa's style temporarily.
+- Diagnostics: "+stats" shows connection reuse, prompt size, reply cache counters and web answer stage timings.
+- History: "+forget" clears the conversation so far.
 """.strip()
 
 
 def run_cli() -> int:
     print(BANNER)
-    client = OllamaClient()
-    agent = LisaAgent(client=client)
+    client = OllamaClient(backends=OllamaBackendPool.from_env(), options=options_from_env())
+    cache_path = os.getenv("LISA_RESPONSE_CACHE")
+    cache = ResponseCache(path=None if cache_path == ":memory:" else cache_path) if cache_path else None
+    memory_db = os.getenv("LISA_MEMORY_DB")
+    memory = SQLiteMemoryStore(memory_db) if memory_db else None
+    semantic = None
+    semantic_path = os.getenv("LISA_SEMANTIC_MEMORY")
+    if semantic_path:
+        from semantic_memory import OllamaEmbedder, SemanticMemory
+        embed_model = os.getenv("LISA_EMBED_MODEL")
+        embedder = OllamaEmbedder(client.base_url, embed_model, pool=client.pool) if embed_model else None
+        semantic = SemanticMemory(embedder, path=None if semantic_path == ":memory:" else semantic_path)
+    conversation = ConversationContext(DEFAULT_HISTORY_TOKENS) if DEFAULT_HISTORY_TOKENS > 0 else None
+    agent = LisaAgent(client=client, cache=cache, memory=memory, semantic=semantic, conversation=conversation)
 
     while True:
         try:
@@ -186,11 +660,41 @@ def run_cli() -> int:
             print(HELP_TEXT)
             continue
 
+        if user.lower() == "+forget":
+            if agent.conversation is not None:
+                agent.conversation.clear()
+            print("Lisa> Fresh start—conversation cleared.")
+            continue
+
+        if user.lower() == "+stats":
+            stats = client.pool.stats.snapshot()
+            print(f"Lisa> Connections: {stats['hits']} reused, {stats['misses']} opened "
+                  f"(hit rate {stats['hit_rate']:.0%})")
+            if client.backends is not None:
+                for b in client.backends.status():
+                    state = "up" if b['available'] else "ejected"
+                    print(f"       {b['base_url']}: {state}, {b['outstanding']} in flight, {b['requests']} total")
+            if agent.conversation is not None and agent.conversation.turn_stats:
+                ts = agent.conversation.turn_stats[-1]
+                sent = "new turn only (context reused)" if ts.reused_context else "summary + window"
+                print(f"       Last turn: ~{ts.prompt_tokens_sent} prompt tokens sent ({sent}), "
+                      f"{ts.prompt_eval_count or '?'} evaluated by Ollama")
+            if agent.cache is not None:
+                cs = agent.cache.stats()
+                print(f"       Reply cache: {cs['entries']} entries, {cs['hits']} hits, "
+                      f"{cs['misses']} misses (hit rate {cs['hit_rate']:.0%})")
+            if agent.last_timings:
+                stages = ", ".join(f"{k[:-3]} {v:.0f}ms" for k, v in agent.last_timings.items())
+                print(f"       Last web answer: {stages}")
+            continue
+
         # Memory commands
         if user.startswith("+remember "):
             note = user[len("+remember "):].strip()
             if note:
                 agent.memory.add(note)
+                if agent.semantic is not None:
+                    agent.semantic.add(note)
                 print("Lisa> Noted. I won't forget.")
             else:
                 print("Lisa> Nothing to remember—try '+remember buy milk'.")
@@ -219,13 +723,33 @@ def run_cli() -> int:
                 print("Lisa> Nothing to tweak.")
             continue
 
+        # "+web <question>" grounds the answer in a web search
+        if user.startswith("+web "):
+            user = user[len("+web "):].strip()
+            tokens = agent.reply_with_search_stream(user)
+        else:
+            tokens = agent.reply_stream(user)
+
+        started = False
         try:
-            answer = agent.reply(user)
-            print(f"Lisa> {answer}")
+            for token in tokens:
+                if not started:
+                    print("Lisa> ", end="")
+                    started = True
+                print(token, end="", flush=True)
+            if started:
+                print()
+            else:
+                print("Lisa> ...")
         except requests.RequestException as e:
-            print("Lisa> I couldn't reach Ollama. Is it running at", DEFAULT_OLLAMA_BASE, "?")
+            if started:
+                print()
+            where = ", ".join(client.backends.base_urls) if client.backends else DEFAULT_OLLAMA_BASE
+            print("Lisa> I couldn't reach Ollama. Is it running at", where, "?")
             print("       Error:", e)
         except Exception as e:
+            if started:
+                print()
             print("Lisa> Oops, something went wrong:", e)
 
     return 0
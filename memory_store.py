@@ -0,0 +1,155 @@
+"""Persistent Memory Store for Lisa-Agent
+
+SQLite-backed drop-in replacement for lisa_agent.MemoryStore. Notes are
+indexed with FTS5 so `+remember` and `+search` stay fast with hundreds of
+thousands of notes, results are ranked with BM25 and every query term
+matches as a prefix ("proj" finds "project").
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts5_available() -> bool:
+    try:
+        sqlite3.connect(":memory:").execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+FTS5_AVAILABLE = _fts5_available()
+
+
+class SQLiteMemoryStore:
+    """Note store with the MemoryStore add/search interface, persisted in SQLite"""
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        Open (or create) a memory database.
+
+        Args:
+            path: SQLite file path, or ":memory:" for a throwaway store
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS notes (
+                id INTEGER PRIMARY KEY,
+                fact TEXT NOT NULL,
+                created REAL NOT NULL
+            );
+        """)
+        if FTS5_AVAILABLE:
+            # External-content index kept in sync by triggers
+            self._db.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts
+                    USING fts5(fact, content='notes', content_rowid='id');
+                CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN
+                    INSERT INTO notes_fts(rowid, fact) VALUES (new.id, new.fact);
+                END;
+                CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN
+                    INSERT INTO notes_fts(notes_fts, rowid, fact) VALUES ('delete', old.id, old.fact);
+                END;
+            """)
+        self._db.commit()
+
+    def add(self, item: str) -> None:
+        with self._lock:
+            self._db.execute("INSERT INTO notes (fact, created) VALUES (?, ?)", (item, time.time()))
+            self._db.commit()
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Return matching notes, best match first"""
+        return [fact for fact, _ in self.search_ranked(query, limit=limit)]
+
+    def search_ranked(self, query: str, limit: Optional[int] = 20, prefix: bool = True) -> List[Tuple[str, float]]:
+        """
+        Full-text search with BM25 ranking.
+
+        Args:
+            query: Free-text query; every word must match
+            limit: Maximum number of hits (None for all)
+            prefix: Match each query word as a prefix
+
+        Returns:
+            List of (note, score) tuples, higher score is better
+        """
+        terms = _TOKEN_RE.findall(query.lower())
+        if not terms:
+            return []
+        limit_sql = -1 if limit is None else limit
+        with self._lock:
+            if FTS5_AVAILABLE:
+                star = "*" if prefix else ""
+                match = " ".join(f'"{t}"{star}' for t in terms)
+                rows = self._db.execute(
+                    "SELECT notes.fact, bm25(notes_fts) FROM notes_fts "
+                    "JOIN notes ON notes.id = notes_fts.rowid "
+                    "WHERE notes_fts MATCH ? ORDER BY bm25(notes_fts) LIMIT ?",
+                    (match, limit_sql),
+                ).fetchall()
+                # bm25() is lower-is-better; flip it so callers can sort descending
+                return [(fact, -score) for fact, score in rows]
+            # Without FTS5, fall back to a substring scan (newest first)
+            where = " AND ".join("fact LIKE ?" for _ in terms)
+            rows = self._db.execute(
+                f"SELECT fact FROM notes WHERE {where} ORDER BY id DESC LIMIT ?",
+                (*[f"%{t}%" for t in terms], limit_sql),
+            ).fetchall()
+            return [(fact, 0.0) for (fact,) in rows]
+
+    def import_facts(self, facts: Iterable[str]) -> int:
+        """Insert many notes in one transaction; returns the number added"""
+        now = time.time()
+        with self._lock:
+            cur = self._db.executemany(
+                "INSERT INTO notes (fact, created) VALUES (?, ?)",
+                ((f, now) for f in facts if f and f.strip()),
+            )
+            self._db.commit()
+            return cur.rowcount
+
+    def export_facts(self) -> Iterator[str]:
+        """Yield every note in insertion order"""
+        with self._lock:
+            rows = self._db.execute("SELECT fact FROM notes ORDER BY id").fetchall()
+        for (fact,) in rows:
+            yield fact
+
+    def import_file(self, path: str) -> int:
+        """Import notes from a JSON Lines file written by export_file()"""
+        with open(path, encoding="utf-8") as fp:
+            return self.import_facts(json.loads(line)["fact"] for line in fp if line.strip())
+
+    def export_file(self, path: str) -> int:
+        """Write every note to a JSON Lines file; returns the number written"""
+        count = 0
+        with open(path, "w", encoding="utf-8") as fp:
+            for fact in self.export_facts():
+                fp.write(json.dumps({"fact": fact}, ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+    @property
+    def facts(self) -> List[str]:
+        """All notes, for code written against MemoryStore.facts"""
+        return list(self.export_facts())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
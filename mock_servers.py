@@ -0,0 +1,178 @@
+"""Mock Servers for Lisa-Agent
+
+Local stand-ins for Ollama, the DuckDuckGo/Bing search APIs and result
+pages, each a threaded HTTP server on an ephemeral port. The benchmark
+drives load against them and the test suite uses them as fixtures.
+
+Usage:
+    with mock_ollama(tokens=5) as ollama:
+        OllamaClient(ollama.url).generate("hi")
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qs, urlparse
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so client pooling is exercised
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, data, status: int = 200) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+
+class _OllamaHandler(_JSONHandler):
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": self.server.model}]})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        body = self._read_json()
+        if self.path == "/api/embeddings":
+            prompt = body.get("prompt", "")
+            self._send_json({"embedding": [float((hash(prompt) >> i) & 0xff) / 255 for i in range(0, 64, 8)]})
+            return
+        if self.path != "/api/generate":
+            self._send_json({"error": "not found"}, 404)
+            return
+        server = self.server
+        tokens = [f" tok{i}" for i in range(server.tokens)]
+        delay = 1.0 / server.token_rate if server.token_rate > 0 else 0.0
+        time.sleep(server.first_token_delay)
+        final = {"done": True, "context": [1, 2, 3], "prompt_eval_count": len(body.get("prompt", "")) // 4,
+                 "eval_count": len(tokens)}
+        if not body.get("stream", True):
+            time.sleep(delay * len(tokens))
+            self._send_json({"response": "".join(tokens), **final})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for token in tokens:
+            self._send_chunk(json.dumps({"response": token, "done": False}).encode() + b"\n")
+            time.sleep(delay)
+        self._send_chunk(json.dumps({"response": "", **final}).encode() + b"\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class _SearchHandler(_JSONHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query).get("q", [""])[0]
+        time.sleep(self.server.latency)
+        if url.path.startswith("/v7.0/search"):
+            self._send_json({"webPages": {"value": [
+                {"name": f"{query} result {i}", "snippet": f"About {query} ({i})", "url": f"https://bing.example/{i}"}
+                for i in range(10)
+            ]}})
+        else:
+            self._send_json({
+                "Heading": query,
+                "Abstract": f"{query} is a thing worth knowing about.",
+                "AbstractURL": "https://ddg.example/abstract",
+                "RelatedTopics": [
+                    {"Text": f"{query} topic {i} - details", "FirstURL": f"https://ddg.example/{i}"}
+                    for i in range(10)
+                ],
+            })
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        page = urlparse(self.path).path.strip("/") or "index"
+        etag = f'"{page}-v1"'
+        time.sleep(self.server.latency)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        paragraphs = "".join(
+            f"<p>Paragraph {i} of {page}. It mentions {page} facts and some filler text.</p>"
+            for i in range(self.server.paragraphs)
+        )
+        body = (f"<html><head><title>{page}</title><style>p {{}}</style></head><body>"
+                f"<script>var tracking = 1;</script><h1>{page}</h1>{paragraphs}</body></html>").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping idle keep-alive connections is expected, not an error
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class MockServer:
+    """Threaded local HTTP server running in the background"""
+
+    def __init__(self, handler: type, **settings):
+        self.httpd = _QuietHTTPServer(("127.0.0.1", 0), handler)
+        for name, value in settings.items():
+            setattr(self.httpd, name, value)
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def __enter__(self) -> "MockServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def mock_ollama(token_rate: float = 100.0, tokens: int = 50, first_token_delay: float = 0.05,
+                model: str = "mock") -> MockServer:
+    """Stand-in for Ollama serving /api/generate (streamed or not), /api/tags and /api/embeddings"""
+    return MockServer(_OllamaHandler, token_rate=token_rate, tokens=tokens,
+                      first_token_delay=first_token_delay, model=model)
+
+
+def mock_search(latency: float = 0.02) -> MockServer:
+    """Stand-in for the DuckDuckGo Instant Answer and Bing Web Search APIs"""
+    return MockServer(_SearchHandler, latency=latency)
+
+
+def mock_pages(latency: float = 0.01, paragraphs: int = 50) -> MockServer:
+    """Stand-in for result pages: HTML with script/style noise and ETag revalidation"""
+    return MockServer(_PageHandler, latency=latency, paragraphs=paragraphs)
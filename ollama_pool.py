@@ -0,0 +1,185 @@
+"""Ollama Backend Pool for Lisa-Agent
+
+Spreads generations across several Ollama hosts. Requests go to the
+healthy backend with the fewest outstanding requests; a background
+thread probes each host's /api/tags, failing hosts (refused connections,
+5xx responses) are ejected for a while, and callers fail over to the
+next host on connection errors. Connection errors to pooled hosts are
+not retried by the HTTP pool, so failover happens at once instead of
+after the pool's backoff.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import requests
+
+from http_pool import HTTPPool, get_default_pool
+
+
+@dataclass
+class Backend:
+    """Routing state for a single Ollama host"""
+    base_url: str
+    healthy: bool = True
+    outstanding: int = 0
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0
+    requests: int = 0
+    failures: int = 0
+
+    def available(self, now: float) -> bool:
+        # An ejected host gets another chance once its ejection expires
+        return self.healthy or now >= self.ejected_until
+
+
+class OllamaBackendPool:
+    """Least-outstanding-requests balancer over several Ollama base URLs"""
+
+    PROBE_TIMEOUT = 2.0
+
+    def __init__(self, base_urls: Iterable[str], pool: Optional[HTTPPool] = None,
+                 health_interval: float = 10.0, failure_threshold: int = 2,
+                 eject_seconds: float = 30.0, start_health_checks: bool = True):
+        """
+        Initialize the backend pool.
+
+        Args:
+            base_urls: Ollama base URLs, e.g. ["http://gpu1:11434", "http://gpu2:11434"]
+            pool: HTTP connection pool (defaults to the shared process-wide pool)
+            health_interval: Seconds between background /api/tags probes
+            failure_threshold: Consecutive failures before a host is ejected
+            eject_seconds: How long an ejected host is skipped without a passing probe
+            start_health_checks: Start the background probe thread immediately
+        """
+        self.backends: List[Backend] = [Backend(url.rstrip("/")) for url in base_urls]
+        if not self.backends:
+            raise ValueError("OllamaBackendPool needs at least one base URL")
+        self.http = pool or get_default_pool()
+        for backend in self.backends:
+            # Another host is a better retry than the same dead one
+            self.http.mount(backend.base_url, connect_retries=0)
+        self.health_interval = health_interval
+        self.failure_threshold = failure_threshold
+        self.eject_seconds = eject_seconds
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if start_health_checks:
+            self.start()
+
+    @classmethod
+    def from_env(cls, **kwargs) -> Optional["OllamaBackendPool"]:
+        """Build a pool from the comma-separated OLLAMA_BASE_URLS, or None if unset"""
+        urls = [u.strip() for u in os.getenv("OLLAMA_BASE_URLS", "").split(",") if u.strip()]
+        return cls(urls, **kwargs) if urls else None
+
+    @property
+    def base_urls(self) -> List[str]:
+        return [b.base_url for b in self.backends]
+
+    def _get(self, base_url: str) -> Backend:
+        for backend in self.backends:
+            if backend.base_url == base_url:
+                return backend
+        raise KeyError(base_url)
+
+    @contextmanager
+    def lease(self, exclude: Iterable[str] = ()) -> Iterator[str]:
+        """
+        Reserve the least-loaded available backend for one request.
+
+        Args:
+            exclude: Base URLs already tried for this request
+
+        Yields:
+            The chosen backend's base URL
+
+        Raises:
+            requests.ConnectionError: If every backend is excluded or ejected
+        """
+        exclude = set(exclude)
+        now = time.monotonic()
+        with self._lock:
+            candidates = [b for b in self.backends if b.base_url not in exclude and b.available(now)]
+            if not candidates:
+                raise requests.ConnectionError(
+                    f"No healthy Ollama backend available (tried: {', '.join(sorted(exclude)) or 'none'})")
+            backend = min(candidates, key=lambda b: (b.outstanding, b.requests))
+            backend.outstanding += 1
+            backend.requests += 1
+        try:
+            yield backend.base_url
+        finally:
+            with self._lock:
+                backend.outstanding -= 1
+
+    def mark_success(self, base_url: str) -> None:
+        with self._lock:
+            backend = self._get(base_url)
+            backend.healthy = True
+            backend.consecutive_failures = 0
+            backend.ejected_until = 0.0
+
+    def mark_failure(self, base_url: str) -> None:
+        """Count a refused connection or 5xx response; enough in a row eject the host"""
+        with self._lock:
+            backend = self._get(base_url)
+            backend.failures += 1
+            backend.consecutive_failures += 1
+            if backend.consecutive_failures >= self.failure_threshold:
+                backend.healthy = False
+                backend.ejected_until = time.monotonic() + self.eject_seconds
+
+    def probe(self, base_url: str) -> bool:
+        """Check one backend via GET /api/tags and update its state"""
+        try:
+            resp = self.http.get(f"{base_url}/api/tags", timeout=self.http.timeout(read=self.PROBE_TIMEOUT))
+            ok = resp.status_code == 200
+        except requests.RequestException:
+            ok = False
+        if ok:
+            self.mark_success(base_url)
+        else:
+            self.mark_failure(base_url)
+        return ok
+
+    def check_health(self) -> Dict[str, bool]:
+        """Probe every backend once"""
+        return {url: self.probe(url) for url in self.base_urls}
+
+    def _health_loop(self) -> None:
+        while not self._stop.wait(self.health_interval):
+            self.check_health()
+
+    def start(self) -> None:
+        """Start background health probes"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._health_loop, name="ollama-health", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop background health probes"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.PROBE_TIMEOUT + 1)
+            self._thread = None
+
+    def status(self) -> List[Dict]:
+        """Return a snapshot of every backend's routing state"""
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                'base_url': b.base_url,
+                'healthy': b.healthy,
+                'available': b.available(now),
+                'outstanding': b.outstanding,
+                'requests': b.requests,
+                'failures': b.failures,
+            } for b in self.backends]
@@ -0,0 +1,319 @@
+"""Page Fetch Module for Lisa-Agent
+
+Downloads the pages behind top search results so research answers can
+use more than the Instant Answer abstract:
+
+- Pages are fetched concurrently, each capped in bytes and wall time.
+- HTML is parsed incrementally as it streams in; script, style and other
+  non-content elements are skipped and the whole page is never held as
+  one raw string.
+- Readable text is split into chunks and only the chunks most relevant
+  to the query are handed on to the model.
+- Fetched text is cached per URL and revalidated with ETag or
+  Last-Modified, so an unchanged page costs a 304 instead of a download.
+"""
+
+import codecs
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional
+
+from http_pool import HTTPPool, get_default_pool
+from tokens import estimate_tokens
+
+# Elements whose text is never page content
+_SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'head', 'nav', 'footer', 'form'}
+# Elements that end a block of text
+_BLOCK_TAGS = {'p', 'div', 'section', 'article', 'main', 'li', 'ul', 'ol', 'br', 'tr', 'table',
+               'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'header', 'aside'}
+_WORD = re.compile(r"[a-z0-9]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class _TextExtractor(HTMLParser):
+    """Incremental HTML-to-text parser; feed() it as chunks arrive"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[str] = []
+        self._current: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in _BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._current.append(data)
+
+    def _flush(self) -> None:
+        text = " ".join("".join(self._current).split())
+        self._current = []
+        if text:
+            self.blocks.append(text)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+@dataclass
+class Page:
+    """Readable text of one fetched URL"""
+    url: str
+    text: str
+    status: int
+    from_cache: bool = False
+    bytes_read: int = 0
+    truncated: bool = False
+    error: Optional[str] = None
+
+
+class PageCache:
+    """LRU cache of page text keyed by URL, with validators for revalidation"""
+
+    def __init__(self, max_entries: int = 200):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.revalidated = 0
+        self.misses = 0
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def put(self, url: str, text: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        # Without a validator the entry could never be revalidated
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._entries[url] = {'text': text, 'etag': etag, 'last_modified': last_modified}
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def count(self, revalidated: bool) -> None:
+        with self._lock:
+            if revalidated:
+                self.revalidated += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'revalidated': self.revalidated, 'misses': self.misses}
+
+
+def chunk_text(text: str, chunk_tokens: int = 150) -> List[str]:
+    """
+    Split text into chunks of roughly ``chunk_tokens`` estimated tokens.
+
+    Paragraph and sentence boundaries are kept where possible.
+    """
+    chunks, current, size = [], [], 0
+    for paragraph in text.split("\n"):
+        for sentence in _SENTENCE_END.split(paragraph):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            tokens = estimate_tokens(sentence)
+            if current and size + tokens > chunk_tokens:
+                chunks.append(" ".join(current))
+                current, size = [], 0
+            current.append(sentence)
+            size += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def rank_chunks(query: str, chunks: Iterable[str]) -> List[tuple]:
+    """
+    Score chunks by query-term overlap, weighting rarer terms higher.
+
+    Returns:
+        (score, chunk) pairs with a positive score, best first
+    """
+    chunks = list(chunks)
+    terms = set(_WORD.findall(query.lower()))
+    if not terms or not chunks:
+        return []
+    counted = [Counter(_WORD.findall(chunk.lower())) for chunk in chunks]
+    df = {term: sum(1 for counts in counted if term in counts) for term in terms}
+    scored = []
+    for chunk, counts in zip(chunks, counted):
+        score = sum(
+            (1 + math.log(counts[term])) * math.log(1 + len(chunks) / df[term])
+            for term in terms if counts[term]
+        )
+        if score > 0:
+            # Mild length normalization so long chunks don't win by size alone
+            scored.append((score / math.sqrt(max(1, sum(counts.values())) / 50 + 1), chunk))
+    scored.sort(key=lambda pair: -pair[0])
+    return scored
+
+
+def _decoder(encoding: Optional[str]) -> codecs.IncrementalDecoder:
+    """Incremental decoder for a page's charset; UTF-8 if it is missing or unknown"""
+    try:
+        info = codecs.lookup(encoding or 'utf-8')
+    except LookupError:
+        info = codecs.lookup('utf-8')
+    return info.incrementaldecoder(errors='replace')
+
+
+class PageFetcher:
+    """Concurrent, size- and time-capped page downloader with a content cache"""
+
+    def __init__(self, pool: Optional[HTTPPool] = None, cache: Optional[PageCache] = None,
+                 max_bytes: int = 512 * 1024, timeout: float = 5.0, max_workers: int = 4):
+        """
+        Initialize the fetcher.
+
+        Args:
+            pool: Shared HTTP pool (defaults to the process-wide pool)
+            cache: Page content cache (a private one is created if None)
+            max_bytes: Stop reading a page after this many bytes
+            timeout: Seconds allowed per page, including the body
+            max_workers: Pages fetched at the same time
+        """
+        self.pool = pool or get_default_pool()
+        self.cache = cache if cache is not None else PageCache()
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lisa-fetch")
+
+    def fetch(self, url: str) -> Page:
+        """
+        Download one page and extract its readable text.
+
+        Errors are reported on the returned Page rather than raised.
+        """
+        deadline = time.monotonic() + self.timeout
+        cached = self.cache.get(url)
+        headers = {'Accept': 'text/html,text/plain;q=0.9'}
+        if cached is not None:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+        try:
+            response = self.pool.get(url, headers=headers, stream=True,
+                                     timeout=self.pool.timeout(read=self.timeout))
+        except Exception as e:
+            return Page(url, "", 0, error=str(e))
+
+        with response:
+            if response.status_code == 304 and cached is not None:
+                self.cache.count(revalidated=True)
+                return Page(url, cached['text'], 304, from_cache=True)
+            if response.status_code >= 400:
+                return Page(url, "", response.status_code, error=f"HTTP {response.status_code}")
+            content_type = response.headers.get('Content-Type', 'text/html')
+            if 'html' not in content_type and 'text/plain' not in content_type:
+                return Page(url, "", response.status_code, error=f"unsupported content type {content_type}")
+            self.cache.count(revalidated=False)
+
+            parser = _TextExtractor() if 'html' in content_type else None
+            plain: List[str] = []
+            # requests assumes ISO-8859-1 for text/* without a charset; the web is mostly UTF-8
+            encoding = response.encoding if 'charset' in content_type.lower() else 'utf-8'
+            decoder = _decoder(encoding)
+            bytes_read, truncated = 0, False
+            try:
+                for raw in response.iter_content(chunk_size=min(16 * 1024, self.max_bytes)):
+                    bytes_read += len(raw)
+                    text = decoder.decode(raw)
+                    if parser is not None:
+                        parser.feed(text)
+                    else:
+                        plain.append(text)
+                    if bytes_read >= self.max_bytes or time.monotonic() >= deadline:
+                        truncated = True
+                        break
+                tail = decoder.decode(b"", final=True)
+                if parser is not None:
+                    parser.feed(tail)
+                    parser.close()
+                else:
+                    plain.append(tail)
+            except Exception as e:
+                return Page(url, "", response.status_code, bytes_read=bytes_read, error=str(e))
+
+            text = "\n".join(parser.blocks) if parser is not None else "".join(plain)
+            if not truncated:
+                self.cache.put(url, text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            return Page(url, text, response.status_code, bytes_read=bytes_read, truncated=truncated)
+
+    def fetch_many(self, urls: Iterable[str], deadline: Optional[float] = None) -> List[Page]:
+        """
+        Fetch several pages concurrently.
+
+        Args:
+            urls: Page URLs
+            deadline: Seconds to wait for all pages (default: timeout + 1)
+
+        Returns:
+            Pages that finished in time, in the order of ``urls``
+        """
+        urls = list(dict.fromkeys(u for u in urls if u))
+        futures = {self._executor.submit(self.fetch, url): url for url in urls}
+        done: Dict[str, Page] = {}
+        try:
+            for future in as_completed(futures, timeout=self.timeout + 1 if deadline is None else deadline):
+                page = future.result()
+                done[page.url] = page
+        except FuturesTimeoutError:
+            pass
+        return [done[url] for url in urls if url in done]
+
+    def relevant_chunks(self, query: str, urls: Iterable[str], token_budget: int = 600,
+                        chunk_tokens: int = 150) -> List[Dict]:
+        """
+        Fetch pages and keep the chunks most relevant to ``query``.
+
+        Returns:
+            Dicts with 'url', 'text' and 'score', best first, whose
+            estimated tokens fit within ``token_budget``
+        """
+        candidates = []
+        for page in self.fetch_many(urls):
+            if page.error or not page.text:
+                continue
+            for score, chunk in rank_chunks(query, chunk_text(page.text, chunk_tokens)):
+                candidates.append({'url': page.url, 'text': chunk, 'score': score})
+        candidates.sort(key=lambda c: -c['score'])
+        selected, used = [], 0
+        for candidate in candidates:
+            tokens = estimate_tokens(candidate['text'])
+            if used + tokens > token_budget:
+                continue
+            selected.append(candidate)
+            used += tokens
+        return selected
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,156 @@
+"""Response Cache Module for Lisa-Agent
+
+Caches model replies for identical requests, keyed on model, sampling
+options, final system prompt and prompt text. Entries are evicted LRU-first once the
+byte cap is reached and expire after a TTL. An optional SQLite file
+keeps the cache across restarts.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+def is_deterministic(options: Optional[Dict]) -> bool:
+    """
+    Return True if these Ollama sampling options always give the same output.
+
+    Ollama samples at temperature 0.8 with a random seed by default, so a
+    reply is only reproducible with temperature 0 or a fixed seed.
+    """
+    if not options:
+        return False
+    return options.get('temperature') == 0 or options.get('seed') is not None
+
+
+def make_key(model: str, system: Optional[str], prompt: str, options: Optional[Dict] = None) -> str:
+    """Hash the parts of a request that determine the reply, sampling options included"""
+    h = hashlib.sha256()
+    # Canonical form, so the same options in any order give the same key
+    canonical = json.dumps(options or {}, sort_keys=True, separators=(",", ":"))
+    for part in (model, canonical, system or "", prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResponseCache:
+    """LRU + TTL cache of model replies with an optional SQLite backend"""
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, ttl: float = 24 * 3600,
+                 path: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Cap on the total size of cached replies (UTF-8 bytes)
+            ttl: Seconds before an entry expires
+            path: Optional SQLite file to persist entries across restarts
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.path = path
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, used REAL NOT NULL)"
+            )
+            self._db.commit()
+            self._load()
+
+    def _load(self) -> None:
+        # Warm the in-memory LRU from disk, most recently used last
+        cutoff = time.time() - self.ttl
+        self._db.execute("DELETE FROM responses WHERE created < ?", (cutoff,))
+        rows = self._db.execute("SELECT key, value, created FROM responses ORDER BY used").fetchall()
+        for key, value, created in rows:
+            self._store(key, value, created)
+        self._db.commit()
+
+    def _store(self, key: str, value: str, created: float) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old[0].encode("utf-8"))
+        self._entries[key] = (value, created)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            evicted, (evicted_value, _) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted_value.encode("utf-8"))
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (evicted,))
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached reply for ``key``, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] > self.ttl:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if self._db is not None:
+                self._db.execute("UPDATE responses SET used = ? WHERE key = ?", (now, key))
+                self._db.commit()
+            return entry[0]
+
+    def put(self, key: str, value: str) -> None:
+        """Store a reply"""
+        now = time.time()
+        with self._lock:
+            self._store(key, value, now)
+            if self._db is not None and key in self._entries:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created, used) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                self._db.commit()
+
+    def _drop(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value.encode("utf-8"))
+        if self._db is not None:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self) -> Dict:
+        """Return entry count, size and hit-rate counters"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
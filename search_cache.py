@@ -0,0 +1,209 @@
+"""Search Cache Module for Lisa-Agent
+
+Caches web search results keyed on normalized query, provider and
+max_results, with a TTL, an LRU size bound and short-lived negative
+caching for empty results. Identical in-flight lookups are coalesced so
+a burst of users asking the same thing makes a single upstream call.
+An optional SQLite file keeps entries across restarts; it holds the same
+entries as memory, so it is bounded by the same LRU limit.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class _InFlight:
+    """A lookup being fetched by one thread while others wait on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.results: List[Dict] = []
+        self.error: Optional[BaseException] = None
+
+
+class SearchCache:
+    """TTL + LRU search result cache with single-flight fetching"""
+
+    # Seconds between sweeps of expired rows from the SQLite file
+    PURGE_INTERVAL = 60.0
+
+    def __init__(self, ttl: float = 600, negative_ttl: float = 30, max_entries: int = 1000,
+                 path: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds a non-empty result set stays fresh
+            negative_ttl: Seconds an empty result set is remembered
+            max_entries: LRU bound on in-memory entries
+            path: Optional SQLite file to persist entries across restarts
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[List[Dict], float]]" = OrderedDict()
+        self._inflight: Dict[str, _InFlight] = {}
+        # Keys evicted or expired in memory, deleted from SQLite on the next put
+        self._dropped: List[str] = []
+        self._purged = time.time()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache (key TEXT PRIMARY KEY, results TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM search_cache WHERE expires < ?", (time.time(),))
+            self._db.commit()
+
+    @staticmethod
+    def make_key(provider: str, query: str, max_results: int) -> str:
+        normalized = " ".join(query.lower().split())
+        return f"{provider}\x1f{max_results}\x1f{normalized}"
+
+    def _lookup(self, key: str, now: float) -> Optional[List[Dict]]:
+        # Caller holds self._lock
+        entry = self._entries.get(key)
+        if entry is None and self._db is not None:
+            row = self._db.execute("SELECT results, expires FROM search_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                entry = (json.loads(row[0]), row[1])
+                self._insert(key, *entry)
+        if entry is None:
+            return None
+        results, expires = entry
+        if now >= expires:
+            del self._entries[key]
+            self._dropped.append(key)
+            return None
+        self._entries.move_to_end(key)
+        return results
+
+    def _insert(self, key: str, results: List[Dict], expires: float) -> None:
+        self._entries[key] = (results, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._dropped.append(evicted)
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Return cached results (possibly an empty list), or None on a miss"""
+        with self._lock:
+            results = self._lookup(key, time.time())
+            if results is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return [dict(r) for r in results]
+
+    def put(self, key: str, results: List[Dict]) -> None:
+        expires = time.time() + (self.ttl if results else self.negative_ttl)
+        stored = [dict(r) for r in results]
+        with self._lock:
+            self._insert(key, stored, expires)
+            if self._db is None:
+                self._dropped.clear()
+                return
+            dropped = [k for k in self._dropped if k not in self._entries]
+            self._dropped.clear()
+            now = time.time()
+            with self._db:  # one transaction
+                self._db.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, results, expires) VALUES (?, ?, ?)",
+                    (key, json.dumps(stored), expires),
+                )
+                self._db.executemany("DELETE FROM search_cache WHERE key = ?", [(k,) for k in dropped])
+                if now - self._purged >= self.PURGE_INTERVAL:
+                    self._db.execute("DELETE FROM search_cache WHERE expires < ?", (now,))
+                    self._purged = now
+
+    def get_or_fetch(self, provider: str, query: str, max_results: int,
+                     fetch: Callable[[], List[Dict]]) -> List[Dict]:
+        """
+        Return cached results, or fetch them once for all concurrent callers.
+
+        Args:
+            provider: Provider name, part of the key
+            query: Search query (normalized for the key)
+            max_results: Result limit, part of the key
+            fetch: Performs the upstream call; exceptions are re-raised to
+                every waiting caller and nothing is cached
+
+        Returns:
+            List of search result dictionaries
+        """
+        key = self.make_key(provider, query, max_results)
+        with self._lock:
+            results = self._lookup(key, time.time())
+            if results is not None:
+                self.hits += 1
+                return [dict(r) for r in results]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                self.misses += 1
+                call = self._inflight[key] = _InFlight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return [dict(r) for r in call.results]
+
+        try:
+            call.results = fetch()
+            self.put(key, call.results)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+        return [dict(r) for r in call.results]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM search_cache")
+                self._db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+_default_cache: Optional[SearchCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_search_cache() -> SearchCache:
+    """Process-wide search cache; LISA_SEARCH_CACHE sets an optional SQLite path"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SearchCache(path=os.getenv("LISA_SEARCH_CACHE") or None)
+        return _default_cache
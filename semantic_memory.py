@@ -0,0 +1,248 @@
+"""Semantic Memory Module for Lisa-Agent
+
+Embedding-backed note index, so memory lookups find paraphrases rather
+than exact substrings. Vectors live in one contiguous float32 matrix and
+queries are scored with a single batched cosine similarity. With a path,
+vectors are appended to a file and memory-mapped, so large stores don't
+have to fit in RAM. A small header file records the vector size, count
+and embedder; if it doesn't match the files on disk (a crash between
+writes, a different embedding model), the vectors are rebuilt from the
+notes on load.
+
+Embeddings come from Ollama's /api/embeddings or from any object with an
+``embed(texts) -> np.ndarray`` method (see HashingEmbedder).
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from http_pool import HTTPPool, get_default_pool
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _normalize(matrix: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class OllamaEmbedder:
+    """Embeds text with an Ollama embedding model"""
+
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "nomic-embed-text",
+                 pool: Optional[HTTPPool] = None):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.pool = pool or get_default_pool()
+        self.name = f"ollama:{model}"
+
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        vectors = []
+        for text in texts:
+            resp = self.pool.post(f"{self.base_url}/api/embeddings", json={"model": self.model, "prompt": text})
+            resp.raise_for_status()
+            vectors.append(resp.json()["embedding"])
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class HashingEmbedder:
+    """Local, dependency-free embedder using hashed word and bigram features.
+
+    Much weaker than a neural model, but it needs no server and still
+    rewards shared vocabulary regardless of word order.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing:{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        words = _TOKEN_RE.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                out[row, value % self.dim] += 1.0 if value >> 63 else -1.0
+        return out
+
+
+class SemanticMemory:
+    """Note store ranked by embedding similarity"""
+
+    # Rows scored per matmul, bounding temporary memory for mmapped stores
+    BLOCK_ROWS = 65536
+
+    def __init__(self, embedder=None, path: Optional[str] = None):
+        """
+        Initialize the index.
+
+        Args:
+            embedder: Object with ``embed(texts) -> np.ndarray`` (default: HashingEmbedder)
+            path: Optional file prefix; vectors go to ``<path>.f32`` (memory-mapped),
+                notes to ``<path>.jsonl`` and the header to ``<path>.meta.json``
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy not installed. Run: pip install numpy")
+        self.embedder = embedder or HashingEmbedder()
+        self.path = path
+        self.facts: List[str] = []
+        self.dim: Optional[int] = None
+        self._lock = threading.Lock()
+        # In-memory mode: preallocated matrix grown by doubling
+        self._matrix: Optional["np.ndarray"] = None
+        self._mmap: Optional["np.ndarray"] = None
+        if path:
+            self._load()
+
+    # ---- persistence ----
+
+    def _vec_path(self) -> str:
+        return f"{self.path}.f32"
+
+    def _facts_path(self) -> str:
+        return f"{self.path}.jsonl"
+
+    def _meta_path(self) -> str:
+        return f"{self.path}.meta.json"
+
+    def _embedder_name(self) -> str:
+        return getattr(self.embedder, "name", type(self.embedder).__name__)
+
+    def _write_meta(self) -> None:
+        meta = {"dim": self.dim, "count": len(self.facts), "embedder": self._embedder_name()}
+        tmp = self._meta_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fp:
+            json.dump(meta, fp)
+        os.replace(tmp, self._meta_path())
+
+    def _load(self) -> None:
+        if not os.path.exists(self._facts_path()):
+            return
+        with open(self._facts_path(), encoding="utf-8") as fp:
+            self.facts = [json.loads(line)["fact"] for line in fp if line.strip()]
+        if not self.facts:
+            return
+        try:
+            with open(self._meta_path(), encoding="utf-8") as fp:
+                meta = json.load(fp)
+            dim, count = int(meta["dim"]), int(meta["count"])
+            valid = (count == len(self.facts) and meta.get("embedder") == self._embedder_name()
+                     and os.path.getsize(self._vec_path()) == 4 * dim * count)
+        except (OSError, ValueError, KeyError, TypeError):
+            valid = False
+        if valid:
+            self.dim = dim
+        else:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        """Re-embed every note and rewrite the vector file and header"""
+        vectors = _normalize(np.asarray(self.embedder.embed(self.facts), dtype=np.float32))
+        self.dim = vectors.shape[1]
+        tmp = self._vec_path() + ".tmp"
+        with open(tmp, "wb") as fp:
+            fp.write(np.ascontiguousarray(vectors).tobytes())
+        os.replace(tmp, self._vec_path())
+        self._mmap = None
+        self._write_meta()
+
+    def _vectors(self) -> "np.ndarray":
+        n = len(self.facts)
+        if not self.path:
+            return self._matrix[:n] if self._matrix is not None else np.zeros((0, self.dim or 0), np.float32)
+        if n == 0:
+            return np.zeros((0, self.dim or 0), np.float32)
+        if self._mmap is None or self._mmap.shape[0] != n:
+            self._mmap = np.memmap(self._vec_path(), dtype=np.float32, mode="r", shape=(n, self.dim))
+        return self._mmap
+
+    def _append(self, facts: List[str], vectors: "np.ndarray") -> None:
+        n = len(self.facts)
+        if self.path:
+            with open(self._vec_path(), "ab") as fp:
+                fp.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            with open(self._facts_path(), "a", encoding="utf-8") as fp:
+                for fact in facts:
+                    fp.write(json.dumps({"fact": fact}, ensure_ascii=False) + "\n")
+        else:
+            needed = n + len(facts)
+            if self._matrix is None or needed > self._matrix.shape[0]:
+                capacity = max(needed, 2 * (self._matrix.shape[0] if self._matrix is not None else 64))
+                grown = np.zeros((capacity, self.dim), dtype=np.float32)
+                if n:
+                    grown[:n] = self._matrix[:n]
+                self._matrix = grown
+            self._matrix[n:needed] = vectors
+        self.facts.extend(facts)
+        if self.path:
+            # Written last: a crash before this leaves a header that no
+            # longer matches, and the next load rebuilds the vectors
+            self._write_meta()
+
+    # ---- public API ----
+
+    def add(self, item: str) -> None:
+        self.add_many([item])
+
+    def add_many(self, items: Iterable[str]) -> int:
+        """Embed and store many notes with one embedder call"""
+        items = [i for i in items if i and i.strip()]
+        if not items:
+            return 0
+        vectors = _normalize(np.asarray(self.embedder.embed(items), dtype=np.float32))
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding size {vectors.shape[1]} doesn't match index size {self.dim}")
+            self._append(items, vectors)
+        return len(items)
+
+    def top_k(self, query: str, k: int = 5, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        Return the ``k`` notes most similar to ``query``.
+
+        Args:
+            query: Free-text query
+            k: Number of results
+            min_score: Drop hits with cosine similarity below this
+
+        Returns:
+            List of (note, cosine similarity), best first
+        """
+        with self._lock:
+            if not self.facts:
+                return []
+            matrix = self._vectors()
+            facts = self.facts
+        q = _normalize(np.asarray(self.embedder.embed([query]), dtype=np.float32))[0]
+        scores = np.empty(matrix.shape[0], dtype=np.float32)
+        for start in range(0, matrix.shape[0], self.BLOCK_ROWS):
+            block = matrix[start:start + self.BLOCK_ROWS]
+            np.dot(block, q, out=scores[start:start + block.shape[0]])
+        k = min(k, scores.shape[0])
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(facts[i], float(scores[i])) for i in best if scores[i] >= min_score]
+
+    def search(self, query: str, k: int = 5) -> List[str]:
+        """MemoryStore-compatible search returning notes only"""
+        return [fact for fact, _ in self.top_k(query, k)]
+
+    def __len__(self) -> int:
+        return len(self.facts)
@@ -0,0 +1,237 @@
+"""Shared Resources Module for Lisa-Agent
+
+One copy per process of the objects that are expensive to build and
+safe to share between users: the Ollama client and its connection pool,
+the reply cache, the web search engine and the TTS engine with its
+speech cache. Each user session holds references to what it uses.
+Per-user state (conversation history, notes, persona, the speech queue)
+is never put here, so every session keeps its own.
+
+Resources are reference-counted. A resource marked ``persistent`` stays
+up for the life of the process; any other resource is closed when its
+last user goes away. Everything still open is closed at interpreter
+exit, newest first.
+
+Usage:
+    session = Session()                     # one per user
+    client = session.get(OLLAMA_CLIENT)
+    ...
+    session.close()                         # or just drop the session
+"""
+
+import atexit
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Names of the standard shared resources
+HTTP_POOL = "http_pool"
+OLLAMA_CLIENT = "ollama_client"
+RESPONSE_CACHE = "response_cache"
+SEARCH_ENGINE = "search_engine"
+TTS_ENGINE = "tts_engine"
+
+
+@dataclass
+class _Entry:
+    value: Any
+    close: Optional[Callable[[Any], None]]
+    persistent: bool
+    refs: int = 0
+
+
+class ResourceRegistry:
+    """Process-wide, reference-counted objects built once on first use"""
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        # Set when the resource being built under that name is ready (or failed)
+        self._building: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.closed = 0
+
+    def acquire(self, name: str, factory: Callable[[], Any],
+                close: Optional[Callable[[Any], None]] = None, persistent: bool = False) -> Any:
+        """
+        Take a reference to ``name``, building it with ``factory`` if needed.
+
+        Args:
+            name: Resource name; every caller of a name gets the same object
+            factory: Builds the resource; only called for the first reference
+            close: Releases the resource (default: its close() method, if any)
+            persistent: Keep it open after the last reference is released
+
+        Returns:
+            The shared object
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is not None:
+                    entry.refs += 1
+                    return entry.value
+                building = self._building.get(name)
+                if building is None:
+                    building = self._building[name] = threading.Event()
+                    break
+            # Someone else is building it; look again once they are done
+            building.wait()
+        # Built outside the lock: a slow factory only holds up callers of
+        # the same name, and may itself acquire other resources
+        try:
+            value = factory()
+        except BaseException:
+            with self._lock:
+                del self._building[name]
+            building.set()
+            raise
+        with self._lock:
+            self._entries[name] = _Entry(value, close, persistent, refs=1)
+            del self._building[name]
+            self.created += 1
+        building.set()
+        return value
+
+    def release(self, name: str) -> None:
+        """Drop a reference; closes the resource when it was the last one"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return
+            entry.refs = max(0, entry.refs - 1)
+            if entry.refs or entry.persistent:
+                return
+            del self._entries[name]
+        self._close(name, entry)
+
+    def _close(self, name: str, entry: _Entry) -> None:
+        try:
+            if entry.close is not None:
+                entry.close(entry.value)
+            elif hasattr(entry.value, "close"):
+                entry.value.close()
+        except Exception as e:
+            print(f"Error closing shared {name}: {e}")
+        with self._lock:
+            self.closed += 1
+
+    def stats(self) -> Dict[str, int]:
+        """References held on each open resource"""
+        with self._lock:
+            return {name: entry.refs for name, entry in self._entries.items()}
+
+    def shutdown(self) -> None:
+        """Close every resource, newest first, whatever its reference count"""
+        with self._lock:
+            entries = list(self._entries.items())
+            self._entries.clear()
+        for name, entry in reversed(entries):
+            self._close(name, entry)
+
+
+RESOURCES = ResourceRegistry()
+atexit.register(RESOURCES.shutdown)
+
+
+def _release_all(registry: ResourceRegistry, names: List[str]) -> None:
+    while names:
+        registry.release(names.pop())
+
+
+class Session:
+    """The shared resources one user holds; released on close() or garbage collection"""
+
+    def __init__(self, registry: Optional[ResourceRegistry] = None):
+        self.registry = registry or RESOURCES
+        self._names: List[str] = []
+        # Streamlit never tells us a session ended; it just drops its state
+        self._finalizer = weakref.finalize(self, _release_all, self.registry, self._names)
+
+    def get(self, name: str, factory: Optional[Callable[[], Any]] = None,
+            close: Optional[Callable[[Any], None]] = None, persistent: bool = False) -> Any:
+        """
+        Shared resource ``name``; a session holds at most one reference to each.
+
+        Without a ``factory``, ``name`` must be one of the STANDARD resources.
+        """
+        if factory is None:
+            factory, close, persistent = STANDARD[name]
+        value = self.registry.acquire(name, factory, close, persistent)
+        if name in self._names:
+            self.registry.release(name)
+        else:
+            self._names.append(name)
+        return value
+
+    def drop(self, name: str) -> None:
+        """Stop using one resource"""
+        if name in self._names:
+            self._names.remove(name)
+            self.registry.release(name)
+
+    def close(self) -> None:
+        self._finalizer()
+
+
+# --------------------------- Standard resources ---------------------------
+
+def _http_pool():
+    from http_pool import get_default_pool
+    return get_default_pool()
+
+
+def _ollama_client():
+    # Backends come from OLLAMA_BASE_URLS, sampling from LISA_TEMPERATURE etc.
+    from lisa_agent import OllamaClient, options_from_env
+    from ollama_pool import OllamaBackendPool
+    return OllamaClient(pool=RESOURCES.acquire(HTTP_POOL, *STANDARD[HTTP_POOL]),
+                        backends=OllamaBackendPool.from_env(), options=options_from_env())
+
+
+def _close_ollama_client(client) -> None:
+    if client.backends is not None:
+        client.backends.stop()
+    RESOURCES.release(HTTP_POOL)
+
+
+def _response_cache():
+    # None when LISA_RESPONSE_CACHE is unset: caching stays opt-in
+    from response_cache import ResponseCache
+    path = os.getenv("LISA_RESPONSE_CACHE")
+    if not path:
+        return None
+    return ResponseCache(path=None if path == ":memory:" else path)
+
+
+def _search_engine():
+    from web_search import get_engine
+    return get_engine()
+
+
+def _close_search_engine(_) -> None:
+    from web_search import shutdown_engines
+    shutdown_engines(wait=False)
+
+
+def _tts_engine():
+    # One TTS engine and speech cache for every session; each session
+    # speaks through its own SpeechPipeline, so stopping one doesn't stop all
+    from speech_cache import SpeechCache
+    from voice_interaction import TextToSpeech, warm_up
+    tts = TextToSpeech(cache=SpeechCache(path=os.getenv("LISA_SPEECH_CACHE") or None))
+    warm_up(tts)
+    return tts
+
+
+# name -> (factory, close, persistent)
+STANDARD: Dict[str, Tuple[Callable[[], Any], Optional[Callable[[Any], None]], bool]] = {
+    HTTP_POOL: (_http_pool, None, True),
+    OLLAMA_CLIENT: (_ollama_client, _close_ollama_client, True),
+    RESPONSE_CACHE: (_response_cache, None, True),
+    SEARCH_ENGINE: (_search_engine, _close_search_engine, True),
+    # Holds the audio device; freed once nobody has voice on
+    TTS_ENGINE: (_tts_engine, None, False),
+}
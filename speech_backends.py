@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Speech Recognition Backends for Lisa-Agent
+
+One interface over several speech recognizers, so SpeechToText is no
+longer tied to the Google web API:
+
+- GoogleBackend: SpeechRecognition's recognize_google (online).
+- VoskBackend: offline Kaldi models through the ``vosk`` package. The
+  model is loaded once per process and stays resident; streaming
+  sessions report partial hypotheses while the user is still talking.
+
+Batch mode transcribes many WAV files through a process pool, with the
+backend loaded once per worker. The benchmark reports real-time factor
+(processing time / audio length; below 1 is faster than real time).
+
+Run:
+  python speech_backends.py transcribe --backend vosk a.wav b.wav
+  python speech_backends.py bench --backends vosk,google samples/*.wav
+
+Environment variables (optional):
+  LISA_STT_BACKEND  default: google
+  LISA_VOSK_MODEL   path to an unpacked Vosk model directory
+"""
+
+import abc
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import vosk
+
+# vosk loads its native library on import; defer that to VoskBackend
+VOSK_AVAILABLE = importlib.util.find_spec("vosk") is not None
+
+
+def read_wav(path: str) -> Tuple[bytes, int, int]:
+    """Read a mono WAV file as (pcm, sample_rate, sample_width)"""
+    with wave.open(path, "rb") as wav:
+        if wav.getnchannels() != 1:
+            raise ValueError(f"{path}: expected mono audio")
+        return wav.readframes(wav.getnframes()), wav.getframerate(), wav.getsampwidth()
+
+
+class StreamingSession(abc.ABC):
+    """Incremental recognition of one utterance"""
+
+    @abc.abstractmethod
+    def accept(self, pcm: bytes) -> Optional[str]:
+        """Feed audio; return the current partial hypothesis, if the backend has one"""
+
+    @abc.abstractmethod
+    def final(self) -> Optional[str]:
+        """Finish the utterance and return its transcript"""
+
+
+class _BufferedSession(StreamingSession):
+    """For backends without streaming: collect audio, transcribe at the end"""
+
+    def __init__(self, backend: "RecognizerBackend", sample_rate: int, sample_width: int):
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self._chunks: List[bytes] = []
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        self._chunks.append(pcm)
+        return None
+
+    def final(self) -> Optional[str]:
+        return self.backend.transcribe(b"".join(self._chunks), self.sample_rate, self.sample_width)
+
+
+class RecognizerBackend(abc.ABC):
+    """Base class for speech recognizers"""
+    name = "base"
+    supports_partials = False
+    # Sample rate the engine wants; None accepts the capture rate as is
+    sample_rate: Optional[int] = None
+
+    @abc.abstractmethod
+    def transcribe(self, pcm: bytes, sample_rate: int, sample_width: int = 2) -> Optional[str]:
+        """Transcribe a complete utterance; None if nothing was understood"""
+
+    def stream(self, sample_rate: int, sample_width: int = 2) -> StreamingSession:
+        """Start an incremental session for one utterance"""
+        return _BufferedSession(self, sample_rate, sample_width)
+
+
+class GoogleBackend(RecognizerBackend):
+    """Google Web Speech API via SpeechRecognition (needs network)"""
+    name = "google"
+
+    def __init__(self, language: str = "en-US"):
+        import speech_recognition as sr
+
+        self._sr = sr
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, pcm: bytes, sample_rate: int, sample_width: int = 2) -> Optional[str]:
+        audio = self._sr.AudioData(pcm, sample_rate, sample_width)
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language)
+        except self._sr.UnknownValueError:
+            return None
+
+
+class _VoskSession(StreamingSession):
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        # Text Vosk has settled at internal pauses; final() must include it
+        self._settled: List[str] = []
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        if self.recognizer.AcceptWaveform(pcm):
+            text = json.loads(self.recognizer.Result()).get("text")
+            if text:
+                self._settled.append(text)
+            partial = ""
+        else:
+            partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return " ".join(self._settled + [partial]).strip() or None
+
+    def final(self) -> Optional[str]:
+        text = json.loads(self.recognizer.FinalResult()).get("text")
+        return " ".join(self._settled + [text or ""]).strip() or None
+
+
+class VoskBackend(RecognizerBackend):
+    """Offline recognition with a Vosk (Kaldi) model kept resident in memory"""
+    name = "vosk"
+    supports_partials = True
+    sample_rate = 16000
+
+    # Models are large and slow to load; share one per path in this process
+    _models: Dict[str, "vosk.Model"] = {}
+    _models_lock = threading.Lock()
+
+    def __init__(self, model_path: Optional[str] = None):
+        """
+        Args:
+            model_path: Unpacked Vosk model directory (default: LISA_VOSK_MODEL)
+        """
+        if not VOSK_AVAILABLE:
+            raise ImportError("vosk not installed. Run: pip install vosk")
+        model_path = model_path or os.getenv("LISA_VOSK_MODEL")
+        if not model_path:
+            raise ValueError("No Vosk model: pass model_path or set LISA_VOSK_MODEL")
+        import vosk
+
+        self._vosk = vosk
+        with self._models_lock:
+            if model_path not in self._models:
+                vosk.SetLogLevel(-1)
+                self._models[model_path] = vosk.Model(model_path)
+            self.model = self._models[model_path]
+
+    def stream(self, sample_rate: int, sample_width: int = 2) -> StreamingSession:
+        if sample_width != 2:
+            raise ValueError("Vosk expects 16-bit PCM")
+        return _VoskSession(self._vosk.KaldiRecognizer(self.model, sample_rate))
+
+    def transcribe(self, pcm: bytes, sample_rate: int, sample_width: int = 2) -> Optional[str]:
+        session = self.stream(sample_rate, sample_width)
+        # Feed quarter-second chunks, as Vosk does best with short buffers
+        step = sample_rate * sample_width // 4
+        for i in range(0, len(pcm), step):
+            session.accept(pcm[i:i + step])
+        return session.final()
+
+
+BACKENDS = {
+    GoogleBackend.name: GoogleBackend,
+    VoskBackend.name: VoskBackend,
+}
+
+
+def get_backend(name: Optional[str] = None, **kwargs) -> RecognizerBackend:
+    """
+    Create a recognizer backend by name.
+
+    Args:
+        name: 'google' or 'vosk' (default: LISA_STT_BACKEND, else google)
+        **kwargs: Passed to the backend constructor
+    """
+    name = (name or os.getenv("LISA_STT_BACKEND") or "google").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown speech backend {name!r}; choose from {', '.join(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
+
+
+# --------------------------- Batch mode ---------------------------
+
+_worker_backend: Optional[RecognizerBackend] = None
+
+
+def _init_worker(name: str, kwargs: Dict) -> None:
+    # Each worker process loads the model once and reuses it for every file
+    global _worker_backend
+    _worker_backend = get_backend(name, **kwargs)
+
+
+def _transcribe_file(path: str) -> Dict:
+    pcm, rate, width = read_wav(path)
+    audio_seconds = len(pcm) / (rate * width)
+    start = time.perf_counter()
+    try:
+        text, error = _worker_backend.transcribe(pcm, rate, width), None
+    except Exception as e:
+        text, error = None, str(e)
+    seconds = time.perf_counter() - start
+    return {
+        "path": path,
+        "text": text,
+        "error": error,
+        "seconds": seconds,
+        "audio_seconds": audio_seconds,
+        "rtf": seconds / audio_seconds if audio_seconds else None,
+    }
+
+
+def transcribe_files(paths: List[str], backend: Optional[str] = None, workers: Optional[int] = None,
+                     **kwargs) -> List[Dict]:
+    """
+    Transcribe many WAV files in parallel worker processes.
+
+    Args:
+        paths: WAV files (mono)
+        backend: Backend name (see get_backend)
+        workers: Worker processes (default: CPU count)
+        **kwargs: Passed to the backend constructor in each worker
+
+    Returns:
+        One dict per file, in input order, with text, timing and real-time factor
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(backend or os.getenv("LISA_STT_BACKEND") or "google", kwargs)) as pool:
+        return list(pool.map(_transcribe_file, paths))
+
+
+def benchmark_backends(paths: List[str], backends: List[str]) -> Dict[str, Dict]:
+    """
+    Compare backends on the same files, sequentially in this process.
+
+    Returns:
+        Per backend: load time, total audio and processing seconds, and real-time factor
+    """
+    global _worker_backend
+    report = {}
+    for name in backends:
+        start = time.perf_counter()
+        try:
+            _worker_backend = get_backend(name)
+        except Exception as e:
+            report[name] = {"error": str(e)}
+            continue
+        load_seconds = time.perf_counter() - start
+        results = [_transcribe_file(path) for path in paths]
+        audio = sum(r["audio_seconds"] for r in results)
+        spent = sum(r["seconds"] for r in results)
+        report[name] = {
+            "load_seconds": load_seconds,
+            "files": len(results),
+            "errors": sum(1 for r in results if r["error"]),
+            "audio_seconds": audio,
+            "seconds": spent,
+            "rtf": spent / audio if audio else None,
+        }
+    _worker_backend = None
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Transcribe or benchmark WAV files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("transcribe", help="transcribe files through a process pool")
+    run.add_argument("--backend", help="google or vosk (default: LISA_STT_BACKEND)")
+    run.add_argument("--workers", type=int, help="worker processes")
+    run.add_argument("files", nargs="+")
+    bench = sub.add_parser("bench", help="compare real-time factor across backends")
+    bench.add_argument("--backends", default="google,vosk", help="comma-separated backend names")
+    bench.add_argument("files", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "transcribe":
+        result = transcribe_files(args.files, args.backend, args.workers)
+    else:
+        result = benchmark_backends(args.files, [b.strip() for b in args.backends.split(",") if b.strip()])
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""Speech Cache Module for Lisa-Agent
+
+Content-addressed cache of synthesized audio. Lisa says many fixed
+phrases (greetings, mode banners, affirmations) over and over; with the
+cache each one is synthesized once and replayed from memory afterwards.
+
+Entries are keyed by a hash of everything that changes the audio:
+engine, voice, rate, language and text. Memory use is bounded by an LRU
+byte cap. With a directory configured, every entry is also written to
+disk, so entries evicted from memory and entries from earlier runs are
+still served without synthesizing again.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+def speech_key(engine: str, voice: str, rate: int, lang: str, text: str) -> str:
+    """Stable cache key for one utterance; whitespace differences don't change it"""
+    material = "\x1f".join((engine, voice or "", str(rate), lang, " ".join(text.split())))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class SpeechCache:
+    """LRU audio cache with a memory byte cap and an optional disk tier"""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, path: Optional[str] = None,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Audio bytes kept in memory
+            path: Optional directory for the disk tier
+            max_disk_bytes: Audio bytes kept on disk; oldest files are pruned
+        """
+        self.max_bytes = max_bytes
+        self.path = path
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._disk_size = 0
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._disk_size = sum(size for _, size, _ in self._disk_files())
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.audio")
+
+    def _remember(self, key: str, data: bytes) -> None:
+        # Caller holds self._lock
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        if len(data) > self.max_bytes:
+            return
+        self._entries[key] = data
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached audio, or None on a miss"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+        if self.path:
+            try:
+                with open(self._file(key), "rb") as fp:
+                    data = fp.read()
+            except OSError:
+                data = None
+            if data is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(key, data)
+                try:
+                    # Disk pruning drops the least recently used files first
+                    os.utime(self._file(key))
+                except OSError:
+                    pass
+                return data
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._remember(key, data)
+        if self.path:
+            tmp = self._file(key) + ".tmp"
+            try:
+                with open(tmp, "wb") as fp:
+                    fp.write(data)
+                os.replace(tmp, self._file(key))
+            except OSError as e:
+                print(f"Speech cache write error: {e}")
+                return
+            with self._lock:
+                self._disk_size += len(data)
+                prune = self._disk_size > self.max_disk_bytes
+            if prune:
+                self._prune_disk()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._entries:
+                return True
+        return bool(self.path) and os.path.exists(self._file(key))
+
+    def _disk_files(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of every audio file, oldest first"""
+        files = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".audio"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(files)
+
+    def _prune_disk(self) -> None:
+        # Recount from the directory; rewrites of an existing key made the running total an overestimate
+        files = self._disk_files()
+        total = sum(size for _, size, _ in files)
+        for _, size, name in files:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(name)
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_size = total
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._disk_size = 0
+        if self.path:
+            for name in os.listdir(self.path):
+                if name.endswith(".audio"):
+                    try:
+                        os.remove(os.path.join(self.path, name))
+                    except OSError:
+                        pass
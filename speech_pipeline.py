@@ -0,0 +1,254 @@
+"""Speech Pipeline Module for Lisa-Agent
+
+Background text-to-speech that never blocks the caller:
+
+- Text (or streamed model tokens) is split into sentences as it arrives.
+- A synthesis thread renders sentence N+1 while a playback thread plays
+  sentence N, so audio starts after the first sentence instead of after
+  the whole reply has been synthesized.
+- cancel() (or barge_in() when the user starts talking) drops everything
+  queued and cuts off the sentence that is playing.
+
+Works with any engine exposing synthesize(text) and play(audio, cancel),
+where play() returns soon after ``cancel`` is set, such as
+voice_interaction.TextToSpeech. Several pipelines can share one engine.
+"""
+
+import queue
+import re
+import threading
+import time
+from typing import Any, Iterable, List, Optional
+
+# A sentence ends at . ! ? (optionally followed by closing quotes or
+# brackets) followed by whitespace, or at a blank line
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+|\n\s*\n")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split complete text into sentences"""
+    return [s.strip() for s in _SENTENCE_END.split(text) if s and s.strip()]
+
+
+class SentenceBuffer:
+    """Accumulates streamed tokens and releases whole sentences"""
+
+    def __init__(self, min_chars: int = 20):
+        """
+        Args:
+            min_chars: Merge shorter sentences ("Hi!") into the next one
+                so each synthesis call has enough text to sound natural;
+                never across a paragraph break, so a reply built from
+                fixed paragraphs splits exactly as each paragraph does alone
+        """
+        self.min_chars = min_chars
+        self._text = ""
+
+    def feed(self, token: str) -> List[str]:
+        """Add a token; return any sentences it completed"""
+        self._text += token
+        sentences = []
+        start = 0
+        for m in _SENTENCE_END.finditer(self._text):
+            if m.end() - start < self.min_chars and not _PARAGRAPH_BREAK.search(m.group()):
+                continue
+            sentence = self._text[start:m.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = m.end()
+        self._text = self._text[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is left as a final sentence"""
+        rest, self._text = self._text.strip(), ""
+        return rest or None
+
+
+def speech_pieces(text: str, min_chars: int = 20) -> List[str]:
+    """
+    The pieces a complete text is synthesized as.
+
+    Every path that speaks or pre-renders text splits it with this, so
+    speech cache keys for the same sentence always agree.
+    """
+    buffer = SentenceBuffer(min_chars)
+    pieces = buffer.feed(text)
+    rest = buffer.flush()
+    return pieces + [rest] if rest else pieces
+
+
+class SpeechPipeline:
+    """Sentence-level TTS with overlapped synthesis and playback"""
+
+    # Sentences synthesized ahead of playback; bounds memory and wasted
+    # work when a reply is cancelled
+    LOOKAHEAD = 2
+
+    def __init__(self, tts: Any, min_chars: int = 20):
+        """
+        Initialize the pipeline and start its worker threads.
+
+        Args:
+            tts: Engine with synthesize(text) and play(audio, cancel)
+            min_chars: Shortest sentence synthesized on its own
+        """
+        self.tts = tts
+        self.min_chars = min_chars
+        self._buffer = SentenceBuffer(min_chars)
+        self._text_queue: "queue.Queue" = queue.Queue()
+        self._audio_queue: "queue.Queue" = queue.Queue(maxsize=self.LOOKAHEAD)
+        self._lock = threading.Lock()
+        # Queued work carries the event current when it was queued;
+        # cancel() sets it and starts a fresh one, so stale work is dropped
+        self._cancel = threading.Event()
+        self._pending = 0
+        self._idle = threading.Condition(self._lock)
+        self._utterance_start: Optional[float] = None
+        self.first_audio_latency: Optional[float] = None
+        self._threads = [
+            threading.Thread(target=self._synthesize_loop, name="lisa-tts-synth", daemon=True),
+            threading.Thread(target=self._playback_loop, name="lisa-tts-play", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # ---- producer side ----
+
+    def _enqueue(self, sentence: str) -> None:
+        with self._lock:
+            if self._utterance_start is None:
+                self._utterance_start = time.perf_counter()
+                self.first_audio_latency = None
+            self._pending += 1
+            cancelled = self._cancel
+        self._text_queue.put((cancelled, sentence))
+
+    def feed(self, token: str) -> None:
+        """Add streamed text; complete sentences start synthesizing right away"""
+        for sentence in self._buffer.feed(token):
+            self._enqueue(sentence)
+
+    def flush(self) -> None:
+        """Mark the end of the current reply so its last fragment is spoken"""
+        rest = self._buffer.flush()
+        if rest:
+            self._enqueue(rest)
+
+    def say(self, text: str) -> None:
+        """Queue a complete text; returns immediately"""
+        self.feed(text)
+        self.flush()
+
+    def say_stream(self, tokens: Iterable[str]) -> str:
+        """
+        Speak tokens as they are produced and return the full text.
+
+        Blocks only for as long as ``tokens`` does; playback continues in
+        the background.
+        """
+        parts = []
+        for token in tokens:
+            parts.append(token)
+            self.feed(token)
+        self.flush()
+        return "".join(parts)
+
+    # ---- control ----
+
+    def cancel(self) -> None:
+        """Drop queued sentences and stop the one playing"""
+        with self._lock:
+            self._cancel.set()
+            self._cancel = threading.Event()
+            self._buffer = SentenceBuffer(self.min_chars)
+            self._utterance_start = None
+        for q, has_audio in ((self._text_queue, False), (self._audio_queue, True)):
+            while True:
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Shutdown marker; put it back for the worker
+                    q.put(None)
+                    break
+                if has_audio:
+                    self._discard(item[1])
+                self._done()
+        # The sentence playing sees its cancel event and stops itself; the
+        # engine may be shared, so stopping it outright would cut off others
+
+    def barge_in(self) -> None:
+        """The user started talking: stop speaking immediately"""
+        self.cancel()
+
+    @property
+    def speaking(self) -> bool:
+        with self._lock:
+            return self._pending > 0
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued has been spoken; False on timeout"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self) -> None:
+        """Stop speaking and shut down the worker threads"""
+        self.cancel()
+        self._text_queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=1)
+
+    # ---- workers ----
+
+    def _done(self) -> None:
+        with self._lock:
+            self._pending = max(0, self._pending - 1)
+            if self._pending == 0:
+                self._utterance_start = None
+                self._idle.notify_all()
+
+    def _discard(self, audio: Any) -> None:
+        # Let the engine clean up audio that will never be played
+        discard = getattr(self.tts, "discard", None)
+        if discard is not None:
+            discard(audio)
+
+    def _synthesize_loop(self) -> None:
+        while True:
+            item = self._text_queue.get()
+            if item is None:
+                self._audio_queue.put(None)
+                return
+            cancelled, sentence = item
+            if cancelled.is_set():
+                self._done()
+                continue
+            try:
+                audio = self.tts.synthesize(sentence)
+            except Exception as e:
+                print(f"TTS synthesis error: {e}")
+                self._done()
+                continue
+            self._audio_queue.put((cancelled, audio))
+
+    def _playback_loop(self) -> None:
+        while True:
+            item = self._audio_queue.get()
+            if item is None:
+                return
+            cancelled, audio = item
+            try:
+                if cancelled.is_set():
+                    self._discard(audio)
+                    continue
+                with self._lock:
+                    if self.first_audio_latency is None and self._utterance_start is not None:
+                        self.first_audio_latency = time.perf_counter() - self._utterance_start
+                self.tts.play(audio, cancel=cancelled)
+            except Exception as e:
+                print(f"TTS playback error: {e}")
+            finally:
+                self._done()
@@ -5,28 +5,38 @@ Run with: streamlit run streamlit_ui.py
 """
 
 import streamlit as st
+import html
 import os
+import time
+import weakref
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Callable, Iterable, Optional
 import sys
 
 # Import Lisa-Agent modules
 try:
     from lisa_agent import LisaAgent
+    from conversation import ConversationContext
     LISA_AGENT_AVAILABLE = True
 except ImportError:
     LISA_AGENT_AVAILABLE = False
     st.warning("lisa_agent.py not found. Make sure it's in the same directory.")
 
 try:
-    from web_search import web_search
+    from web_search import web_search, SEARCH_TRIGGERS
     WEB_SEARCH_AVAILABLE = True
 except ImportError:
     WEB_SEARCH_AVAILABLE = False
 
+from chat_history import ChatHistory
+from intent_router import ROUTER
+from job_queue import CANCELLED, DONE, FAILED, QUEUED, RUNNING, Job, JobCancelled, JobQueue
+from shared_resources import OLLAMA_CLIENT, RESOURCES, RESPONSE_CACHE, SEARCH_ENGINE, TTS_ENGINE, Session
+
 try:
-    from voice_interaction import VoiceAssistant
-    VOICE_AVAILABLE = True
+    # Cheap: the speech engines themselves load when voice is switched on
+    from voice_interaction import GTTS_AVAILABLE, PYTTSX3_AVAILABLE, VoiceAssistant
+    VOICE_AVAILABLE = PYTTSX3_AVAILABLE or GTTS_AVAILABLE
 except ImportError:
     VOICE_AVAILABLE = False
 
@@ -103,82 +113,160 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# Initialize session state
-if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
+# Initialize session state (chat_history is set up below render_message)
+if 'resources' not in st.session_state:
+    # This session's handle on the process-wide clients and engines;
+    # released when Streamlit discards the session
+    st.session_state.resources = Session()
 
 if 'lisa_agent' not in st.session_state and LISA_AGENT_AVAILABLE:
-    st.session_state.lisa_agent = LisaAgent()
+    # Shared client, caches and search engine; history and notes stay per user
+    resources = st.session_state.resources
+    st.session_state.lisa_agent = LisaAgent(client=resources.get(OLLAMA_CLIENT),
+                                            cache=resources.get(RESPONSE_CACHE),
+                                            search=resources.get(SEARCH_ENGINE),
+                                            conversation=ConversationContext())
+
+if 'jobs' not in st.session_state:
+    # Replies are generated (and spoken) on a background worker, one at a
+    # time; the page polls it, so sending never blocks a script run
+    st.session_state.jobs = JobQueue(on_cancel=lambda job: _stop_speaking())
 
 if 'voice_enabled' not in st.session_state:
     st.session_state.voice_enabled = False
 
-if 'voice_assistant' not in st.session_state and VOICE_AVAILABLE:
-    try:
-        st.session_state.voice_assistant = VoiceAssistant(enable_stt=False)
-    except:
-        st.session_state.voice_assistant = None
+if 'voice_assistant' not in st.session_state:
+    # Built the first time voice is enabled, not for every new session
+    st.session_state.voice_assistant = None
+
+
+def get_voice_assistant() -> Optional["VoiceAssistant"]:
+    """
+    This session's voice assistant, created when it turns voice on.
+    
+    The TTS engine and speech cache are shared by every session; the speech
+    queue is not, so one user's Stop doesn't silence anyone else.
+    """
+    if st.session_state.voice_assistant is None and VOICE_AVAILABLE:
+        try:
+            resources = st.session_state.resources
+            voice = VoiceAssistant(tts=resources.get(TTS_ENGINE), enable_stt=False)
+            # Streamlit drops a finished session's state without telling us;
+            # stop its pipeline threads along with its shared references
+            st.session_state.voice_closer = weakref.finalize(resources, voice.close)
+            st.session_state.voice_assistant = voice
+        except Exception as e:
+            st.warning(f"Voice unavailable: {e}")
+            st.session_state.voice_enabled = False
+    return st.session_state.voice_assistant
+
 
+def _stop_speaking():
+    voice = st.session_state.get('voice_assistant')
+    if voice:
+        voice.stop_speaking()
 
-def add_message(role: str, content: str):
+
+def add_message(role: str, content: str, timestamp: Optional[str] = None):
     """Add a message to chat history"""
-    timestamp = datetime.now().strftime("%I:%M %p")
-    st.session_state.chat_history.append({
-        'role': role,
-        'content': content,
-        'timestamp': timestamp
-    })
+    timestamp = timestamp or datetime.now().strftime("%I:%M %p")
+    st.session_state.chat_history.append(role, content, timestamp)
+
+
+def render_message(role: str, content: str, timestamp: str) -> str:
+    """Return the HTML block for a single chat message"""
+    # Unindented, so many blocks can go into one st.markdown call
+    body = html.escape(content).replace("\n", "<br>")
+    if role == 'user':
+        return (f'<div class="chat-message user-message"><strong>👤 You:</strong><br>{body}'
+                f'<div class="timestamp">{timestamp}</div></div>')
+    return (f'<div class="chat-message lisa-message"><strong>👩‍💼 Lisa:</strong><br>{body}'
+            f'<div class="timestamp">{timestamp}</div></div>')
+
+
+if 'chat_history' not in st.session_state:
+    # Recent messages with their HTML pre-rendered; older ones go to disk
+    st.session_state.chat_history = ChatHistory(render_message)
+
+# Messages drawn per page of history; "Load older" adds another page
+HISTORY_PAGE = 30
+
+if 'history_shown' not in st.session_state:
+    st.session_state.history_shown = HISTORY_PAGE
 
 
 def display_chat_history():
-    """Display all messages in chat history"""
-    for message in st.session_state.chat_history:
-        role = message['role']
-        content = message['content']
-        timestamp = message['timestamp']
-        
-        if role == 'user':
-            st.markdown(f"""
-                <div class="chat-message user-message">
-                    <strong>👤 You:</strong><br>{content}
-                    <div class="timestamp">{timestamp}</div>
-                </div>
-            """, unsafe_allow_html=True)
-        else:
-            st.markdown(f"""
-                <div class="chat-message lisa-message">
-                    <strong>👩‍💼 Lisa:</strong><br>{content}
-                    <div class="timestamp">{timestamp}</div>
-                </div>
-            """, unsafe_allow_html=True)
-
-
-def process_user_input(user_input: str) -> str:
-    """Process user input and generate response"""
+    """Display the latest messages in chat history as a single block"""
+    history = st.session_state.chat_history
+    total = len(history)
+    shown = min(total, st.session_state.history_shown)
+    if shown < total:
+        if st.button(f"⬆️ Load older messages ({total - shown} more)"):
+            st.session_state.history_shown = shown + HISTORY_PAGE
+            st.rerun()
+    if shown:
+        st.markdown("".join(message['html'] for message in history.tail(shown)), unsafe_allow_html=True)
+
+
+def _collect(tokens: Iterable[str], on_token: Optional[Callable[[str], None]]) -> str:
+    """Join streamed tokens, reporting the partial response after each one"""
+    response = ""
+    for token in tokens:
+        response += token
+        if on_token is not None:
+            on_token(response)
+    return response
+
+
+def process_user_input(user_input: str, on_token: Optional[Callable[[str], None]] = None,
+                       agent: Optional["LisaAgent"] = None) -> str:
+    """
+    Process user input and generate response.
+
+    Args:
+        user_input: Message typed by the user
+        on_token: Optional callback receiving the partial response each time
+            the model streams a new token
+        agent: Agent to answer with (default: this session's); must be
+            passed when called off the script thread
+
+    Returns:
+        The complete response text
+    """
+    if agent is None and LISA_AGENT_AVAILABLE:
+        agent = st.session_state.lisa_agent
     if not user_input.strip():
         return "Please enter a message."
     
     # Check for web search request
-    if WEB_SEARCH_AVAILABLE and any(keyword in user_input.lower() for keyword in ['search', 'find', 'look up', 'what is']):
+    if WEB_SEARCH_AVAILABLE and ROUTER.matches_intent(user_input, "web_search"):
         try:
             # Extract search query
             search_query = user_input
-            for prefix in ['search for', 'search', 'find', 'look up', 'what is']:
+            for prefix in SEARCH_TRIGGERS:
                 if prefix in user_input.lower():
                     search_query = user_input.lower().replace(prefix, '').strip()
                     break
             
             if search_query:
-                results = web_search(search_query, max_results=3)
-                return f"Here's what I found:\n\n{results}"
+                if not LISA_AGENT_AVAILABLE:
+                    results = web_search(search_query, max_results=3)
+                    return f"Here's what I found:\n\n{results}"
+                # Ground Lisa's answer in the results; the search overlaps prompt assembly
+                return _collect(agent.reply_with_search_stream(user_input, query=search_query), on_token)
+        except JobCancelled:
+            raise
         except Exception as e:
             return f"I encountered an error while searching: {e}"
     
     # Use Lisa Agent if available
     if LISA_AGENT_AVAILABLE:
         try:
-            response = st.session_state.lisa_agent.respond(user_input)
-            return response
+            if on_token is None:
+                return agent.reply(user_input)
+            return _collect(agent.reply_stream(user_input), on_token)
+        except JobCancelled:
+            raise
         except Exception as e:
             return f"I'm having trouble processing that. Error: {e}"
     
@@ -186,6 +274,86 @@ def process_user_input(user_input: str) -> str:
     return "I received your message! However, the full Lisa Agent is not loaded. Please ensure lisa_agent.py is in the same directory."
 
 
+def make_runner(agent: Optional["LisaAgent"], voice: Optional["VoiceAssistant"]):
+    """Job runner answering with ``agent`` and, if given, speaking through ``voice``"""
+    def run(user_input: str, on_token: Callable[[str], None]) -> str:
+        spoken = 0
+        
+        def report(partial: str):
+            nonlocal spoken
+            on_token(partial)
+            if voice:
+                # Speech starts in the background as soon as the first sentence is complete
+                voice.pipeline.feed(partial[spoken:])
+                spoken = len(partial)
+        
+        response = process_user_input(user_input, on_token=report, agent=agent)
+        if voice:
+            try:
+                if spoken:
+                    voice.pipeline.flush()
+                else:
+                    voice.speak_async(response)
+            except Exception as e:
+                print(f"Voice output failed: {e}")
+        return response
+    return run
+
+
+def record_job(job: Job):
+    """Move a finished reply into the chat history"""
+    asked = datetime.fromtimestamp(job.submitted_at).strftime("%I:%M %p")
+    answered = datetime.fromtimestamp(job.finished_at).strftime("%I:%M %p")
+    add_message('user', job.prompt, asked)
+    if job.status == DONE:
+        add_message('lisa', job.text, answered)
+    elif job.status == CANCELLED:
+        add_message('lisa', (job.text + " … " if job.text else "") + "(stopped)", answered)
+    elif job.status == FAILED:
+        add_message('lisa', f"I'm having trouble processing that. Error: {job.error}", answered)
+
+
+# Seconds between refreshes while a reply is being generated
+POLL_SECONDS = 0.25
+# st.fragment reruns just the live area; older Streamlit versions rerun the page
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+
+def _render_jobs():
+    jobs = st.session_state.jobs
+    finished = jobs.pop_finished()
+    if finished:
+        for job in finished:
+            record_job(job)
+        # Redraw the whole page so the replies join the history above
+        st.rerun()
+    pending = jobs.jobs()
+    for job in pending:
+        st.markdown(render_message('user', job.prompt, datetime.fromtimestamp(job.submitted_at).strftime("%I:%M %p")),
+                    unsafe_allow_html=True)
+        if job.status == RUNNING:
+            text = job.text + " ▌" if job.text else "Lisa is thinking…"
+            st.markdown(render_message('lisa', text, ""), unsafe_allow_html=True)
+        if job.status in (QUEUED, RUNNING):
+            label = "⏹️ Stop" if job.status == RUNNING else "✖️ Cancel queued message"
+            if st.button(label, key=f"cancel-{job.id}"):
+                jobs.cancel(job.id)
+    if len(pending) > 1 and st.button("⏹️ Stop all", key="cancel-all"):
+        jobs.cancel_all()
+
+
+def show_live_replies():
+    """Replies being generated, with stop buttons, refreshed while any are pending"""
+    busy = st.session_state.jobs.busy
+    if _fragment is not None:
+        _fragment(run_every=POLL_SECONDS if busy else None)(_render_jobs)()
+        return
+    _render_jobs()
+    if busy:
+        time.sleep(POLL_SECONDS)
+        st.rerun()
+
+
 # Main UI
 def main():
     # Header with avatar
@@ -207,13 +375,25 @@ def main():
         st.markdown("### ⚙️ Settings")
         
         # Voice settings
-        if VOICE_AVAILABLE and st.session_state.voice_assistant:
+        if VOICE_AVAILABLE:
             voice_enabled = st.checkbox("Enable voice responses", value=st.session_state.voice_enabled)
             st.session_state.voice_enabled = voice_enabled
+            if voice_enabled:
+                get_voice_assistant()
+            elif st.session_state.voice_assistant is not None:
+                # Let the TTS engine go once no session wants voice
+                st.session_state.voice_closer()
+                st.session_state.voice_assistant = None
+                st.session_state.resources.drop(TTS_ENGINE)
         
         # Clear chat button
         if st.button("🗑️ Clear Chat History"):
-            st.session_state.chat_history = []
+            st.session_state.jobs.cancel_all()
+            st.session_state.jobs.pop_finished()
+            st.session_state.chat_history.clear()
+            st.session_state.history_shown = HISTORY_PAGE
+            if LISA_AGENT_AVAILABLE and st.session_state.lisa_agent.conversation is not None:
+                st.session_state.lisa_agent.conversation.clear()
             st.rerun()
         
         st.markdown("---")
@@ -235,6 +415,9 @@ def main():
         st.success("✅ Lisa Agent") if LISA_AGENT_AVAILABLE else st.warning("⚠️ Lisa Agent Not Found")
         st.success("✅ Web Search") if WEB_SEARCH_AVAILABLE else st.warning("⚠️ Web Search Unavailable")
         st.success("✅ Voice Module") if VOICE_AVAILABLE else st.warning("⚠️ Voice Module Unavailable")
+        shared = RESOURCES.stats()
+        if shared:
+            st.caption("Shared: " + ", ".join(f"{name} ({refs} sessions)" for name, refs in shared.items()))
     
     # Main chat area
     st.markdown("---")
@@ -271,25 +454,16 @@ def main():
     with col2:
         send_button = st.button("Send 📤", use_container_width=True)
     
-    # Process input
+    # Queue the message; the reply streams in below while the page stays live
     if send_button and user_input:
-        # Add user message
-        add_message('user', user_input)
-        
-        # Generate and add Lisa's response
-        with st.spinner('Lisa is thinking...'):
-            response = process_user_input(user_input)
-            add_message('lisa', response)
-            
-            # Voice output if enabled
-            if st.session_state.voice_enabled and st.session_state.voice_assistant:
-                try:
-                    st.session_state.voice_assistant.speak(response)
-                except Exception as e:
-                    st.warning(f"Voice output failed: {e}")
-        
-        # Rerun to update chat display
-        st.rerun()
+        try:
+            st.session_state.jobs.submit(user_input, runner=make_runner(
+                st.session_state.get('lisa_agent'),
+                get_voice_assistant() if st.session_state.voice_enabled else None))
+        except RuntimeError as e:
+            st.warning(str(e))
+    
+    show_live_replies()
     
     # Quick action buttons
     st.markdown("### 💡 Quick Actions")
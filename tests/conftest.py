@@ -0,0 +1,40 @@
+"""Shared fixtures: the local mock servers and a dead port"""
+
+import os
+import socket
+import sys
+
+import pytest
+
+# The modules live at the repository root rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_servers import mock_ollama, mock_pages, mock_search  # noqa: E402
+
+
+@pytest.fixture
+def ollama_server():
+    with mock_ollama(token_rate=0, tokens=5, first_token_delay=0) as server:
+        yield server
+
+
+@pytest.fixture
+def search_server():
+    with mock_search(latency=0) as server:
+        yield server
+
+
+@pytest.fixture
+def pages_server():
+    with mock_pages(latency=0, paragraphs=20) as server:
+        yield server
+
+
+@pytest.fixture
+def dead_url():
+    """A local URL nothing listens on, so connections are refused at once"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"http://127.0.0.1:{port}"
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import struct
+import threading
+import time
+
+import pytest
+
+from api_server import LisaServer
+
+
+class FakeMemory:
+    def __init__(self):
+        self.facts = []
+
+    def add(self, note):
+        self.facts.append(note)
+
+    def search(self, text):
+        return [f for f in self.facts if text in f]
+
+
+class FakeAgent:
+    """Streams "one " then "two"; "wait" blocks on ``gate``, "boom" fails mid-stream"""
+    gate = threading.Event()
+
+    def __init__(self, resources):
+        self.memory = FakeMemory()
+        self.semantic = None
+        self.last_timings = {}
+
+    def reply_stream(self, message):
+        yield "one "
+        if message == "boom":
+            raise RuntimeError("model crashed")
+        if message == "wait":
+            self.gate.wait(5)
+        yield "two"
+
+    reply_with_search_stream = reply_stream
+
+
+@pytest.fixture
+def gate():
+    FakeAgent.gate = threading.Event()
+    yield FakeAgent.gate
+    FakeAgent.gate.set()
+
+
+def run_server(test, **settings):
+    """Run ``test(server, port)`` against a LisaServer on an ephemeral port"""
+    async def main():
+        server = LisaServer(agent_factory=FakeAgent, **settings)
+        listening = await server.start("127.0.0.1", 0)
+        try:
+            return await test(server, listening.sockets[0].getsockname()[1])
+        finally:
+            FakeAgent.gate.set()
+            await server.close(grace=2)
+    return asyncio.run(main())
+
+
+async def request(port, method, path, body=None):
+    """One request on its own connection; returns (status, headers, body)"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+                 f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+    raw = await reader.read()
+    writer.close()
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    if headers.get("Transfer-Encoding") == "chunked":
+        payload = dechunk(payload)
+    return int(lines[0].split()[1]), headers, payload
+
+
+def dechunk(data):
+    body = b""
+    while True:
+        size, _, data = data.partition(b"\r\n")
+        size = int(size, 16)
+        if not size:
+            return body
+        body, data = body + data[:size], data[size + 2:]
+
+
+async def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+def test_reply():
+    async def test(server, port):
+        status, _, body = await request(port, "POST", "/v1/reply", {"message": "hi", "session": "s"})
+        assert status == 200
+        assert json.loads(body) == {"reply": "one two", "session": "s", "timings": {}}
+    run_server(test)
+
+
+def test_stream_tokens_then_result():
+    async def test(server, port):
+        status, headers, body = await request(port, "POST", "/v1/reply/stream", {"message": "hi"})
+        assert status == 200
+        assert headers["Content-Type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in body.splitlines()]
+        assert lines[:2] == [{"token": "one "}, {"token": "two"}]
+        assert lines[2]["done"] and lines[2]["reply"] == "one two"
+    run_server(test)
+
+
+def test_503_when_workers_and_queue_are_full(gate):
+    async def test(server, port):
+        busy = asyncio.ensure_future(request(port, "POST", "/v1/reply", {"message": "wait", "session": "a"}))
+        await wait_until(lambda: server._limiter.running == 1)
+        status, headers, body = await request(port, "POST", "/v1/reply", {"message": "hi", "session": "b"})
+        assert status == 503
+        assert headers["Retry-After"] == "1"
+        gate.set()
+        assert (await busy)[0] == 200
+        # Capacity is back once the worker finishes
+        assert (await request(port, "POST", "/v1/reply", {"message": "hi", "session": "b"}))[0] == 200
+    run_server(test, workers=1, max_queue=0)
+
+
+def test_queued_request_waits_for_a_worker(gate):
+    async def test(server, port):
+        first = asyncio.ensure_future(request(port, "POST", "/v1/reply", {"message": "wait", "session": "a"}))
+        await wait_until(lambda: server._limiter.running == 1)
+        second = asyncio.ensure_future(request(port, "POST", "/v1/reply", {"message": "hi", "session": "b"}))
+        await wait_until(lambda: server._limiter.waiting == 1)
+        gate.set()
+        assert [r[0] for r in await asyncio.gather(first, second)] == [200, 200]
+    run_server(test, workers=1, max_queue=1)
+
+
+def test_504_on_timeout_releases_worker(gate):
+    async def test(server, port):
+        status, _, body = await request(port, "POST", "/v1/reply", {"message": "wait", "session": "a"})
+        assert status == 504
+        assert "Timed out" in json.loads(body)["error"]
+        # The worker slot is held until the generation actually stops
+        assert server._limiter.running == 1
+        gate.set()
+        await wait_until(lambda: server._limiter.running == 0)
+        assert (await request(port, "POST", "/v1/reply", {"message": "hi", "session": "a"}))[0] == 200
+    run_server(test, workers=1, max_queue=0, timeout=0.2)
+
+
+def test_stream_timeout_ends_with_error_line(gate):
+    async def test(server, port):
+        status, _, body = await request(port, "POST", "/v1/reply/stream", {"message": "wait"})
+        assert status == 200
+        lines = [json.loads(line) for line in body.splitlines()]
+        assert lines[0] == {"token": "one "}
+        assert lines[-1]["status"] == 504
+    run_server(test, timeout=0.2)
+
+
+def test_stream_worker_error_ends_with_error_line():
+    async def test(server, port):
+        status, _, body = await request(port, "POST", "/v1/reply/stream", {"message": "boom"})
+        lines = [json.loads(line) for line in body.splitlines()]
+        assert status == 200
+        assert lines == [{"token": "one "}, {"error": "model crashed", "status": 500}]
+    run_server(test)
+
+
+def test_stream_error_before_headers_is_plain_response():
+    async def test(server, port):
+        status, _, body = await request(port, "POST", "/v1/reply/stream", {"message": " "})
+        assert status == 400
+        assert "message" in json.loads(body)["error"]
+    run_server(test)
+
+
+def test_409_for_busy_session(gate):
+    async def test(server, port):
+        busy = asyncio.ensure_future(request(port, "POST", "/v1/reply", {"message": "wait", "session": "a"}))
+        await wait_until(lambda: server._limiter.running == 1)
+        status, headers, _ = await request(port, "POST", "/v1/reply", {"message": "hi", "session": "a"})
+        assert status == 409
+        assert headers["Retry-After"] == "1"
+        gate.set()
+        assert (await busy)[0] == 200
+    run_server(test)
+
+
+def test_websocket_error_closes_with_1011():
+    async def test(server, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /v1/ws HTTP/1.1\r\nHost: test\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n")
+        head = await reader.readuntil(b"\r\n\r\n")
+        assert head.startswith(b"HTTP/1.1 101")
+        payload = json.dumps({"message": "boom"}).encode()
+        writer.write(struct.pack("!BB", 0x81, len(payload)) + payload)
+        frames = []
+        while not frames or frames[-1][0] != 0x8:
+            frames.append(await LisaServer._ws_read(reader))
+        writer.close()
+        assert [json.loads(p) for op, p in frames[:-1]] == [{"token": "one "}, {"error": "model crashed", "status": 500}]
+        assert struct.unpack("!H", frames[-1][1]) == (1011,)
+    run_server(test)
+
+
+def test_unknown_path_and_health():
+    async def test(server, port):
+        assert (await request(port, "GET", "/healthz"))[0] == 200
+        assert (await request(port, "GET", "/nope"))[0] == 404
+        assert (await request(port, "GET", "/v1/reply"))[0] == 405
+    run_server(test)
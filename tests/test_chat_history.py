@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+
+from chat_history import ChatHistory
+
+
+def render(role, content, timestamp):
+    return f"<div class='{role}'>{content}</div>"
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = ChatHistory(render, max_in_memory=10, path=str(tmp_path / "chat.jsonl"))
+    for i in range(25):
+        history.append("user" if i % 2 == 0 else "assistant", f"message {i}", f"t{i}")
+    return history
+
+
+def contents(messages):
+    return [m["content"] for m in messages]
+
+
+def test_older_messages_are_archived(history):
+    assert len(history) == 25
+    assert history.archived > 0
+    assert len(history._recent) <= history.max_in_memory
+    with open(history.path) as fp:
+        archived = [json.loads(line)["content"] for line in fp]
+    assert archived == [f"message {i}" for i in range(history.archived)]
+
+
+def test_window_across_archive_boundary(history):
+    boundary = history.archived
+    window = history.window(boundary - 3, boundary + 3)
+    assert contents(window) == [f"message {i}" for i in range(boundary - 3, boundary + 3)]
+    assert all(m["html"] == render(m["role"], m["content"], m["timestamp"]) for m in window)
+
+
+@pytest.mark.parametrize("start, end", [(0, 25), (0, 1), (5, 9), (20, 25), (24, 25), (10, 10)])
+def test_window_matches_full_list(history, start, end):
+    assert contents(history.window(start, end)) == [f"message {i}" for i in range(start, end)]
+
+
+def test_window_is_clamped(history):
+    assert contents(history.window(-5, 2)) == ["message 0", "message 1"]
+    assert contents(history.window(23, 100)) == ["message 23", "message 24"]
+
+
+def test_tail(history):
+    assert contents(history.tail(3)) == ["message 22", "message 23", "message 24"]
+    assert len(history.tail(100)) == 25
+
+
+def test_recent_messages_are_rendered_once():
+    calls = []
+
+    def counting(role, content, timestamp):
+        calls.append(content)
+        return content
+
+    history = ChatHistory(counting, max_in_memory=10)
+    history.append("user", "hello", "t")
+    history.tail(1)
+    history.tail(1)
+    assert calls == ["hello"]
+
+
+def test_clear_empties_archive(history):
+    history.clear()
+    assert len(history) == 0
+    assert history.window(0, 10) == []
+    history.append("user", "again", "t")
+    assert contents(history.tail(5)) == ["again"]
+
+
+def test_default_archive_file_is_removed():
+    history = ChatHistory(render, max_in_memory=4)
+    for i in range(10):
+        history.append("user", str(i), "t")
+    path = history.path
+    assert os.path.exists(path)
+    del history
+    assert not os.path.exists(path)
@@ -0,0 +1,115 @@
+import math
+import wave
+from array import array
+
+import pytest
+
+from continuous_listener import ContinuousListener, EnergyVAD, WavFileSource, frame_rms
+
+RATE = 16000
+
+
+def tone(seconds: float, amplitude: int = 8000) -> array:
+    return array("h", (int(amplitude * math.sin(2 * math.pi * 440 * i / RATE)) for i in range(int(RATE * seconds))))
+
+
+def silence(seconds: float) -> array:
+    return array("h", [0] * int(RATE * seconds))
+
+
+@pytest.fixture
+def wav_path(tmp_path):
+    """Two spoken segments (0.5 s and 1 s of tone) separated by silence"""
+    samples = silence(0.5) + tone(0.5) + silence(1.0) + tone(1.0) + silence(1.0)
+    path = tmp_path / "speech.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(samples.tobytes())
+    return str(path)
+
+
+def listen_all(listener):
+    texts = []
+    while True:
+        text = listener.listen(timeout=5)
+        if text is None:
+            return texts
+        texts.append(text)
+
+
+def test_segments_utterances_from_wav(wav_path):
+    durations = []
+
+    def recognize(utterance):
+        durations.append(utterance.duration)
+        return f"utterance {len(durations)}"
+
+    starts = []
+    listener = ContinuousListener(WavFileSource(wav_path), recognize,
+                                  on_speech_start=lambda: starts.append(1)).start()
+    assert listen_all(listener) == ["utterance 1", "utterance 2"]
+    listener.stop()
+    assert len(starts) == 2
+    # Speech plus pre-roll (0.3 s) and hangover (0.75 s), not the silence between
+    assert 0.5 < durations[0] < 1.7
+    assert 1.0 < durations[1] < 2.2
+    assert len(listener.recognition_latencies) == 2
+
+
+def test_streaming_session_is_fed_while_talking(wav_path):
+    class Session:
+        def __init__(self):
+            self.bytes = 0
+
+        def accept(self, pcm):
+            self.bytes += len(pcm)
+            return "partial" if self.bytes > RATE else None
+
+        def final(self):
+            return f"{self.bytes} bytes"
+
+    partials = []
+    listener = ContinuousListener(WavFileSource(wav_path), recognize=None,
+                                  stream=lambda rate, width: Session(),
+                                  on_partial=partials.append).start()
+    texts = listen_all(listener)
+    listener.stop()
+    assert len(texts) == 2
+    assert partials == ["partial", "partial"]
+
+
+def test_long_speech_is_cut_at_max_length(tmp_path):
+    path = tmp_path / "long.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes((silence(0.5) + tone(3.0) + silence(1.0)).tobytes())
+    listener = ContinuousListener(WavFileSource(str(path)), lambda u: f"{u.duration:.1f}",
+                                  max_utterance_s=1.0).start()
+    texts = listen_all(listener)
+    listener.stop()
+    assert len(texts) >= 3
+    assert all(float(t) <= 1.0 for t in texts)
+
+
+def test_rejects_stereo(tmp_path):
+    path = tmp_path / "stereo.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(b"\0" * 400)
+    with pytest.raises(ValueError):
+        WavFileSource(str(path))
+
+
+def test_vad_adapts_to_background_noise():
+    vad = EnergyVAD(start_frames=2, end_frames=3)
+    noise = frame_rms(tone(0.03, amplitude=200).tobytes())
+    speech = frame_rms(tone(0.03).tobytes())
+    assert [vad.update(noise) for _ in range(10)] == [None] * 10
+    assert [vad.update(speech) for _ in range(2)] == [None, "start"]
+    assert [vad.update(noise) for _ in range(3)] == [None, None, "end"]
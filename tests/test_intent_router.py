@@ -0,0 +1,60 @@
+from intent_router import IntentMatch, IntentRouter
+
+
+def make_router():
+    router = IntentRouter()
+    router.register("joke", ["joke", "make me laugh"], priority=30)
+    router.register("search", ["search", "search for", "look up"], priority=50)
+    router.register("weather", ["weather"], priority=10)
+    return router
+
+
+def test_reports_every_intent_highest_priority_first():
+    matches = make_router().match("Search for a joke about the weather")
+    assert [m.intent for m in matches] == ["search", "joke", "weather"]
+    assert matches[0] == IntentMatch("search", "search for", 50, 0)
+
+
+def test_substring_and_case_insensitive():
+    router = make_router()
+    assert router.intents("Tell me some JOKES") == {"joke"}
+    assert router.best("nothing relevant here") is None
+
+
+def test_overlapping_phrases_each_match():
+    router = IntentRouter()
+    router.register("a", ["look"])
+    router.register("b", ["look up"])
+    router.register("c", ["ok up"])
+    assert router.intents("please look up the time") == {"a", "b", "c"}
+
+
+def test_first_occurrence_is_reported():
+    (match,) = make_router().match("weather and more weather")
+    assert match.start == 0
+
+
+def test_best_among():
+    router = make_router()
+    assert router.best("search for a joke") == "search"
+    assert router.best("search for a joke", among=["joke", "weather"]) == "joke"
+
+
+def test_returns_immutable_tuple():
+    router = make_router()
+    first = router.match("tell me a joke")
+    assert isinstance(first, tuple)
+    assert router.match("tell me a joke") == first
+
+
+def test_register_after_match_is_seen():
+    router = make_router()
+    assert router.intents("what time is it") == set()
+    router.register("time", ["what time"], priority=5)
+    assert router.intents("what time is it") == {"time"}
+
+
+def test_reregistering_changes_priority():
+    router = make_router()
+    router.register("weather", ["weather"], priority=99)
+    assert router.best("search the weather") == "weather"
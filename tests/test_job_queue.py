@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from job_queue import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.01)
+
+
+def blocking_runner(release: threading.Event, tokens=("a", "b", "c")):
+    """Streams tokens, pausing after the first until ``release`` is set"""
+    def run(prompt, on_token):
+        text = ""
+        for i, token in enumerate(tokens):
+            text += token
+            on_token(text)
+            if i == 0:
+                release.wait(5)
+        return text
+    return run
+
+
+def test_runs_jobs_in_order():
+    q = JobQueue(runner=lambda prompt, on_token: prompt.upper())
+    jobs = [q.submit(p) for p in ("one", "two", "three")]
+    wait_for(lambda: not q.busy)
+    assert [j.text for j in jobs] == ["ONE", "TWO", "THREE"]
+    assert all(j.status == DONE for j in jobs)
+    assert all(a.finished_at <= b.started_at for a, b in zip(jobs, jobs[1:]))
+
+
+def test_cancel_running_job_stops_its_stream():
+    release = threading.Event()
+    cancelled = []
+    q = JobQueue(runner=blocking_runner(release), on_cancel=cancelled.append)
+    job = q.submit("hi")
+    wait_for(lambda: job.text == "a")
+    assert job.status == RUNNING
+    assert q.cancel(job.id)
+    release.set()
+    wait_for(lambda: job.finished)
+    assert job.status == CANCELLED
+    # The runner was unwound at its next token
+    assert job.text == "a"
+    assert cancelled == [job]
+    assert not q.cancel(job.id)
+
+
+def test_cancel_queued_job_never_runs():
+    release = threading.Event()
+    ran = []
+    q = JobQueue(runner=blocking_runner(release))
+    first = q.submit("first")
+    second = q.submit("second", runner=lambda prompt, on_token: ran.append(prompt) or prompt)
+    wait_for(lambda: first.status == RUNNING)
+    assert second.status == QUEUED
+    assert q.cancel(second.id)
+    assert second.status == CANCELLED
+    release.set()
+    wait_for(lambda: not q.busy)
+    assert first.status == DONE
+    assert ran == []
+
+
+def test_cancel_all():
+    release = threading.Event()
+    q = JobQueue(runner=blocking_runner(release))
+    jobs = [q.submit(str(i)) for i in range(3)]
+    wait_for(lambda: jobs[0].status == RUNNING)
+    assert q.cancel_all() == 3
+    release.set()
+    wait_for(lambda: not q.busy)
+    assert [j.status for j in jobs] == [CANCELLED] * 3
+
+
+def test_runner_error_fails_only_that_job():
+    def boom(prompt, on_token):
+        raise ValueError("model unavailable")
+
+    q = JobQueue(runner=lambda prompt, on_token: prompt)
+    failed = q.submit("x", runner=boom)
+    ok = q.submit("y")
+    wait_for(lambda: not q.busy)
+    assert failed.status == FAILED and failed.error == "model unavailable"
+    assert ok.status == DONE
+
+
+def test_max_pending():
+    release = threading.Event()
+    q = JobQueue(runner=blocking_runner(release), max_pending=2)
+    q.submit("1")
+    q.submit("2")
+    with pytest.raises(RuntimeError):
+        q.submit("3")
+    release.set()
+    wait_for(lambda: not q.busy)
+    assert len(q.pop_finished()) == 2
+    assert q.jobs() == []
+
+
+def test_version_changes_with_progress():
+    release = threading.Event()
+    q = JobQueue(runner=blocking_runner(release))
+    job = q.submit("hi")
+    wait_for(lambda: job.text == "a")
+    seen = job.version
+    release.set()
+    wait_for(lambda: job.finished)
+    assert job.version > seen
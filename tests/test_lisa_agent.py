@@ -0,0 +1,76 @@
+import asyncio
+import types
+
+import pytest
+
+import response_cache
+from http_pool import HTTPPool
+from lisa_agent import LisaAgent, OllamaClient
+from response_cache import ResponseCache
+
+REPLY = "tok0 tok1 tok2 tok3 tok4"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable stand-in for the response cache's time.time()"""
+    now = [1000.0]
+    monkeypatch.setattr(response_cache, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def counted(agent, client, *names):
+    """Count calls to the client's generation methods in ``agent.generations``"""
+    agent.generations = 0
+    for name in names:
+        method = getattr(client, name)
+
+        def wrapper(*args, _method=method, **kwargs):
+            agent.generations += 1
+            return _method(*args, **kwargs)
+
+        setattr(client, name, wrapper)
+
+
+@pytest.fixture
+def agent(ollama_server):
+    client = OllamaClient(ollama_server.url, pool=HTTPPool(), options={"temperature": 0})
+    agent = LisaAgent(client=client, cache=ResponseCache(ttl=10))
+    counted(agent, client, "generate", "generate_stream")
+    counted(agent, agent.async_client, "generate")
+    return agent
+
+
+@pytest.mark.parametrize("reply", [
+    lambda agent, text: agent.reply(text),
+    lambda agent, text: "".join(agent.reply_stream(text)),
+])
+def test_cache_hit_older_than_ttl_is_generated_again(agent, clock, reply):
+    assert reply(agent, "hello") == REPLY
+    clock[0] += 8
+    assert reply(agent, "hello") == REPLY
+    assert agent.generations == 1
+    # 16 s after it was generated; the hit at 8 s must not have renewed it
+    clock[0] += 8
+    assert reply(agent, "hello") == REPLY
+    assert agent.generations == 2
+
+
+def test_async_cache_hit_older_than_ttl_is_generated_again(agent, clock):
+    # One event loop throughout: the async client belongs to the loop it first ran on
+    async def scenario():
+        assert await agent.areply("hello") == REPLY
+        clock[0] += 8
+        assert await agent.areply("hello") == REPLY
+        assert agent.generations == 1
+        clock[0] += 8
+        assert await agent.areply("hello") == REPLY
+        assert agent.generations == 2
+
+    asyncio.run(scenario())
+
+
+def test_random_sampling_is_never_cached(ollama_server):
+    agent = LisaAgent(client=OllamaClient(ollama_server.url, pool=HTTPPool()), cache=ResponseCache())
+    agent.reply("hello")
+    assert agent.cache.stats()["entries"] == 0
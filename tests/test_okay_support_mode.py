@@ -0,0 +1,26 @@
+from okay_support_mode import OkaySupportMode
+
+
+def test_default_triggers():
+    mode = OkaySupportMode()
+    assert mode.check_triggers("Honestly I'm So Tired of everything")
+    assert not mode.check_triggers("what a lovely day")
+
+
+def test_instance_phrases_are_honoured():
+    mode = OkaySupportMode()
+    mode.trigger_phrases.append("rough week")
+    assert mode.check_triggers("it's been a rough week")
+    mode.trigger_phrases.remove("i'm sad")
+    assert not mode.check_triggers("i'm sad")
+    # Other instances keep the defaults
+    assert OkaySupportMode().check_triggers("i'm sad")
+    assert not OkaySupportMode().check_triggers("it's been a rough week")
+
+
+def test_replaced_phrase_list():
+    mode = OkaySupportMode()
+    mode.trigger_phrases = ["overwhelmed"]
+    assert mode.check_triggers("I feel OVERWHELMED")
+    assert not mode.check_triggers("i feel hopeless")
+    assert mode.process_message("so overwhelmed") is not None
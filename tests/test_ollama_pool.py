@@ -0,0 +1,84 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_pool import HTTPPool, PoolConfig
+from lisa_agent import OllamaClient
+from ollama_pool import OllamaBackendPool
+
+
+class _FailingHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(500)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+@pytest.fixture
+def failing_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FailingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(urls, **kwargs):
+    # Backoff big enough that a pool-level connect retry would show up in timings
+    pool = HTTPPool(PoolConfig(backoff_factor=1.0))
+    backends = OllamaBackendPool(urls, pool=pool, start_health_checks=False, **kwargs)
+    return OllamaClient(pool=pool, backends=backends), backends
+
+
+def test_fails_over_from_dead_backend(dead_url, ollama_server):
+    client, backends = make_client([dead_url, ollama_server.url])
+    # The dead host is tried first (equal load, listed first)
+    assert client.generate("hi") == "tok0 tok1 tok2 tok3 tok4"
+    status = {b["base_url"]: b for b in backends.status()}
+    assert status[dead_url]["failures"] == 1
+    assert status[ollama_server.url]["failures"] == 0
+
+
+def test_dead_backend_is_ejected_after_threshold(dead_url, ollama_server):
+    client, backends = make_client([dead_url, ollama_server.url], failure_threshold=2)
+    for _ in range(4):
+        client.generate("hi")
+    status = {b["base_url"]: b for b in backends.status()}
+    assert not status[dead_url]["available"]
+    # Once ejected it gets no more requests
+    assert status[dead_url]["requests"] == 2
+
+
+def test_streaming_fails_over(dead_url, ollama_server):
+    client, _ = make_client([dead_url, ollama_server.url])
+    assert "".join(client.generate_stream("hi")) == "tok0 tok1 tok2 tok3 tok4"
+
+
+def test_all_backends_down_raises(dead_url):
+    client, _ = make_client([dead_url])
+    with pytest.raises(requests.ConnectionError):
+        client.generate("hi")
+
+
+def test_5xx_counts_toward_ejection(failing_url):
+    client, backends = make_client([failing_url], failure_threshold=2)
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            client.generate("hi")
+    (status,) = backends.status()
+    assert status["failures"] == 2
+    assert not status["available"]
+
+
+def test_probe_restores_backend(ollama_server):
+    _, backends = make_client([ollama_server.url], failure_threshold=1)
+    backends.mark_failure(ollama_server.url)
+    assert not backends.status()[0]["available"]
+    assert backends.probe(ollama_server.url)
+    assert backends.status()[0]["healthy"]
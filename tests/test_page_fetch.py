@@ -0,0 +1,96 @@
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from http_pool import HTTPPool
+from mock_servers import MockServer
+from page_fetch import PageFetcher, chunk_text
+
+
+class _BodyHandler(BaseHTTPRequestHandler):
+    """Serves the server's ``body`` bytes with its ``content_type``"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = self.server.body
+        self.send_response(200)
+        self.send_header("Content-Type", self.server.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def fetcher():
+    fetcher = PageFetcher(pool=HTTPPool())
+    yield fetcher
+    fetcher.close()
+
+
+def serve(body: bytes, content_type: str) -> MockServer:
+    return MockServer(_BodyHandler, body=body, content_type=content_type)
+
+
+@pytest.mark.parametrize("content_type, body, expected", [
+    ("text/html; charset=iso-8859-1", "<p>Café crème</p>".encode("latin-1"), "Café crème"),
+    ("text/html; charset=utf-8", "<p>Café – naïve</p>".encode("utf-8"), "Café – naïve"),
+    # No charset: UTF-8 rather than the ISO-8859-1 requests assumes for text/*
+    ("text/html", "<p>Café</p>".encode("utf-8"), "Café"),
+    # Unknown charset: falls back to UTF-8 instead of failing the page
+    ("text/html; charset=x-unknown", "<p>Café</p>".encode("utf-8"), "Café"),
+    ("text/plain; charset=utf-8", "plain – text".encode("utf-8"), "plain – text"),
+])
+def test_decodes_page_charset(fetcher, content_type, body, expected):
+    with serve(body, content_type) as server:
+        page = fetcher.fetch(server.url)
+    assert page.error is None
+    assert page.text == expected
+
+
+def test_multibyte_character_split_across_chunks(fetcher):
+    fetcher.max_bytes = 1 << 20
+    body = ("<p>" + "é" * 20000 + "</p>").encode("utf-8")
+    with serve(body, "text/html; charset=utf-8") as server:
+        page = fetcher.fetch(server.url)
+    assert page.text == "é" * 20000
+    assert "�" not in page.text
+
+
+def test_unsupported_content_type(fetcher):
+    with serve(b"\x89PNG", "image/png") as server:
+        page = fetcher.fetch(server.url)
+    assert page.error.startswith("unsupported content type")
+
+
+def test_extracts_text_and_revalidates(fetcher, pages_server):
+    url = pages_server.url + "/python"
+    page = fetcher.fetch(url)
+    assert page.status == 200
+    assert "var tracking" not in page.text
+    assert "python" in page.text.splitlines()
+    again = fetcher.fetch(url)
+    assert again.from_cache and again.status == 304
+    assert again.text == page.text
+
+
+def test_stops_reading_at_byte_cap(pages_server):
+    fetcher = PageFetcher(pool=HTTPPool(), max_bytes=256)
+    page = fetcher.fetch(pages_server.url + "/long")
+    fetcher.close()
+    assert page.truncated
+    assert page.bytes_read <= 16 * 1024
+
+
+def test_relevant_chunks_fit_budget(fetcher, pages_server):
+    chunks = fetcher.relevant_chunks("python", [pages_server.url + "/python", pages_server.url + "/rust"],
+                                     token_budget=100, chunk_tokens=40)
+    assert chunks
+    assert all(c["url"].endswith("/python") for c in chunks)
+
+
+def test_chunk_text_splits_long_text():
+    chunks = chunk_text("Some words in a sentence. " * 200, chunk_tokens=100)
+    assert len(chunks) > 1
@@ -0,0 +1,79 @@
+import types
+
+import pytest
+
+import response_cache
+from response_cache import ResponseCache, is_deterministic, make_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable stand-in for the module's time.time()"""
+    now = [1000.0]
+    monkeypatch.setattr(response_cache, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def test_hit_and_miss():
+    cache = ResponseCache()
+    assert cache.get("k") is None
+    cache.put("k", "reply")
+    assert cache.get("k") == "reply"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = ResponseCache(ttl=10)
+    cache.put("k", "reply")
+    clock[0] += 10
+    assert cache.get("k") == "reply"
+    clock[0] += 1
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_evicts_least_recently_used_at_byte_cap():
+    cache = ResponseCache(max_bytes=10)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    cache.get("a")
+    cache.put("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.get("c") == "cccc"
+    assert cache.stats()["bytes"] == 8
+
+
+def test_oversized_reply_is_not_cached():
+    cache = ResponseCache(max_bytes=4)
+    cache.put("k", "too long")
+    assert cache.get("k") is None
+
+
+def test_sqlite_file_survives_restart_without_evicted_rows(tmp_path):
+    path = str(tmp_path / "responses.db")
+    cache = ResponseCache(max_bytes=10, path=path)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    cache.put("c", "cccc")
+    assert cache._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] == 2
+    cache.close()
+    reopened = ResponseCache(max_bytes=10, path=path)
+    assert reopened.get("a") is None
+    assert reopened.get("c") == "cccc"
+    reopened.close()
+
+
+def test_key_depends_on_options_not_their_order():
+    base = make_key("m", "sys", "hi", {"temperature": 0, "seed": 1})
+    assert base == make_key("m", "sys", "hi", {"seed": 1, "temperature": 0})
+    assert base != make_key("m", "sys", "hi", {"temperature": 0, "seed": 2})
+    assert base != make_key("m", "sys", "hi")
+
+
+def test_is_deterministic():
+    assert not is_deterministic(None)
+    assert not is_deterministic({"temperature": 0.8})
+    assert is_deterministic({"temperature": 0})
+    assert is_deterministic({"seed": 42})
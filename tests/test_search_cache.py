@@ -0,0 +1,127 @@
+import threading
+import time
+import types
+
+import pytest
+
+import search_cache
+from search_cache import SearchCache
+
+RESULTS = [{"title": "t", "url": "https://example.com", "snippet": "s"}]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable stand-in for the module's time.time()"""
+    now = [1000.0]
+    monkeypatch.setattr(search_cache, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def rows(cache):
+    return cache._db.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+
+
+def test_key_normalizes_query():
+    assert SearchCache.make_key("ddg", "  Python   Asyncio ", 5) == SearchCache.make_key("ddg", "python asyncio", 5)
+    assert SearchCache.make_key("ddg", "python", 5) != SearchCache.make_key("ddg", "python", 3)
+    assert SearchCache.make_key("ddg", "python", 5) != SearchCache.make_key("bing", "python", 5)
+
+
+def test_results_expire_after_ttl(clock):
+    cache = SearchCache(ttl=60)
+    cache.put("k", RESULTS)
+    clock[0] += 59
+    assert cache.get("k") == RESULTS
+    clock[0] += 1
+    assert cache.get("k") is None
+
+
+def test_empty_results_use_negative_ttl(clock):
+    cache = SearchCache(ttl=60, negative_ttl=5)
+    cache.put("k", [])
+    assert cache.get("k") == []
+    clock[0] += 5
+    assert cache.get("k") is None
+
+
+def test_lru_bound():
+    cache = SearchCache(max_entries=2)
+    cache.put("a", RESULTS)
+    cache.put("b", RESULTS)
+    cache.get("a")
+    cache.put("c", RESULTS)
+    assert cache.get("b") is None
+    assert cache.get("a") == RESULTS
+    assert cache.stats()["entries"] == 2
+
+
+def test_cached_results_are_copies():
+    cache = SearchCache()
+    cache.put("k", RESULTS)
+    cache.get("k")[0]["title"] = "changed"
+    assert cache.get("k") == RESULTS
+
+
+def test_sqlite_rows_follow_evictions(tmp_path):
+    cache = SearchCache(max_entries=3, path=str(tmp_path / "search.db"))
+    for i in range(10):
+        cache.put(f"k{i}", RESULTS)
+    assert rows(cache) == 3
+    cache.close()
+
+
+def test_sqlite_purges_expired_rows(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(SearchCache, "PURGE_INTERVAL", 0)
+    cache = SearchCache(ttl=10, path=str(tmp_path / "search.db"))
+    cache.put("old", RESULTS)
+    clock[0] += 20
+    cache.put("new", RESULTS)
+    assert rows(cache) == 1
+    cache.close()
+
+
+def test_sqlite_survives_restart(tmp_path):
+    path = str(tmp_path / "search.db")
+    cache = SearchCache(path=path)
+    cache.put("k", RESULTS)
+    cache.close()
+    reopened = SearchCache(path=path)
+    assert reopened.get("k") == RESULTS
+    reopened.close()
+
+
+def test_concurrent_lookups_share_one_fetch():
+    cache = SearchCache()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return RESULTS
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch("ddg", "q", 5, fetch)))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert len(calls) == 1
+    assert results == [RESULTS] * 5
+
+
+def test_fetch_error_is_not_cached():
+    cache = SearchCache()
+
+    def fail():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_fetch("ddg", "q", 5, fail)
+    assert cache.get_or_fetch("ddg", "q", 5, lambda: RESULTS) == RESULTS
@@ -0,0 +1,179 @@
+import threading
+import time
+import types
+
+import pytest
+
+import voice_interaction
+from speech_cache import SpeechCache
+from speech_pipeline import speech_pieces
+from voice_interaction import TextToSpeech, VoiceAssistant, static_phrases
+
+
+class FakeEngine:
+    """pyttsx3 stand-in that speaks one word per 10 ms and records calling threads"""
+
+    def __init__(self):
+        self.threads = set()
+        self.callbacks = {}
+        self.queued = []
+        self.spoken = []
+        self.rendered = []
+        self._stop = False
+
+    def _call(self):
+        self.threads.add(threading.current_thread().name)
+
+    def setProperty(self, name, value):
+        self._call()
+
+    def getProperty(self, name):
+        self._call()
+        return []
+
+    def connect(self, topic, callback):
+        self._call()
+        self.callbacks[topic] = callback
+
+    def say(self, text):
+        self._call()
+        self.queued.append(text)
+
+    def save_to_file(self, text, path):
+        self._call()
+        self.queued.append((text, path))
+
+    def stop(self):
+        self._call()
+        self._stop = True
+
+    def runAndWait(self):
+        self._call()
+        self._stop = False
+        for item in self.queued:
+            if isinstance(item, tuple):
+                text, path = item
+                self.rendered.append(text)
+                with open(path, "wb") as fp:
+                    fp.write(b"RIFF" + text.encode())
+                continue
+            text = item
+            for word in text.split():
+                self.callbacks["started-word"](text, 0, len(word))
+                if self._stop:
+                    break
+                self.spoken.append(word)
+                time.sleep(0.01)
+        self.queued = []
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    fake = FakeEngine()
+    monkeypatch.setitem(voice_interaction.sys.modules, "pyttsx3", types.SimpleNamespace(init=lambda: fake))
+    monkeypatch.setattr(voice_interaction, "PYTTSX3_AVAILABLE", True)
+    return fake
+
+
+def long_text(words=200):
+    return " ".join(f"w{i}" for i in range(words))
+
+
+def test_pyttsx3_speaks_on_driver_thread(engine):
+    tts = TextToSpeech(engine="pyttsx3")
+    assert tts.speak_pyttsx3("hello there")
+    assert engine.spoken == ["hello", "there"]
+    assert engine.threads == {"lisa-pyttsx3"}
+    tts.close()
+
+
+def test_stop_goes_through_driver_thread(engine):
+    tts = TextToSpeech(engine="pyttsx3")
+    result = []
+    speaker = threading.Thread(target=lambda: result.append(tts.speak_pyttsx3(long_text())))
+    speaker.start()
+    while len(engine.spoken) < 3:
+        time.sleep(0.005)
+    tts.stop()
+    speaker.join(5)
+    assert result == [False]
+    assert len(engine.spoken) < 20
+    assert engine.threads == {"lisa-pyttsx3"}
+    # The driver carries on with the next request
+    assert tts.speak_pyttsx3("again")
+    assert engine.spoken[-1] == "again"
+    tts.close()
+
+
+def test_cancel_event_cuts_off_only_that_request(engine):
+    tts = TextToSpeech(engine="pyttsx3")
+    cancel = threading.Event()
+    threading.Timer(0.05, cancel.set).start()
+    assert not tts.speak_pyttsx3(long_text(), cancel)
+    time.sleep(0.05)
+    assert len(engine.spoken) < 20
+    assert engine.threads == {"lisa-pyttsx3"}
+    # Already cancelled: never reaches the engine
+    before = len(engine.spoken)
+    assert not tts.speak_pyttsx3("skipped", cancel)
+    assert tts.speak_pyttsx3("next")
+    assert engine.spoken[before:] == ["next"]
+    tts.close()
+
+
+@pytest.fixture
+def playable(monkeypatch):
+    """Pretend rendered audio can be played; playback itself just records it"""
+    monkeypatch.setattr(voice_interaction, "_wav_player_available", lambda: True)
+    played = []
+
+    def play(self, audio, cancel=None):
+        played.append(audio)
+        return True
+
+    monkeypatch.setattr(TextToSpeech, "play", play)
+    return played
+
+
+def test_pyttsx3_speech_is_rendered_once_and_cached(engine, playable):
+    tts = TextToSpeech(engine="pyttsx3", cache=SpeechCache())
+    for _ in range(3):
+        assert tts.speak("Hello there. How are you doing today?")
+    assert engine.rendered == ["Hello there. How are you doing today?"]
+    assert playable == [{"wav": b"RIFFHello there. How are you doing today?"}] * 3
+    assert engine.spoken == []
+    assert engine.threads == {"lisa-pyttsx3"}
+    tts.close()
+
+
+def test_pyttsx3_speaks_live_without_a_player(engine, monkeypatch):
+    monkeypatch.setattr(voice_interaction, "_wav_player_available", lambda: False)
+    tts = TextToSpeech(engine="pyttsx3", cache=SpeechCache())
+    assert tts.synthesize("hello") == "hello"
+    assert tts.warm_up(["hello"]) == 0
+    tts.close()
+
+
+def test_warm_up_prerenders_static_phrases(engine, playable):
+    tts = TextToSpeech(engine="pyttsx3", cache=SpeechCache())
+    pieces = list(dict.fromkeys(p for text in static_phrases() for p in speech_pieces(text)))
+    assert tts.warm_up(pieces) == len(pieces)
+    assert tts.warm_up(pieces) == 0
+    for text in static_phrases():
+        tts.speak(text)
+    assert len(engine.rendered) == len(pieces)
+    tts.close()
+
+
+def test_voice_assistant_warms_up_its_own_engine(engine, playable):
+    voice = VoiceAssistant(tts_engine="pyttsx3", enable_stt=False, speech_cache=SpeechCache())
+    deadline = time.monotonic() + 5
+    pieces = [p for text in static_phrases() for p in speech_pieces(text)]
+    while not all(voice.tts._key(p) in voice.tts.cache for p in pieces):
+        assert time.monotonic() < deadline, "static phrases were not pre-rendered"
+        time.sleep(0.01)
+    # A shared engine is warmed by whoever built it
+    shared = VoiceAssistant(tts=TextToSpeech(engine="pyttsx3", cache=SpeechCache()), enable_stt=False)
+    assert shared.tts._pyttsx3_queue is None
+    voice.close()
+    shared.tts.close()
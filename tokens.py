@@ -0,0 +1,10 @@
+"""Token Estimation Helpers for Lisa-Agent
+
+Cheap token counts used to keep prompts within a budget without loading
+the model's tokenizer.
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return (len(text) + 3) // 4
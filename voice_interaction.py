@@ -1,57 +1,200 @@
 """Voice Interaction Module for Lisa-Agent
 
 Provides text-to-speech and speech-to-text capabilities.
-Supports pyttsx3 (offline) and gTTS (online) for TTS.
-Uses SpeechRecognition for STT.
+Supports pyttsx3 (offline) and gTTS (online) for TTS; gTTS audio is
+kept in memory and played through pygame or a persistent mpg123 pipe.
+With a speech cache, pyttsx3 is rendered to WAV and cached as well,
+provided something can play the result (pygame, afplay or aplay);
+otherwise it speaks live.
+Uses SpeechRecognition for capture and a pluggable recognizer backend
+(Google online or Vosk offline, see speech_backends.py) for STT.
+
+Engines are imported when first used, not when this module is, so
+importing it stays cheap whatever is installed. Set LISA_VOICE_CACHE to
+a JSON file to remember the chosen pyttsx3 voice between runs.
 """
 
+import importlib.util
+import io
+import json
 import os
+import queue
+import shutil
+import subprocess
 import sys
-from typing import Optional, Callable
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Callable, Union
 import tempfile
 
-try:
-    import pyttsx3
-    PYTTSX3_AVAILABLE = True
-except ImportError:
-    PYTTSX3_AVAILABLE = False
-    print("Warning: pyttsx3 not installed. Offline TTS unavailable.")
-
-try:
-    from gtts import gTTS
-    GTTS_AVAILABLE = True
-except ImportError:
-    GTTS_AVAILABLE = False
-    print("Warning: gTTS not installed. Online TTS unavailable.")
-
-try:
-    import speech_recognition as sr
-    SR_AVAILABLE = True
-except ImportError:
-    SR_AVAILABLE = False
-    print("Warning: SpeechRecognition not installed. STT unavailable.")
-
-try:
+from audio_player import PipePlayer
+from continuous_listener import AudioSource, ContinuousListener, MicrophoneSource, Utterance
+from speech_backends import RecognizerBackend, get_backend
+from intent_router import ROUTER
+from speech_cache import SpeechCache, speech_key
+from speech_pipeline import SpeechPipeline, speech_pieces
+
+
+def _installed(module: str) -> bool:
+    """Whether ``module`` can be imported, without paying for the import"""
+    return importlib.util.find_spec(module) is not None
+
+
+# Engines are imported on first use; checking for them here is cheap
+PYTTSX3_AVAILABLE = _installed("pyttsx3")
+GTTS_AVAILABLE = _installed("gtts")
+SR_AVAILABLE = _installed("speech_recognition")
+PYGAME_AVAILABLE = _installed("pygame")
+
+# Voice picked for pyttsx3, per platform; finding it means enumerating
+# every installed voice, so it is done once per process and optionally
+# remembered on disk (LISA_VOICE_CACHE)
+_voice_choice: Dict[str, str] = {}
+_voice_lock = threading.Lock()
+
+# Queued to the pyttsx3 driver thread to cut off the utterance being spoken
+_STOP = object()
+
+
+def _wav_player_available() -> bool:
+    """Whether rendered pyttsx3 audio can be played back, rather than spoken live"""
+    if PYGAME_AVAILABLE or sys.platform == 'darwin':
+        return True
+    return sys.platform.startswith('linux') and shutil.which('aplay') is not None
+
+
+def _audio_format(data: bytes) -> str:
+    """'wav', or 'aiff' for what pyttsx3 renders on macOS"""
+    return 'aiff' if data[:4] == b'FORM' else 'wav'
+
+
+def _load_pygame():
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
     import pygame
-    PYGAME_AVAILABLE = True
-except ImportError:
-    PYGAME_AVAILABLE = False
+    return pygame
+
+
+def _preferred_voice(engine) -> str:
+    """Id of the voice Lisa uses with a pyttsx3 engine ("" for the default voice)"""
+    with _voice_lock:
+        if sys.platform in _voice_choice:
+            return _voice_choice[sys.platform]
+        path = os.getenv("LISA_VOICE_CACHE")
+        saved = {}
+        if path:
+            try:
+                with open(path, encoding="utf-8") as fp:
+                    saved = json.load(fp)
+            except (OSError, ValueError):
+                saved = {}
+        if sys.platform in saved:
+            _voice_choice[sys.platform] = saved[sys.platform]
+            return saved[sys.platform]
+        voice_id = ""
+        # Try to find a female voice (Lisa)
+        for voice in engine.getProperty('voices') or []:
+            if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
+                voice_id = voice.id
+                break
+        _voice_choice[sys.platform] = voice_id
+        if path:
+            saved[sys.platform] = voice_id
+            try:
+                with open(path, "w", encoding="utf-8") as fp:
+                    json.dump(saved, fp)
+            except OSError as e:
+                print(f"Voice cache write error: {e}")
+        return voice_id
+
+
+# Saying any of these ends VoiceAssistant.conversation_loop
+EXIT_WORDS = ['goodbye', 'bye', 'exit', 'quit']
+ROUTER.register("voice_exit", EXIT_WORDS, priority=100)
+
+GREETING = "Hello! I'm Lisa. How can I help you today?"
+GOODBYE = "Goodbye! Have a great day!"
+
+
+def static_phrases() -> List[str]:
+    """Fixed lines Lisa speaks: conversation greeting/goodbye and every mode's canned messages"""
+    phrases = [GREETING, GOODBYE]
+    try:
+        from fu2_protection_mode import FU2ProtectionMode
+        from okay_support_mode import OkaySupportMode
+    except ImportError:
+        return phrases
+    return phrases + FU2ProtectionMode.static_messages() + OkaySupportMode.static_messages()
+
+
+def _tick(cancel: Optional[threading.Event], interval: float = 0.02) -> bool:
+    """Sleep one polling interval; True if ``cancel`` was set meanwhile"""
+    if cancel is None:
+        time.sleep(interval)
+        return False
+    return cancel.wait(interval)
+
+
+def warm_up(tts: "TextToSpeech", texts: Optional[Iterable[str]] = None,
+            background: bool = True) -> Optional[threading.Thread]:
+    """
+    Pre-render phrases into an engine's cache so they play instantly.
+    
+    Each text is rendered as the pieces it is spoken in (speech_pieces()),
+    so a reply made of several fixed phrases hits the cache too.
+    
+    Args:
+        tts: Engine to render with
+        texts: Phrases to render (default: static_phrases())
+        background: Render on a daemon thread instead of blocking
+        
+    Returns:
+        The warm-up thread when running in the background
+    """
+    texts = static_phrases() if texts is None else texts
+    pieces = [piece for text in texts for piece in speech_pieces(text)]
+    if not background:
+        tts.warm_up(pieces)
+        return None
+    thread = threading.Thread(target=tts.warm_up, args=(pieces,), name="lisa-tts-warmup", daemon=True)
+    thread.start()
+    return thread
 
 
 class TextToSpeech:
     """Handles text-to-speech conversion using various engines"""
     
-    def __init__(self, engine: str = "auto", voice_rate: int = 150):
+    def __init__(self, engine: str = "auto", voice_rate: int = 150, lang: str = 'en',
+                 cache: Optional[SpeechCache] = None):
         """
         Initialize TTS engine.
         
         Args:
             engine: TTS engine to use ('pyttsx3', 'gtts', or 'auto')
             voice_rate: Speech rate for pyttsx3 (words per minute)
+            lang: Language code for gTTS
+            cache: Optional cache of synthesized audio; pyttsx3 only uses it
+                when rendered audio can be played back (see synthesize())
         """
         self.engine_type = engine
         self.voice_rate = voice_rate
+        self.lang = lang
+        self.cache = cache
+        self.voice_id = ""
         self.tts_engine = None
+        # pyttsx3 must be driven from the thread that created its engine,
+        # so every say/runAndWait/stop goes through one driver thread
+        self._pyttsx3_queue: Optional[queue.Queue] = None
+        # Set once the driver has created the engine and picked its voice
+        self._pyttsx3_ready = threading.Event()
+        self._play_lock = threading.Lock()
+        # One sentence at a time on the output device, whoever is speaking
+        self._device = threading.Lock()
+        self._player: Optional[subprocess.Popen] = None
+        # Without pygame, MP3 is streamed to one long-running mpg123 (Linux)
+        self._pipe_player: Optional[PipePlayer] = None
+        if not PYGAME_AVAILABLE and sys.platform.startswith('linux') and PipePlayer.available():
+            self._pipe_player = PipePlayer()
         
         if engine == "auto":
             if PYTTSX3_AVAILABLE:
@@ -64,89 +207,356 @@ class TextToSpeech:
         if self.engine_type == "pyttsx3":
             if not PYTTSX3_AVAILABLE:
                 raise ImportError("pyttsx3 not installed. Run: pip install pyttsx3")
-            self._init_pyttsx3()
         elif self.engine_type == "gtts":
             if not GTTS_AVAILABLE:
                 raise ImportError("gTTS not installed. Run: pip install gTTS")
+        # pyttsx3 renders to files for the cache only if they can be played
+        self._cache_pyttsx3 = (self.engine_type == "pyttsx3" and cache is not None
+                               and _wav_player_available())
     
     def _init_pyttsx3(self):
         """Initialize pyttsx3 engine"""
+        import pyttsx3
         self.tts_engine = pyttsx3.init()
         self.tts_engine.setProperty('rate', self.voice_rate)
-        
-        # Get available voices
-        voices = self.tts_engine.getProperty('voices')
-        if voices:
-            # Try to set a female voice (Lisa)
-            for voice in voices:
-                if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
-                    self.tts_engine.setProperty('voice', voice.id)
+        self.voice_id = _preferred_voice(self.tts_engine)
+        if self.voice_id:
+            self.tts_engine.setProperty('voice', self.voice_id)
+    
+    def _drive_pyttsx3(self, requests: queue.Queue) -> None:
+        # The only thread that touches the pyttsx3 engine. runAndWait()
+        # blocks it, so requests that arrive meanwhile are read from the
+        # word callback: stops are acted on there, the rest kept for later.
+        try:
+            self._init_pyttsx3()
+            error = None
+        except Exception as e:
+            error = e
+        self._pyttsx3_ready.set()
+        backlog: Deque = deque()
+        cancel: Optional[threading.Event] = None
+        speaking = stopped = False
+
+        def on_word(name, location, length) -> None:
+            nonlocal stopped
+            stop = cancel is not None and cancel.is_set()
+            while True:
+                try:
+                    item = requests.get_nowait()
+                except queue.Empty:
                     break
+                if item is _STOP:
+                    # Stops what is being said, not a rendering for the cache
+                    stop = stop or speaking
+                else:
+                    backlog.append(item)
+            if stop and not stopped:
+                stopped = True
+                self.tts_engine.stop()
+
+        if error is None:
+            self.tts_engine.connect('started-word', on_word)
+        while True:
+            item = backlog.popleft() if backlog else requests.get()
+            if item is None:
+                return
+            if item is _STOP:
+                continue  # nothing is being said
+            text, path, cancel, result = item
+            if error is not None:
+                print(f"pyttsx3 error: {error}")
+                result.put(False)
+                continue
+            if cancel is not None and cancel.is_set():
+                result.put(False)
+                continue
+            speaking, stopped = path is None, False
+            try:
+                if speaking:
+                    self.tts_engine.say(text)
+                else:
+                    self.tts_engine.save_to_file(text, path)
+                self.tts_engine.runAndWait()
+                result.put(not stopped)
+            except Exception as e:
+                print(f"pyttsx3 error: {e}")
+                result.put(False)
+            finally:
+                cancel, speaking = None, False
     
-    def speak_pyttsx3(self, text: str) -> bool:
+    def _pyttsx3_driver(self) -> queue.Queue:
+        with self._play_lock:
+            # Starting the speech driver is slow; wait until there is something to say
+            if self._pyttsx3_queue is None:
+                self._pyttsx3_queue = queue.Queue()
+                threading.Thread(target=self._drive_pyttsx3, args=(self._pyttsx3_queue,),
+                                 name="lisa-pyttsx3", daemon=True).start()
+            return self._pyttsx3_queue
+    
+    def _pyttsx3_request(self, text: str, path: Optional[str] = None,
+                         cancel: Optional[threading.Event] = None) -> queue.Queue:
+        """Have the driver say ``text``, or render it into ``path``; returns where the result will arrive"""
+        result: queue.Queue = queue.Queue(maxsize=1)
+        self._pyttsx3_driver().put((text, path, cancel, result))
+        return result
+    
+    def speak_pyttsx3(self, text: str, cancel: Optional[threading.Event] = None) -> bool:
         """
         Speak text using pyttsx3 (offline).
         
         Args:
             text: Text to speak
+            cancel: Cuts the speech off when set
             
         Returns:
             True if successful, False otherwise
         """
-        try:
-            self.tts_engine.say(text)
-            self.tts_engine.runAndWait()
-            return True
-        except Exception as e:
-            print(f"pyttsx3 error: {e}")
-            return False
+        result = self._pyttsx3_request(text, cancel=cancel)
+        while True:
+            try:
+                return result.get(timeout=0.02)
+            except queue.Empty:
+                if cancel is not None and cancel.is_set():
+                    # The driver sees the same event and stops at the next word
+                    return False
     
-    def speak_gtts(self, text: str, lang: str = 'en') -> bool:
+    def speak_gtts(self, text: str, lang: Optional[str] = None) -> bool:
         """
         Speak text using gTTS (online).
         
         Args:
             text: Text to speak
-            lang: Language code (default: 'en')
+            lang: Language code (default: the engine's lang)
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            # Create temporary file for audio
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-                temp_file = fp.name
-            
-            # Generate speech
-            tts = gTTS(text=text, lang=lang, slow=False)
-            tts.save(temp_file)
-            
-            # Play audio
-            if PYGAME_AVAILABLE:
+            # Sentence by sentence, like the pipeline, so cached pieces are reused
+            for piece in speech_pieces(text):
+                if not self.play(self.synthesize(piece, lang=lang)):
+                    return False
+            return True
+        except Exception as e:
+            print(f"gTTS error: {e}")
+            return False
+    
+    def _key(self, text: str, lang: Optional[str] = None) -> str:
+        return speech_key(self.engine_type, self.voice_id, self.voice_rate, lang or self.lang, text)
+    
+    def _pyttsx3_voice_ready(self) -> None:
+        # The chosen voice is part of the cache key; the driver picks it
+        self._pyttsx3_driver()
+        self._pyttsx3_ready.wait()
+    
+    def _render_pyttsx3_audio(self, text: str) -> Optional[bytes]:
+        """WAV (AIFF on macOS) for ``text``, or None if pyttsx3 couldn't render it"""
+        # pyttsx3 can only render to a file; it is read back and removed at once
+        fd, path = tempfile.mkstemp(prefix="lisa-tts-", suffix=".wav")
+        os.close(fd)
+        try:
+            if not self._pyttsx3_request(text, path).get():
+                return None
+            with open(path, "rb") as fp:
+                return fp.read() or None
+        except OSError as e:
+            print(f"pyttsx3 render error: {e}")
+            return None
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def synthesize(self, text: str, lang: Optional[str] = None) -> Union[str, Dict]:
+        """
+        Prepare audio for ``text`` without playing it.
+        
+        gTTS renders MP3 into memory here, or reuses it from the cache.
+        pyttsx3 does the same with WAV when there is a cache and a way to
+        play the result; otherwise it renders while it speaks, so its
+        "audio" is the text itself.
+        
+        Returns:
+            Something to hand to play()
+        """
+        if self.engine_type == "pyttsx3":
+            if not self._cache_pyttsx3:
+                return text
+            self._pyttsx3_voice_ready()
+            key = self._key(text, lang)
+            data = self.cache.get(key)
+            if data is None:
+                data = self._render_pyttsx3_audio(text)
+                if data is None:
+                    return text  # spoken live instead
+                self.cache.put(key, data)
+            return {'wav': data}
+        lang = lang or self.lang
+        key = self._key(text, lang)
+        data = self.cache.get(key) if self.cache is not None else None
+        if data is None:
+            from gtts import gTTS
+            buffer = io.BytesIO()
+            gTTS(text=text, lang=lang, slow=False).write_to_fp(buffer)
+            data = buffer.getvalue()
+            if self.cache is not None:
+                self.cache.put(key, data)
+        return {'mp3': data}
+    
+    def warm_up(self, texts: Iterable[str]) -> int:
+        """
+        Pre-render texts into the cache so they play without synthesis delay.
+        
+        Returns:
+            Number of texts synthesized (already-cached ones are skipped)
+        """
+        if self.cache is None or not (self.engine_type == "gtts" or self._cache_pyttsx3):
+            return 0
+        if self._cache_pyttsx3:
+            self._pyttsx3_voice_ready()
+        rendered = 0
+        for text in dict.fromkeys(texts):
+            if self._key(text) in self.cache:
+                continue
+            try:
+                if isinstance(self.synthesize(text), str):
+                    break  # pyttsx3 couldn't render; it will speak live
+                rendered += 1
+            except Exception as e:
+                print(f"TTS warm-up error: {e}")
+                break
+        return rendered
+    
+    def _ensure_mixer(self) -> bool:
+        # Initializing the mixer costs tens of milliseconds; do it once
+        if not PYGAME_AVAILABLE:
+            return False
+        with self._play_lock:
+            pygame = _load_pygame()
+            if not pygame.mixer.get_init():
                 pygame.mixer.init()
-                pygame.mixer.music.load(temp_file)
-                pygame.mixer.music.play()
-                while pygame.mixer.music.get_busy():
-                    pygame.time.Clock().tick(10)
-                pygame.mixer.quit()
-            elif sys.platform == 'darwin':  # macOS
-                os.system(f'afplay {temp_file}')
+        return True
+    
+    def _play_mixer(self, source: Union[str, io.BytesIO], cancel: Optional[threading.Event],
+                    kind: str = 'mp3') -> bool:
+        pygame = _load_pygame()
+        try:
+            if isinstance(source, str):
+                pygame.mixer.music.load(source)
+            else:
+                pygame.mixer.music.load(source, kind)
+            pygame.mixer.music.play()
+            while pygame.mixer.music.get_busy():
+                if _tick(cancel):
+                    pygame.mixer.music.stop()
+                    return False
+            return True
+        finally:
+            # The music stream keeps its file or buffer open until unloaded
+            pygame.mixer.music.unload()
+    
+    def play(self, audio: Union[str, Dict], cancel: Optional[threading.Event] = None) -> bool:
+        """
+        Play audio from synthesize(), blocking until it ends or ``cancel`` is set.
+        
+        MP3 is played from memory through pygame or a persistent mpg123
+        pipe; it only goes through a temp file when neither is available.
+        Rendered pyttsx3 audio plays from memory through pygame, else from
+        a temp file through afplay or aplay.
+        
+        Returns:
+            True if playback ran to completion
+        """
+        # Pipelines sharing this engine take turns; a cancelled one stops waiting
+        while not self._device.acquire(timeout=0.02):
+            if cancel is not None and cancel.is_set():
+                self.discard(audio)
+                return False
+        try:
+            return self._play(audio, cancel)
+        finally:
+            self._device.release()
+    
+    def _play(self, audio: Union[str, Dict], cancel: Optional[threading.Event]) -> bool:
+        if isinstance(audio, str):
+            return self.speak_pyttsx3(audio, cancel)
+        if 'mp3' in audio:
+            if self._ensure_mixer():
+                return self._play_mixer(io.BytesIO(audio['mp3']), cancel)
+            if self._pipe_player is not None:
+                return self._pipe_player.play(audio['mp3'], cancel)
+            audio = self._spill(audio['mp3'])
+        elif 'wav' in audio:
+            kind = _audio_format(audio['wav'])
+            if self._ensure_mixer():
+                return self._play_mixer(io.BytesIO(audio['wav']), cancel, kind)
+            audio = self._spill(audio['wav'], '.' + kind)
+        path = audio['path']
+        try:
+            if self._ensure_mixer():
+                return self._play_mixer(path, cancel)
+            if sys.platform == 'darwin':  # macOS
+                command = ['afplay', path]
             elif sys.platform == 'win32':  # Windows
-                os.system(f'start {temp_file}')
+                os.startfile(path)
+                return True
             else:  # Linux
-                os.system(f'mpg123 {temp_file}')
-            
-            # Clean up
+                command = ['mpg123', '-q', path] if path.endswith('.mp3') else ['aplay', '-q', path]
+            with self._play_lock:
+                self._player = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            while self._player.poll() is None:
+                if _tick(cancel):
+                    self._player.terminate()
+                    return False
+            return self._player.returncode == 0
+        finally:
             try:
-                os.remove(temp_file)
-            except:
+                os.remove(path)
+            except OSError:
                 pass
-            
-            return True
-            
-        except Exception as e:
-            print(f"gTTS error: {e}")
-            return False
+    
+    @staticmethod
+    def _spill(data: bytes, suffix: str = '.mp3') -> Dict:
+        """Fallback for players that can only open files"""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as fp:
+            fp.write(data)
+        return {'path': fp.name}
+    
+    def discard(self, audio: Union[str, Dict]) -> None:
+        """Free audio from synthesize() that will not be played"""
+        if isinstance(audio, dict) and 'path' in audio:
+            try:
+                os.remove(audio['path'])
+            except OSError:
+                pass
+    
+    def stop(self) -> None:
+        """Cut off whatever is playing right now"""
+        # pygame is only loaded once something has been played through it
+        pygame = sys.modules.get("pygame")
+        if self._pyttsx3_queue is not None:
+            # Only the driver thread may call the engine's stop()
+            self._pyttsx3_queue.put(_STOP)
+        # Rendered pyttsx3 audio plays through these too
+        if pygame is not None and pygame.mixer.get_init():
+            pygame.mixer.music.stop()
+        elif self._pipe_player is not None:
+            self._pipe_player.stop()
+        if self._player is not None and self._player.poll() is None:
+            self._player.terminate()
+    
+    def close(self) -> None:
+        """Release the audio device"""
+        self.stop()
+        if self._pyttsx3_queue is not None:
+            self._pyttsx3_queue.put(None)
+            self._pyttsx3_queue = None
+        if self._pipe_player is not None:
+            self._pipe_player.close()
+        pygame = sys.modules.get("pygame")
+        if pygame is not None and pygame.mixer.get_init():
+            pygame.mixer.quit()
     
     def speak(self, text: str) -> bool:
         """
@@ -162,7 +572,8 @@ class TextToSpeech:
             return False
         
         if self.engine_type == "pyttsx3":
-            return self.speak_pyttsx3(text)
+            # A piece at a time, like gTTS, so cached pieces are reused
+            return all(self.play(self.synthesize(piece)) for piece in speech_pieces(text))
         elif self.engine_type == "gtts":
             return self.speak_gtts(text)
         else:
@@ -171,15 +582,25 @@ class TextToSpeech:
 
 
 class SpeechToText:
-    """Handles speech-to-text conversion using Google Speech Recognition"""
+    """Handles speech-to-text conversion through a pluggable recognizer backend"""
     
-    def __init__(self):
-        """Initialize STT recognizer"""
+    def __init__(self, backend: Optional[RecognizerBackend] = None):
+        """
+        Initialize STT recognizer.
+        
+        Args:
+            backend: Recognizer to transcribe with (default: get_backend(),
+                i.e. LISA_STT_BACKEND or Google)
+        """
         if not SR_AVAILABLE:
             raise ImportError("SpeechRecognition not installed. Run: pip install SpeechRecognition")
+        import speech_recognition as sr
         
+        self._sr = sr
         self.recognizer = sr.Recognizer()
         self.microphone = None
+        # Loaded once; offline models stay resident between turns
+        self.backend = backend or get_backend()
     
     def listen(self, timeout: int = 5, phrase_time_limit: int = 10) -> Optional[str]:
         """
@@ -193,7 +614,7 @@ class SpeechToText:
             Recognized text or None if failed
         """
         try:
-            with sr.Microphone() as source:
+            with self._sr.Microphone() as source:
                 print("Listening...")
                 # Adjust for ambient noise
                 self.recognizer.adjust_for_ambient_noise(source, duration=1)
@@ -206,41 +627,126 @@ class SpeechToText:
                 )
                 
                 print("Processing speech...")
-                # Recognize speech using Google Speech Recognition
-                text = self.recognizer.recognize_google(audio)
+                rate = self.backend.sample_rate or audio.sample_rate
+                text = self.backend.transcribe(audio.get_raw_data(convert_rate=rate, convert_width=2), rate, 2)
+                if text is None:
+                    print("Could not understand audio.")
                 return text
                 
-        except sr.WaitTimeoutError:
+        except self._sr.WaitTimeoutError:
             print("No speech detected within timeout period.")
             return None
-        except sr.UnknownValueError:
+        except self._sr.UnknownValueError:
             print("Could not understand audio.")
             return None
-        except sr.RequestError as e:
+        except self._sr.RequestError as e:
             print(f"Speech recognition service error: {e}")
             return None
         except Exception as e:
             print(f"Error during speech recognition: {e}")
             return None
+    
+    def recognize_utterance(self, utterance: Utterance) -> Optional[str]:
+        """Transcribe one VAD-segmented utterance; None if nothing was understood"""
+        return self.backend.transcribe(utterance.pcm, utterance.sample_rate, utterance.sample_width)
+    
+    def start_continuous(self, source: Optional[AudioSource] = None,
+                         on_speech_start: Optional[Callable[[], None]] = None,
+                         on_partial: Optional[Callable[[str], None]] = None) -> ContinuousListener:
+        """
+        Start always-on listening.
+        
+        The audio stream stays open between turns, background noise is
+        tracked continuously instead of calibrated per turn, and
+        recognition runs on a worker thread while capture goes on.
+        
+        Args:
+            source: Audio source (default: the microphone)
+            on_speech_start: Called when the user starts talking
+            on_partial: Called with partial transcripts while the user is
+                still talking (streaming backends such as Vosk only)
+            
+        Returns:
+            A running ContinuousListener; call its listen() for each utterance
+        """
+        stream = self.backend.stream if on_partial is not None and self.backend.supports_partials else None
+        return ContinuousListener(source or MicrophoneSource(sample_rate=self.backend.sample_rate or 16000),
+                                  self.recognize_utterance, on_speech_start=on_speech_start,
+                                  stream=stream, on_partial=on_partial).start()
 
 
 class VoiceAssistant:
     """Combined voice assistant with both TTS and STT capabilities"""
     
-    def __init__(self, tts_engine: str = "auto", enable_stt: bool = True):
+    def __init__(self, tts_engine: str = "auto", enable_stt: bool = True,
+                 speech_cache: Optional[SpeechCache] = None, warm_up: bool = True,
+                 tts: Optional[TextToSpeech] = None):
         """
         Initialize voice assistant.
         
         Args:
             tts_engine: TTS engine to use ('pyttsx3', 'gtts', or 'auto')
             enable_stt: Whether to enable speech-to-text
+            speech_cache: Cache of synthesized audio (default: in memory,
+                plus the LISA_SPEECH_CACHE directory if set)
+            warm_up: Pre-render static phrases in the background at startup
+                (an engine passed as ``tts`` is left to whoever built it)
+            tts: An existing engine to speak through, e.g. one shared by
+                several assistants; close() leaves it open
         """
-        self.tts = TextToSpeech(engine=tts_engine)
+        self._owns_tts = tts is None
+        if tts is None:
+            if speech_cache is None:
+                speech_cache = SpeechCache(path=os.getenv("LISA_SPEECH_CACHE") or None)
+            tts = TextToSpeech(engine=tts_engine, cache=speech_cache)
+        self.tts = tts
         self.stt = SpeechToText() if enable_stt and SR_AVAILABLE else None
+        self._pipeline: Optional[SpeechPipeline] = None
+        if warm_up and self._owns_tts:
+            self.warm_up()
+    
+    @property
+    def pipeline(self) -> SpeechPipeline:
+        """Background speech pipeline, started on first use"""
+        if self._pipeline is None:
+            self._pipeline = SpeechPipeline(self.tts)
+        return self._pipeline
     
     def speak(self, text: str) -> bool:
-        """Speak text"""
-        return self.tts.speak(text)
+        """Speak text, after anything already queued, and wait until it has been said"""
+        # Through the pipeline, so one worker drives the engine and
+        # stop_speaking() cuts this off too
+        self.pipeline.say(text)
+        return self.pipeline.wait()
+    
+    def warm_up(self, texts: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """Pre-render phrases so they play instantly (see the module-level warm_up())"""
+        return warm_up(self.tts, texts, background)
+    
+    def speak_async(self, text: str) -> None:
+        """Queue text to be spoken in the background and return immediately"""
+        self.pipeline.say(text)
+    
+    def speak_stream(self, tokens: Iterable[str]) -> str:
+        """
+        Speak streamed tokens sentence by sentence as they arrive.
+        
+        Returns:
+            The full text once ``tokens`` is exhausted (playback may still be running)
+        """
+        return self.pipeline.say_stream(tokens)
+    
+    def stop_speaking(self) -> None:
+        """Cancel queued speech and cut off the current sentence (barge-in)"""
+        if self._pipeline is not None:
+            self._pipeline.barge_in()
+    
+    def close(self) -> None:
+        if self._pipeline is not None:
+            self._pipeline.close()
+            self._pipeline = None
+        if self._owns_tts:
+            self.tts.close()
     
     def listen(self, timeout: int = 5) -> Optional[str]:
         """Listen for speech input"""
@@ -249,22 +755,49 @@ class VoiceAssistant:
             return None
         return self.stt.listen(timeout=timeout)
     
-    def conversation_loop(self, response_callback: Callable[[str], str]):
+    def conversation_loop(self, response_callback: Callable[[str], Union[str, Iterable[str]]],
+                          continuous: bool = False, barge_in: bool = False,
+                          source: Optional[AudioSource] = None):
         """
         Run interactive voice conversation loop.
         
         Args:
-            response_callback: Function that takes user input and returns response
+            response_callback: Function that takes user input and returns the
+                response, either as a string or as streamed tokens; streamed
+                responses start playing after their first sentence
+            continuous: Keep the microphone open and segment speech with VAD
+                instead of reopening and recalibrating it every turn
+            barge_in: In continuous mode, talking over Lisa interrupts her
+                (best with headphones, or she may interrupt herself)
+            source: Audio source for continuous mode (default: the microphone)
         """
         if not self.stt:
             print("Speech-to-text not available. Cannot run conversation loop.")
             return
         
-        self.speak("Hello! I'm Lisa. How can I help you today?")
+        self.speak(GREETING)
+        listener = None
+        if continuous:
+            listener = self.stt.start_continuous(source, on_speech_start=self.stop_speaking if barge_in else None)
+            print("Listening...")
         
+        try:
+            self._converse(response_callback, listener, barge_in)
+        finally:
+            if listener is not None:
+                listener.stop()
+    
+    def _converse(self, response_callback: Callable[[str], Union[str, Iterable[str]]],
+                  listener: Optional[ContinuousListener], barge_in: bool) -> None:
         while True:
             # Listen for user input
-            user_input = self.listen()
+            if listener is None:
+                user_input = self.listen()
+            else:
+                user_input = listener.listen()
+                if user_input is None:
+                    # Audio source ended
+                    break
             
             if not user_input:
                 continue
@@ -272,16 +805,23 @@ class VoiceAssistant:
             print(f"You said: {user_input}")
             
             # Check for exit commands
-            if any(word in user_input.lower() for word in ['goodbye', 'bye', 'exit', 'quit']):
-                self.speak("Goodbye! Have a great day!")
+            if ROUTER.matches_intent(user_input, "voice_exit"):
+                self.speak(GOODBYE)
                 break
             
-            # Get response from callback
+            # Get response from callback, speaking each sentence as soon as it is complete
             response = response_callback(user_input)
+            if isinstance(response, str):
+                self.speak_async(response)
+            else:
+                response = self.speak_stream(response)
             print(f"Lisa: {response}")
             
-            # Speak response
-            self.speak(response)
+            if listener is None or not barge_in:
+                # Don't listen while Lisa is talking, or she hears herself
+                self.pipeline.wait()
+                if listener is not None:
+                    listener.discard_pending()
 
 
 def test_voice_features():
@@ -1,28 +1,119 @@
 """Web Search Module for Lisa-Agent
 
 Provides real-time web search capabilities using DuckDuckGo API.
-Falls back to Bing search if needed.
+Falls back to Bing search if needed, or queries every provider in
+parallel in fan-out mode. Results can be served from a shared
+SearchCache (see search_cache.py). get_engine() hands out long-lived
+engines shared across the process; submit_search() runs searches on a
+bounded worker pool. fetch_pages() downloads the top results and
+extracts the passages most relevant to the query (see page_fetch.py).
 """
 
-import requests
-from typing import Dict, List, Optional
+import asyncio
+import os
+import threading
+from itertools import zip_longest
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
 import json
 
+from http_pool import HTTPPool, HTTPX_AVAILABLE, get_default_pool, make_async_client
+from intent_router import ROUTER
+from page_fetch import PageFetcher
+from search_cache import SearchCache, get_default_search_cache
+
+if TYPE_CHECKING:
+    import httpx
+
+# Phrases that mark a message as a web search request, longest first so
+# query extraction strips "search for" before "search"
+SEARCH_TRIGGERS = ['search for', 'search', 'find', 'look up', 'what is']
+ROUTER.register("web_search", SEARCH_TRIGGERS, priority=50)
+
 
 class WebSearchEngine:
     """Handles web searches using DuckDuckGo and Bing APIs"""
     
-    def __init__(self, bing_api_key: Optional[str] = None):
+    # Read timeout for search APIs; connect timeout comes from the pool
+    READ_TIMEOUT = 10
+    
+    def __init__(self, bing_api_key: Optional[str] = None, pool: Optional[HTTPPool] = None,
+                 mode: str = "fallback", provider_deadline: float = 5.0, min_results: int = 3,
+                 cache: Optional[SearchCache] = None):
         """
         Initialize the search engine.
         
         Args:
             bing_api_key: Optional Bing API key for enhanced search
+            pool: HTTP connection pool (defaults to the shared process-wide pool)
+            mode: 'fallback' (DuckDuckGo, then Bing if empty) or 'fanout'
+                (all providers in parallel)
+            provider_deadline: Seconds fan-out waits for each provider
+            min_results: In fan-out mode, a provider returning at least this
+                many results answers the query on its own
+            cache: Optional search cache shared between engines
         """
         self.bing_api_key = bing_api_key
+        self.pool = pool or get_default_pool()
+        self.mode = mode
+        self.provider_deadline = provider_deadline
+        self.min_results = min_results
+        self.cache = cache
+        self._fetcher: Optional[PageFetcher] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats_lock = threading.Lock()
+        self.provider_stats: Dict[str, Dict] = {}
+        # httpx.AsyncClient per event loop, created on first async search there
+        self._http: Dict[asyncio.AbstractEventLoop, "httpx.AsyncClient"] = {}
         self.ddg_base_url = "https://api.duckduckgo.com/"
         self.bing_base_url = "https://api.bing.microsoft.com/v7.0/search"
         
+    def _ddg_params(self, query: str) -> Dict:
+        return {
+            'q': query,
+            'format': 'json',
+            'no_html': 1,
+            'skip_disambig': 1
+        }
+    
+    def _parse_duckduckgo(self, data: Dict, max_results: int) -> List[Dict]:
+        """Turn a DuckDuckGo Instant Answer payload into result dictionaries"""
+        results = []
+        
+        # Extract abstract if available
+        if data.get('Abstract'):
+            results.append({
+                'title': data.get('Heading', 'Result'),
+                'snippet': data['Abstract'],
+                'url': data.get('AbstractURL', ''),
+                'source': 'DuckDuckGo'
+            })
+        
+        # Extract related topics
+        for topic in data.get('RelatedTopics', [])[:max_results - len(results)]:
+            if isinstance(topic, dict) and 'Text' in topic:
+                results.append({
+                    'title': topic.get('Text', '').split(' - ')[0] if ' - ' in topic.get('Text', '') else 'Related',
+                    'snippet': topic.get('Text', ''),
+                    'url': topic.get('FirstURL', ''),
+                    'source': 'DuckDuckGo'
+                })
+        
+        return results[:max_results]
+    
+    def _parse_bing(self, data: Dict, max_results: int) -> List[Dict]:
+        """Turn a Bing Web Search payload into result dictionaries"""
+        results = []
+        for item in data.get('webPages', {}).get('value', [])[:max_results]:
+            results.append({
+                'title': item.get('name', ''),
+                'snippet': item.get('snippet', ''),
+                'url': item.get('url', ''),
+                'source': 'Bing'
+            })
+        return results
+    
     def search_duckduckgo(self, query: str, max_results: int = 5) -> List[Dict]:
         """
         Search using DuckDuckGo Instant Answer API.
@@ -35,44 +126,17 @@ class WebSearchEngine:
             List of search result dictionaries
         """
         try:
-            params = {
-                'q': query,
-                'format': 'json',
-                'no_html': 1,
-                'skip_disambig': 1
-            }
-            
-            response = requests.get(self.ddg_base_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            results = []
-            
-            # Extract abstract if available
-            if data.get('Abstract'):
-                results.append({
-                    'title': data.get('Heading', 'Result'),
-                    'snippet': data['Abstract'],
-                    'url': data.get('AbstractURL', ''),
-                    'source': 'DuckDuckGo'
-                })
-            
-            # Extract related topics
-            for topic in data.get('RelatedTopics', [])[:max_results - len(results)]:
-                if isinstance(topic, dict) and 'Text' in topic:
-                    results.append({
-                        'title': topic.get('Text', '').split(' - ')[0] if ' - ' in topic.get('Text', '') else 'Related',
-                        'snippet': topic.get('Text', ''),
-                        'url': topic.get('FirstURL', ''),
-                        'source': 'DuckDuckGo'
-                    })
-            
-            return results[:max_results]
-            
+            return self._cached('duckduckgo', query, max_results, self._fetch_duckduckgo)
         except Exception as e:
             print(f"DuckDuckGo search error: {e}")
             return []
     
+    def _fetch_duckduckgo(self, query: str, max_results: int) -> List[Dict]:
+        response = self.pool.get(self.ddg_base_url, params=self._ddg_params(query),
+                                 timeout=self.pool.timeout(read=self.READ_TIMEOUT))
+        response.raise_for_status()
+        return self._parse_duckduckgo(response.json(), max_results)
+    
     def search_bing(self, query: str, max_results: int = 5) -> List[Dict]:
         """
         Search using Bing Search API (requires API key).
@@ -88,32 +152,35 @@ class WebSearchEngine:
             return []
         
         try:
-            headers = {'Ocp-Apim-Subscription-Key': self.bing_api_key}
-            params = {'q': query, 'count': max_results, 'textDecorations': False}
-            
-            response = requests.get(self.bing_base_url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            results = []
-            for item in data.get('webPages', {}).get('value', [])[:max_results]:
-                results.append({
-                    'title': item.get('name', ''),
-                    'snippet': item.get('snippet', ''),
-                    'url': item.get('url', ''),
-                    'source': 'Bing'
-                })
-            
-            return results
-            
+            return self._cached('bing', query, max_results, self._fetch_bing)
         except Exception as e:
             print(f"Bing search error: {e}")
             return []
     
+    def _bing_request(self, query: str, max_results: int) -> Tuple[Dict, Dict]:
+        headers = {'Ocp-Apim-Subscription-Key': self.bing_api_key}
+        params = {'q': query, 'count': max_results, 'textDecorations': False}
+        return headers, params
+    
+    def _fetch_bing(self, query: str, max_results: int) -> List[Dict]:
+        headers, params = self._bing_request(query, max_results)
+        response = self.pool.get(self.bing_base_url, headers=headers, params=params,
+                                 timeout=self.pool.timeout(read=self.READ_TIMEOUT))
+        response.raise_for_status()
+        return self._parse_bing(response.json(), max_results)
+    
+    def _cached(self, provider: str, query: str, max_results: int,
+                fetch: Callable[[str, int], List[Dict]]) -> List[Dict]:
+        """Run ``fetch`` through the search cache, if one is configured"""
+        if self.cache is None:
+            return fetch(query, max_results)
+        return self.cache.get_or_fetch(provider, query, max_results, lambda: fetch(query, max_results))
+    
     def search(self, query: str, max_results: int = 5) -> List[Dict]:
         """
         Perform web search using available engines.
         Tries DuckDuckGo first, falls back to Bing if available.
+        In 'fanout' mode all providers are queried at once instead.
         
         Args:
             query: Search query string
@@ -122,6 +189,9 @@ class WebSearchEngine:
         Returns:
             List of search result dictionaries
         """
+        if self.mode == "fanout":
+            return self.search_parallel(query, max_results)
+        
         # Try DuckDuckGo first (free, no API key needed)
         results = self.search_duckduckgo(query, max_results)
         
@@ -131,6 +201,231 @@ class WebSearchEngine:
         
         return results
     
+    def providers(self) -> Dict[str, Callable[[str, int], List[Dict]]]:
+        """Configured providers in preference order"""
+        providers = {'duckduckgo': self.search_duckduckgo}
+        if self.bing_api_key:
+            providers['bing'] = self.search_bing
+        return providers
+    
+    def _stats(self, provider: str) -> Dict:
+        # Caller holds self._stats_lock
+        return self.provider_stats.setdefault(
+            provider, {'calls': 0, 'empty': 0, 'errors': 0, 'timeouts': 0, 'total_latency': 0.0, 'last_latency': None})
+    
+    def _record(self, provider: str, latency: Optional[float], count: int = 0) -> None:
+        """Count one finished call; ``latency`` None means it failed"""
+        with self._stats_lock:
+            stats = self._stats(provider)
+            if latency is None:
+                stats['errors'] += 1
+                return
+            stats['calls'] += 1
+            stats['total_latency'] += latency
+            stats['last_latency'] = latency
+            if not count:
+                stats['empty'] += 1
+    
+    def _missed_deadline(self, provider: str) -> None:
+        with self._stats_lock:
+            self._stats(provider)['timeouts'] += 1
+    
+    def provider_metrics(self) -> Dict[str, Dict]:
+        """
+        Per-provider call counts, errors, timeouts and mean latency (seconds).
+        
+        A call that misses the fan-out deadline counts as a timeout and is
+        still counted as a call, with its real latency, once it finishes.
+        """
+        with self._stats_lock:
+            return {
+                name: {**stats, 'mean_latency': stats['total_latency'] / stats['calls'] if stats['calls'] else None}
+                for name, stats in self.provider_stats.items()
+            }
+    
+    def _submit(self, name: str, fn: Callable[[str, int], List[Dict]], query: str, max_results: int) -> Future:
+        with self._stats_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lisa-search")
+            executor = self._executor
+        
+        def timed() -> Tuple[List[Dict], float]:
+            start = time.perf_counter()
+            results = fn(query, max_results)
+            return results, time.perf_counter() - start
+        
+        def finished(future: Future) -> None:
+            # Recorded however the call ends, even after the caller stopped waiting
+            if future.cancelled() or future.exception() is not None:
+                self._record(name, None)
+            else:
+                results, latency = future.result()
+                self._record(name, latency, len(results))
+        
+        future = executor.submit(timed)
+        future.add_done_callback(finished)
+        return future
+    
+    def iter_search(self, query: str, max_results: int = 5,
+                    deadline: Optional[float] = None) -> Iterator[Tuple[str, List[Dict], float]]:
+        """
+        Query every provider in parallel, yielding results as each finishes.
+        
+        Args:
+            query: Search query string
+            max_results: Maximum number of results per provider
+            deadline: Seconds to wait for providers (default: provider_deadline)
+            
+        Yields:
+            (provider name, results, latency in seconds), fastest first.
+            Providers that fail are skipped; those that miss the deadline are
+            skipped and counted as timeouts.
+        """
+        deadline = self.provider_deadline if deadline is None else deadline
+        futures = {self._submit(name, fn, query, max_results): name for name, fn in self.providers().items()}
+        pending = set(futures)
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                pending.discard(future)
+                if future.exception() is not None:
+                    continue
+                results, latency = future.result()
+                yield futures[future], results, latency
+        except FuturesTimeoutError:
+            for future in pending:
+                if not future.done():
+                    self._missed_deadline(futures[future])
+    
+    def search_parallel(self, query: str, max_results: int = 5, strategy: str = "first",
+                        deadline: Optional[float] = None) -> List[Dict]:
+        """
+        Fan out to all providers and combine their answers.
+        
+        Args:
+            query: Search query string
+            max_results: Maximum number of results to return
+            strategy: 'first' returns the first provider with at least
+                min_results results; 'merge' waits for all providers
+            deadline: Seconds to wait for providers (default: provider_deadline)
+            
+        Returns:
+            List of search result dictionaries, deduplicated by URL
+        """
+        by_provider: Dict[str, List[Dict]] = {}
+        for name, results, _ in self.iter_search(query, max_results, deadline):
+            if strategy == "first" and len(results) >= min(self.min_results, max_results):
+                return results[:max_results]
+            by_provider[name] = results
+        
+        # Interleave providers in preference order (not arrival order) so
+        # each contributes its best hits before anyone's tail
+        merged, seen = [], set()
+        ranked = [by_provider.get(name, []) for name in self.providers()]
+        for row in zip_longest(*ranked):
+            for result in row:
+                if result is None:
+                    continue
+                key = result.get('url') or result.get('title')
+                if key in seen:
+                    continue
+                seen.add(key)
+                merged.append(result)
+        return merged[:max_results]
+    
+    def fetch_pages(self, query: str, results: List[Dict], max_pages: int = 3,
+                    token_budget: int = 600) -> List[Dict]:
+        """
+        Download the top result pages and keep the passages most relevant to the query.
+        
+        Args:
+            query: Search query string
+            results: Search results whose URLs to fetch
+            max_pages: Number of result pages to download
+            token_budget: Estimated tokens of page text to return
+            
+        Returns:
+            Dicts with 'url', 'text' and 'score', best first
+        """
+        with self._stats_lock:
+            if self._fetcher is None:
+                self._fetcher = PageFetcher(pool=self.pool)
+        urls = [r['url'] for r in results if r.get('url')][:max_pages]
+        return self._fetcher.relevant_chunks(query, urls, token_budget=token_budget)
+    
+    def _async_client(self) -> "httpx.AsyncClient":
+        # The engine is shared across threads and event loops, but an httpx
+        # client only works on the loop it was first used on
+        loop = asyncio.get_running_loop()
+        with self._stats_lock:
+            for old in [old for old in self._http if old.is_closed()]:
+                del self._http[old]  # its connections went with the loop
+            client = self._http.get(loop)
+            if client is None:
+                client = self._http[loop] = make_async_client(self.pool.config)
+        return client
+    
+    async def asearch_duckduckgo(self, query: str, max_results: int = 5) -> List[Dict]:
+        """
+        asyncio version of search_duckduckgo().
+        
+        Uses httpx when installed; otherwise runs the blocking call on a
+        worker thread.
+        """
+        if not HTTPX_AVAILABLE:
+            return await asyncio.to_thread(self.search_duckduckgo, query, max_results)
+        key = SearchCache.make_key('duckduckgo', query, max_results)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return cached
+        try:
+            response = await self._async_client().get(self.ddg_base_url, params=self._ddg_params(query),
+                                                      timeout=self.READ_TIMEOUT)
+            response.raise_for_status()
+            results = self._parse_duckduckgo(response.json(), max_results)
+            if self.cache is not None:
+                self.cache.put(key, results)
+            return results
+        except Exception as e:
+            print(f"DuckDuckGo search error: {e}")
+            return []
+    
+    async def asearch_bing(self, query: str, max_results: int = 5) -> List[Dict]:
+        """asyncio version of search_bing()"""
+        if not self.bing_api_key:
+            return []
+        if not HTTPX_AVAILABLE:
+            return await asyncio.to_thread(self.search_bing, query, max_results)
+        key = SearchCache.make_key('bing', query, max_results)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return cached
+        try:
+            headers, params = self._bing_request(query, max_results)
+            response = await self._async_client().get(self.bing_base_url, headers=headers, params=params,
+                                                      timeout=self.READ_TIMEOUT)
+            response.raise_for_status()
+            results = self._parse_bing(response.json(), max_results)
+            if self.cache is not None:
+                self.cache.put(key, results)
+            return results
+        except Exception as e:
+            print(f"Bing search error: {e}")
+            return []
+    
+    async def asearch(self, query: str, max_results: int = 5) -> List[Dict]:
+        """asyncio version of search(), with the same DuckDuckGo-then-Bing fallback"""
+        results = await self.asearch_duckduckgo(query, max_results)
+        if not results and self.bing_api_key:
+            results = await self.asearch_bing(query, max_results)
+        return results
+    
+    async def aclose(self) -> None:
+        """Close the running event loop's async HTTP client, if one was created"""
+        with self._stats_lock:
+            client = self._http.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+    
     def format_results(self, results: List[Dict]) -> str:
         """
         Format search results as readable text.
@@ -155,6 +450,89 @@ class WebSearchEngine:
         return formatted.strip()
 
 
+# Long-lived engines keyed by configuration, so the pooled connections,
+# provider metrics and fan-out executor survive across calls
+_engines: Dict[Tuple[Optional[str], str], WebSearchEngine] = {}
+_engines_lock = threading.Lock()
+_search_executor: Optional[ThreadPoolExecutor] = None
+_search_slots: Optional[threading.BoundedSemaphore] = None
+
+# Worker threads running searches off the caller's thread; at most
+# SEARCH_QUEUE_FACTOR times as many searches may be queued or running
+SEARCH_WORKERS = int(os.getenv("LISA_SEARCH_WORKERS", "8"))
+SEARCH_QUEUE_FACTOR = 4
+
+
+def get_engine(bing_api_key: Optional[str] = None, mode: str = "fallback") -> WebSearchEngine:
+    """
+    Return the shared engine for this configuration, creating it once.
+    
+    Engines use the default HTTP pool and the process-wide search cache
+    and are safe to share between threads.
+    
+    Args:
+        bing_api_key: Optional Bing API key
+        mode: 'fallback' or 'fanout' (see WebSearchEngine)
+        
+    Returns:
+        WebSearchEngine instance
+    """
+    key = (bing_api_key, mode)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = WebSearchEngine(bing_api_key=bing_api_key, mode=mode,
+                                                     cache=get_default_search_cache())
+        return engine
+
+
+def submit_search(query: str, bing_api_key: Optional[str] = None, max_results: int = 5,
+                  mode: str = "fallback", engine: Optional[WebSearchEngine] = None) -> Future:
+    """
+    Run a search on the shared worker pool.
+    
+    Blocks only when the pool's queue is full, so a burst of searches
+    applies backpressure instead of piling up unbounded work.
+    
+    Args:
+        engine: Engine to search with; defaults to get_engine(bing_api_key, mode)
+    
+    Returns:
+        Future resolving to a list of search result dictionaries
+    """
+    global _search_executor, _search_slots
+    engine = engine or get_engine(bing_api_key, mode)
+    with _engines_lock:
+        if _search_executor is None:
+            _search_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="lisa-search-worker")
+            _search_slots = threading.BoundedSemaphore(SEARCH_WORKERS * SEARCH_QUEUE_FACTOR)
+        executor, slots = _search_executor, _search_slots
+    slots.acquire()
+    try:
+        future = executor.submit(engine.search, query, max_results)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+def shutdown_engines(wait: bool = True) -> None:
+    """Stop the search worker pool and drop all shared engines"""
+    global _search_executor, _search_slots
+    with _engines_lock:
+        executor, _search_executor, _search_slots = _search_executor, None, None
+        engines = list(_engines.values())
+        _engines.clear()
+    if executor is not None:
+        executor.shutdown(wait=wait)
+    for engine in engines:
+        if engine._executor is not None:
+            engine._executor.shutdown(wait=False)
+        if engine._fetcher is not None:
+            engine._fetcher.close()
+
+
 def web_search(query: str, bing_api_key: Optional[str] = None, max_results: int = 5) -> str:
     """
     Convenience function for quick web searches.
@@ -167,7 +545,7 @@ def web_search(query: str, bing_api_key: Optional[str] = None, max_results: int
     Returns:
         Formatted search results as string
     """
-    engine = WebSearchEngine(bing_api_key=bing_api_key)
+    engine = get_engine(bing_api_key)
     results = engine.search(query, max_results=max_results)
     return engine.format_results(results)
 